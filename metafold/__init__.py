@@ -1,9 +1,11 @@
+from metafold.cache import ResponseCache
 from metafold.client import Client
 from metafold.projects import ProjectsEndpoint
 from metafold.assets import AssetsEndpoint
 from metafold.jobs import JobsEndpoint
 from metafold.workflows import WorkflowsEndpoint
 from metafold.auth import AuthProvider
+from metafold.tracing import Tracer
 
 
 class MetafoldClient(Client):
@@ -27,6 +29,9 @@ class MetafoldClient(Client):
         client_secret: str | None = None,
         auth_domain: str = "metafold3d.us.auth0.com",
         base_url: str = "https://api.metafold3d.com/",
+        cache: ResponseCache | None = None,
+        tracer: Tracer | None = None,
+        gzip_threshold: int | None = None,
     ) -> None:
         """Initialize Metafold API client.
 
@@ -34,6 +39,14 @@ class MetafoldClient(Client):
             access_token: Metafold API secret key.
             project_id: ID of the project to make API calls against.
             base_url: Metafold API URL. Used for internal testing.
+            cache: Optional response cache. Jobs, workflows, and assets in a final
+                state are served from the cache, other resources are revalidated
+                with conditional requests.
+            tracer: Optional tracer receiving spans for HTTP requests, asset
+                transfers and workflow durations. See :mod:`metafold.tracing`.
+            gzip_threshold: Optional size in bytes from which JSON request bodies,
+                e.g. workflow parameters and project data, are sent gzip
+                compressed. Requires server support for Content-Encoding: gzip.
         """
         # client_id and client_secret have priority
         if not any([client_id and client_secret, access_token]):
@@ -42,9 +55,15 @@ class MetafoldClient(Client):
             )
         elif client_id and client_secret:
             auth = AuthProvider(client_id, client_secret, auth_domain, base_url)
-            super().__init__(base_url, auth=auth, project_id=project_id)
+            super().__init__(
+                base_url, auth=auth, project_id=project_id, cache=cache, tracer=tracer,
+                gzip_threshold=gzip_threshold,
+            )
         else:
-            super().__init__(base_url, access_token=access_token, project_id=project_id)
+            super().__init__(
+                base_url, access_token=access_token, project_id=project_id, cache=cache,
+                tracer=tracer, gzip_threshold=gzip_threshold,
+            )
 
         self.projects = ProjectsEndpoint(self)
         self.assets = AssetsEndpoint(self)
@@ -1,7 +1,15 @@
 from datetime import datetime, timezone
-from functools import wraps
+from functools import lru_cache, wraps
 from typing import Any, Callable, TypeVar
 
+_MONTHS = {
+    m: i for i, m in enumerate(
+        ["Jan", "Feb", "Mar", "Apr", "May", "Jun",
+         "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"],
+        start=1,
+    )
+}
+
 
 def asdatetime(s: str | datetime) -> datetime:
     """Parse Metafold API datetime.
@@ -14,6 +22,23 @@ def asdatetime(s: str | datetime) -> datetime:
     """
     if isinstance(s, datetime):
         return s
+    return _parse_rfc1123(s)
+
+
+@lru_cache(maxsize=4096)
+def _parse_rfc1123(s: str) -> datetime:
+    # List responses repeat the same timestamps many times over (created and
+    # modified of every nested asset), hence the cache. strptime is slow, so
+    # handle the fixed-width format directly: "Mon, 01 Jan 2024 00:00:00 GMT".
+    if len(s) == 29 and s[3] == "," and s[-4:] == " GMT":
+        try:
+            return datetime(
+                int(s[12:16]), _MONTHS[s[8:11]], int(s[5:7]),
+                int(s[17:19]), int(s[20:22]), int(s[23:25]),
+                tzinfo=timezone.utc,
+            )
+        except (KeyError, ValueError):
+            pass
     return datetime.strptime(s, "%a, %d %b %Y %H:%M:%S %Z").replace(tzinfo=timezone.utc)
 
 
@@ -26,6 +51,14 @@ def asdict(**kwargs: Any) -> dict[str, Any]:
     return d
 
 
+FINAL_STATES = frozenset({"success", "failure", "canceled"})
+
+
+def is_final(d: dict[str, Any]) -> bool:
+    """Check whether a job or workflow resource has reached a final state."""
+    return d.get("state") in FINAL_STATES
+
+
 T = TypeVar("T")
 U = TypeVar("U")
 
@@ -41,4 +74,8 @@ def optional(f: Callable[[T], U]) -> Callable[[T | None], U | None]:
     return decorator
 
 
-optional_datetime = optional(asdatetime)
+def optional_datetime(s: str | datetime | None) -> datetime | None:
+    """Parse optional Metafold API datetime."""
+    if s is None:
+        return None
+    return asdatetime(s)
@@ -1,12 +1,23 @@
 from attrs import field, frozen
+from collections import OrderedDict
 from datetime import datetime
+from io import RawIOBase
 from metafold.api import asdatetime, asdict
 from metafold.client import Client
-from os import PathLike
+from metafold.tracing import Tracer
+from os import SEEK_CUR, SEEK_END, SEEK_SET, PathLike
 from requests import Response
-from typing import IO
+from typing import IO, TYPE_CHECKING, Any, Iterator
 import requests
 
+# numpy is only needed by download_array, keep it out of `import metafold`
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+    import numpy as np
+
+# Bytes read into an array at a time by download_array
+_DOWNLOAD_SLICE = 1 << 20
+
 
 @frozen(kw_only=True)
 class Asset:
@@ -63,6 +74,32 @@ class AssetsEndpoint:
         r: Response = self._client.get(url, params=payload)
         return [Asset(**a) for a in r.json()]
 
+    def iter_list(
+        self,
+        sort: str | None = None,
+        q: str | None = None,
+        project_id: str | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Asset]:
+        """Iterate over assets, fetching one page at a time.
+
+        Unlike :meth:`list`, resources are requested and constructed lazily as the
+        iterator is consumed.
+
+        Args:
+            sort: Sort string. See :meth:`list`.
+            q: Query string. See :meth:`list`.
+            project_id: Asset project ID.
+            page_size: Maximum number of assets requested per page.
+
+        Returns:
+            Iterator over asset resources.
+        """
+        project_id = self._client.project_id(project_id)
+        url = f"/projects/{project_id}/assets"
+        payload = asdict(sort=sort, q=q)
+        return (Asset(**a) for a in self._client.paginate(url, payload, page_size))
+
     def get(self, asset_id: str, project_id: str | None = None) -> Asset:
         """Get an asset.
 
@@ -75,8 +112,8 @@ class AssetsEndpoint:
         """
         project_id = self._client.project_id(project_id)
         url = f"/projects/{project_id}/assets/{asset_id}"
-        r: Response = self._client.get(url)
-        return Asset(**r.json())
+        # Assets are never modified in place, re-uploads create a new asset
+        return Asset(**self._client.get_json(url, immutable=lambda _: True))
 
     def download(
         self, asset_id: str, f: IO[bytes],
@@ -92,12 +129,16 @@ class AssetsEndpoint:
         project_id = self._client.project_id(project_id)
         url = f"/projects/{project_id}/assets/{asset_id}"
         r: Response = self._client.get(url, params={"download": "true"})
-        r = requests.get(r.json()["link"], stream=True)
-        try:
-            for chunk in r.iter_content(chunk_size=65536):  # 64 KiB
-                f.write(chunk)
-        finally:
-            f.close()
+        with self._client.tracer.span("asset.download", asset_id=asset_id) as span:
+            r = requests.get(r.json()["link"], stream=True)
+            size = 0
+            try:
+                for chunk in r.iter_content(chunk_size=65536):  # 64 KiB
+                    f.write(chunk)
+                    size += len(chunk)
+            finally:
+                f.close()
+                span.set_attribute("bytes", size)
 
     def download_file(
         self, asset_id: str, path: str | PathLike,
@@ -113,6 +154,107 @@ class AssetsEndpoint:
         with open(path, "wb") as f:
             self.download(asset_id, f, project_id)
 
+    def download_array(
+        self, asset_id: str,
+        dtype: "DTypeLike" = "float32",
+        shape: int | tuple[int, ...] | None = None,
+        project_id: str | None = None,
+        out: "np.ndarray | None" = None,
+    ) -> "np.ndarray":
+        """Download a raw binary asset into an array.
+
+        The response is read into the array's memory a 1 MiB slice at a
+        time. urllib3 copies each slice once through a temporary buffer, so
+        memory beyond the array stays at a slice whatever the asset's size.
+        Pass a np.memmap as out to download to disk.
+
+        Args:
+            asset_id: ID of asset to download.
+            dtype: Element type. Ignored if out is given.
+            shape: Array shape, or None for a flat array of the asset's size.
+                Ignored if out is given.
+            project_id: Asset project ID.
+            out: C-contiguous array to download into, e.g. preallocated or a
+                np.memmap.
+
+        Returns:
+            The array, out if given.
+
+        Raises:
+            ValueError: If the asset's size doesn't match the array.
+        """
+        import numpy as np
+
+        project_id = self._client.project_id(project_id)
+        url = f"/projects/{project_id}/assets/{asset_id}"
+        r: Response = self._client.get(url, params={"download": "true"})
+        payload = r.json()
+        if out is None:
+            if shape is None:
+                if payload.get("size") is None:
+                    raise ValueError("Asset size unknown, pass the array shape")
+                shape = payload["size"] // np.dtype(dtype).itemsize
+            out = np.empty(shape, dtype=dtype)
+        if not out.flags.c_contiguous or not out.flags.writeable:
+            raise ValueError("Expected a writeable, C-contiguous array")
+        buf = out.reshape(-1).view(np.uint8).data
+        with self._client.tracer.span("asset.download", asset_id=asset_id) as span:
+            r = requests.get(payload["link"], stream=True)
+            r.raise_for_status()
+            r.raw.decode_content = True
+            size = 0
+            try:
+                while size < len(buf):
+                    # Bounded, urllib3 reads a slice into a temporary bytes
+                    # object before copying it into the buffer
+                    n = r.raw.readinto(buf[size:size + _DOWNLOAD_SLICE])
+                    if not n:
+                        break
+                    size += n
+                if size < len(buf) or r.raw.read(1):
+                    raise ValueError(
+                        f"Asset size doesn't match array of {len(buf)} bytes"
+                    )
+            finally:
+                r.close()
+                span.set_attribute("bytes", size)
+        return out
+
+    def open(
+        self, asset_id: str,
+        project_id: str | None = None,
+        block_size: int = 1 << 20,
+        cache_size: int = 64,
+        readahead: int = 4,
+    ) -> "RemoteFile":
+        """Open an asset for random access without downloading it.
+
+        Only the byte ranges that are read are transferred, e.g. h5py can read
+        single datasets of a large HDF5 asset. See :class:`RemoteFile`.
+
+        Args:
+            asset_id: ID of asset to open.
+            project_id: Asset project ID.
+            block_size: Size in bytes of the blocks data is fetched and cached in.
+            cache_size: Maximum number of cached blocks.
+            readahead: Number of blocks fetched past sequential reads.
+
+        Returns:
+            Read-only, seekable binary file.
+        """
+        project_id = self._client.project_id(project_id)
+        url = f"/projects/{project_id}/assets/{asset_id}"
+        r: Response = self._client.get(url, params={"download": "true"})
+        payload = r.json()
+        return RemoteFile(
+            payload["link"],
+            size=payload.get("size"),
+            block_size=block_size,
+            cache_size=cache_size,
+            readahead=readahead,
+            tracer=self._client.tracer,
+        )
+
     def create(
         self, f: str | bytes | PathLike | IO[bytes],
         project_id: str | None = None,
@@ -130,7 +272,11 @@ class AssetsEndpoint:
         fp: IO[bytes] = _open_file(f)
         try:
             url = f"/projects/{project_id}/assets"
-            r: Response = self._client.post(url, files={"file": fp})
+            with self._client.tracer.span("asset.upload") as span:
+                if (size := _remaining_size(fp)) is not None:
+                    span.set_attribute("bytes", size)
+                r: Response = self._client.post(url, files={"file": fp})
+                span.set_attribute("asset_id", r.json()["id"])
         finally:
             fp.close()
         return Asset(**r.json())
@@ -147,7 +293,193 @@ class AssetsEndpoint:
         self._client.delete(url)
 
 
+class RemoteFile(RawIOBase):
+    """Read-only, seekable file backed by HTTP range requests.
+
+    Data is fetched in fixed-size blocks kept in a least recently used cache.
+    Missing blocks of a read are fetched with one request per contiguous run,
+    and reads continuing where the previous one ended fetch ``readahead``
+    further blocks along with them. Servers ignoring the Range header are
+    handled by keeping the whole response.
+
+    Attributes:
+        bytes_fetched: Number of bytes transferred so far.
+        requests: Number of requests made so far.
+    """
+
+    def __init__(
+        self, url: str,
+        size: int | None = None,
+        block_size: int = 1 << 20,
+        cache_size: int = 64,
+        readahead: int = 4,
+        tracer: Tracer | None = None,
+    ) -> None:
+        """Initialize remote file.
+
+        Args:
+            url: File URL, e.g. a signed asset download link.
+            size: File size in bytes. Requested from the server if not given.
+            block_size: Size in bytes of the blocks data is fetched and cached in.
+            cache_size: Maximum number of cached blocks.
+            readahead: Number of blocks fetched past sequential reads.
+            tracer: Optional tracer receiving a span per request.
+        """
+        super().__init__()
+        if block_size < 1 or cache_size < 1 or readahead < 0:
+            raise ValueError(
+                "Expected positive block_size and cache_size, and non-negative readahead"
+            )
+        self._url = url
+        self._block_size = block_size
+        self._cache_size = cache_size
+        self._readahead = readahead
+        self._tracer = tracer or Tracer()
+        self._session = requests.Session()
+        self._blocks: OrderedDict[int, bytes] = OrderedDict()
+        # Whole file, if the server doesn't support range requests
+        self._content: bytes | None = None
+        self._pos = 0
+        self._last_end = -1
+        self.bytes_fetched = 0
+        self.requests = 0
+        self._size = size if size is not None else self._fetch_size()
+
+    @property
+    def size(self) -> int:
+        """File size in bytes."""
+        return self._size
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = SEEK_SET) -> int:
+        if whence == SEEK_SET:
+            pos = offset
+        elif whence == SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == SEEK_END:
+            pos = self._size + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError(f"Negative seek position: {pos}")
+        self._pos = pos
+        return pos
+
+    def readinto(self, b: Any) -> int:
+        data = self.read(len(b))
+        n = len(data)
+        memoryview(b).cast("B")[:n] = data
+        return n
+
+    def read(self, size: int | None = -1) -> bytes:
+        if self.closed:
+            raise ValueError("I/O operation on closed file")
+        start = self._pos
+        end = self._size if size is None or size < 0 else min(self._size, start + size)
+        if start >= end:
+            return b""
+        data = self._read_range(start, end)
+        self._pos = end
+        self._last_end = end
+        return data
+
+    def close(self) -> None:
+        if not self.closed:
+            self._session.close()
+            self._blocks.clear()
+            self._content = None
+        super().close()
+
+    def _read_range(self, start: int, end: int) -> bytes:
+        if self._content is not None:
+            return self._content[start:end]
+        bs = self._block_size
+        first, last = start // bs, (end - 1) // bs
+        blocks = {i: self._blocks.get(i) for i in range(first, last + 1)}
+        missing = [i for i, block in blocks.items() if block is None]
+        if missing:
+            n_blocks = -(-self._size // bs)
+            runs: list[list[int]] = []
+            for i in missing:
+                if runs and runs[-1][-1] == i - 1:
+                    runs[-1].append(i)
+                else:
+                    runs.append([i])
+            if start == self._last_end:
+                # Sequential read, extend the last run with uncached blocks
+                i = runs[-1][-1] + 1
+                while (
+                    i < n_blocks
+                    and i <= last + self._readahead
+                    and i not in self._blocks
+                ):
+                    runs[-1].append(i)
+                    i += 1
+            for run in runs:
+                fetched = self._fetch(run[0] * bs, min(self._size, (run[-1] + 1) * bs))
+                if self._content is not None:
+                    return self._content[start:end]
+                for j, i in enumerate(run):
+                    block = fetched[j * bs:(j + 1) * bs]
+                    if i in blocks:
+                        blocks[i] = block
+                    self._cache(i, block)
+        for i in blocks:
+            if i in self._blocks:
+                self._blocks.move_to_end(i)
+        data = b"".join(blocks[i] or b"" for i in range(first, last + 1))
+        offset = first * bs
+        return data[start - offset:end - offset]
+
+    def _cache(self, i: int, block: bytes) -> None:
+        self._blocks[i] = block
+        self._blocks.move_to_end(i)
+        while len(self._blocks) > self._cache_size:
+            self._blocks.popitem(last=False)
+
+    def _fetch(self, start: int, end: int) -> bytes:
+        with self._tracer.span("asset.read_range", offset=start) as span:
+            r = self._session.get(self._url, headers={"Range": f"bytes={start}-{end - 1}"})
+            r.raise_for_status()
+            self.requests += 1
+            self.bytes_fetched += len(r.content)
+            span.set_attribute("bytes", len(r.content))
+        if r.status_code != 206:
+            self._content = r.content
+            self._size = len(r.content)
+            return r.content[start:end]
+        return r.content
+
+    def _fetch_size(self) -> int:
+        r = self._session.get(self._url, headers={"Range": "bytes=0-0"})
+        r.raise_for_status()
+        self.requests += 1
+        if r.status_code != 206:
+            self._content = r.content
+            self.bytes_fetched += len(r.content)
+            return len(r.content)
+        # Content-Range: bytes 0-0/<size>
+        return int(r.headers["Content-Range"].rsplit("/", 1)[1])
+
+
 def _open_file(f: str | bytes | PathLike | IO[bytes]) -> IO[bytes]:
     if isinstance(f, (str, bytes, PathLike)):
         return open(f, "rb")
     return f
+
+
+def _remaining_size(fp: IO[bytes]) -> int | None:
+    if not fp.seekable():
+        return None
+    pos = fp.tell()
+    size = fp.seek(0, SEEK_END) - pos
+    fp.seek(pos)
+    return size
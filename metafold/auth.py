@@ -1,4 +1,3 @@
-from auth0.authentication import GetToken  # type: ignore
 from collections import namedtuple
 from datetime import datetime, timedelta, timezone
 
@@ -17,6 +16,9 @@ class AuthProvider:
         self._base_url = base_url
         self._client_id = client_id
 
+        # Only client credential auth needs auth0, most clients use a token
+        from auth0.authentication import GetToken  # type: ignore
+
         self._get_token = GetToken(
             self._auth_domain,
             self._client_id,
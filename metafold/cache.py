@@ -0,0 +1,154 @@
+from attrs import asdict, frozen
+from collections import OrderedDict
+from os import PathLike
+from pathlib import Path
+from threading import Lock, get_ident
+from typing import Any
+import hashlib
+import json
+import os
+
+
+@frozen
+class CacheEntry:
+    """Cached JSON response.
+
+    Attributes:
+        body: Decoded response body.
+        etag: ETag validator returned with the response.
+        last_modified: Last-Modified validator returned with the response.
+        immutable: Resource is in a final state and may be served without
+            revalidating against the server.
+    """
+    body: Any
+    etag: str | None = None
+    last_modified: str | None = None
+    immutable: bool = False
+
+    def validators(self) -> dict[str, str]:
+        """Conditional request headers for revalidating this entry."""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """Response cache for API resources.
+
+    Entries are kept in a bounded in-memory LRU. When a directory is given,
+    entries are also written to disk so they survive across processes; the disk
+    tier is unbounded and may be cleared at any time.
+
+    Cached bodies are shared between callers and must not be mutated.
+    """
+
+    def __init__(
+        self,
+        maxsize: int = 1024,
+        directory: str | PathLike | None = None,
+    ) -> None:
+        """Initialize response cache.
+
+        Args:
+            maxsize: Maximum number of entries held in memory.
+            directory: Optional directory for the on-disk tier.
+        """
+        if maxsize < 1:
+            raise ValueError("Expected maxsize to be at least 1")
+        self._maxsize = maxsize
+        self._entries: OrderedDict[str, CacheEntry] = OrderedDict()
+        self._lock = Lock()
+        self._directory = Path(directory) if directory is not None else None
+        if self._directory is not None:
+            self._directory.mkdir(parents=True, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "ResponseCache":
+        # The cache is shared state; copies of a client keep using the same one.
+        return self
+
+    def get(self, key: str) -> CacheEntry | None:
+        """Look up a cached entry, promoting disk entries into memory.
+
+        Args:
+            key: Resource URL.
+
+        Returns:
+            Cached entry or None.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+        entry = self._read(key)
+        if entry is not None:
+            with self._lock:
+                self._insert(key, entry)
+        return entry
+
+    def put(self, key: str, entry: CacheEntry) -> None:
+        """Store an entry.
+
+        Args:
+            key: Resource URL.
+            entry: Entry to store.
+        """
+        with self._lock:
+            self._insert(key, entry)
+        self._write(key, entry)
+
+    def invalidate(self, key: str) -> None:
+        """Remove an entry from every tier.
+
+        Args:
+            key: Resource URL.
+        """
+        with self._lock:
+            self._entries.pop(key, None)
+        if (path := self._path(key)) is not None:
+            path.unlink(missing_ok=True)
+
+    def clear(self) -> None:
+        """Remove all entries from every tier."""
+        with self._lock:
+            self._entries.clear()
+        if self._directory is not None:
+            for path in self._directory.glob("*.json"):
+                path.unlink(missing_ok=True)
+
+    def _insert(self, key: str, entry: CacheEntry) -> None:
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def _path(self, key: str) -> Path | None:
+        if self._directory is None:
+            return None
+        return self._directory / f"{hashlib.sha256(key.encode()).hexdigest()}.json"
+
+    def _read(self, key: str) -> CacheEntry | None:
+        path = self._path(key)
+        if path is None or not path.is_file():
+            return None
+        try:
+            return CacheEntry(**json.loads(path.read_text()))
+        except (OSError, ValueError, TypeError):
+            # Treat unreadable or stale-format files as a miss
+            return None
+
+    def _write(self, key: str, entry: CacheEntry) -> None:
+        path = self._path(key)
+        if path is None:
+            return
+        # Write to a temporary file first so concurrent readers never see a
+        # partially written entry.
+        tmp = path.with_suffix(f".{os.getpid()}.{get_ident()}.tmp")
+        tmp.write_text(json.dumps(asdict(entry)))
+        os.replace(tmp, path)
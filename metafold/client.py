@@ -1,8 +1,12 @@
 from metafold.auth import AuthProvider
+from metafold.cache import CacheEntry, ResponseCache
 from metafold.exceptions import PollTimeout
+from metafold.tracing import Tracer
 from requests import HTTPError, Response, Session
-from typing import Any, Callable
+from typing import Any, Callable, Iterator
 from urllib.parse import urljoin
+import gzip
+import json
 import platform
 import time
 
@@ -15,7 +19,10 @@ class Client:
         base_url: str,
         access_token: str | None = None,
         project_id: str | None = None,
-        auth: AuthProvider | None = None
+        auth: AuthProvider | None = None,
+        cache: ResponseCache | None = None,
+        tracer: Tracer | None = None,
+        gzip_threshold: int | None = None,
     ) -> None:
         if bool(auth) == bool(access_token):
             raise ValueError(
@@ -24,9 +31,14 @@ class Client:
         self._auth = auth
         self._default_project = project_id
         self._base_url = base_url
+        self._cache = cache
+        self.tracer = tracer or Tracer()
+        self._gzip_threshold = gzip_threshold
         self._session = Session()
         self._session.headers.update({
             "Accept": "application/json",
+            # Decoded transparently by requests as the body is read
+            "Accept-Encoding": "gzip, deflate",
             "User-Agent": f"Python/{platform.python_version()}",
         })
         if access_token:
@@ -50,10 +62,17 @@ class Client:
         *args: Any, **kwargs: Any,
     ) -> Response:
         url = urljoin(self._base_url, url)
-        headers = None
+        headers = kwargs.pop("headers", None) or {}
         if self._auth:
-            headers = {"Authorization": f"Bearer {self._auth.get_token()}"}
-        r: Response = request(url, *args, **kwargs, headers=headers)
+            headers = {**headers, "Authorization": f"Bearer {self._auth.get_token()}"}
+        if self._gzip_threshold is not None:
+            headers = self._compress_body(kwargs, headers)
+        method = request.__name__
+        with self.tracer.span(f"http.{method}", method=method.upper(), url=url) as span:
+            r: Response = request(url, *args, **kwargs, headers=headers or None)
+            span.set_attribute("status_code", r.status_code)
+            if (length := r.headers.get("Content-Length")) is not None:
+                span.set_attribute("bytes", int(length))
         if not r.ok:
             # Not all error responses are JSON so fall back to the status reason
             try:
@@ -67,6 +86,27 @@ class Client:
             )
         return r
 
+    def _compress_body(self, kwargs: dict[str, Any], headers: dict[str, str]) -> dict[str, str]:
+        """Gzip JSON and raw request bodies of at least gzip_threshold bytes.
+
+        Updates the request arguments in place and returns the request headers.
+        Multipart uploads are sent as is.
+        """
+        assert self._gzip_threshold is not None
+        if kwargs.get("json") is not None:
+            # Serialized like requests does
+            body = json.dumps(kwargs.pop("json"), allow_nan=False).encode()
+            headers = {**headers, "Content-Type": "application/json"}
+            kwargs["data"] = body
+        elif isinstance(data := kwargs.get("data"), (str, bytes)):
+            body = data.encode() if isinstance(data, str) else data
+        else:
+            return headers
+        if len(body) >= self._gzip_threshold:
+            kwargs["data"] = gzip.compress(body, compresslevel=6)
+            headers = {**headers, "Content-Encoding": "gzip"}
+        return headers
+
     def get(self, url: str, *args: Any, **kwargs: Any) ->  Response:
         return self._request(self._session.get, url, *args, **kwargs)
 
@@ -80,7 +120,89 @@ class Client:
         return self._request(self._session.patch, url, *args, **kwargs)
 
     def delete(self, url: str, *args: Any, **kwargs: Any) ->  Response:
-        return self._request(self._session.delete, url, *args, **kwargs)
+        r = self._request(self._session.delete, url, *args, **kwargs)
+        if self._cache is not None:
+            self._cache.invalidate(urljoin(self._base_url, url))
+        return r
+
+    def get_json(
+        self, url: str,
+        immutable: Callable[[Any], bool] = lambda _: False,
+    ) -> Any:
+        """Get a JSON resource, serving it from the response cache when possible.
+
+        Without a response cache this is equivalent to ``get(url).json()``. With one,
+        resources in a final state are served from the cache without touching the
+        network, and other resources are revalidated with a conditional request
+        using the ETag/Last-Modified validators of the cached response.
+
+        Args:
+            url: Resource URL.
+            immutable: Predicate on the decoded body, true if the resource will
+                never change again and may be cached indefinitely.
+
+        Returns:
+            Decoded response body.
+        """
+        if self._cache is None:
+            return self.get(url).json()
+
+        key = urljoin(self._base_url, url)
+        entry = self._cache.get(key)
+        if entry is not None and entry.immutable:
+            return entry.body
+        r = self.get(url, headers=entry.validators() if entry else None)
+        if r.status_code == 304 and entry is not None:
+            return entry.body
+        body = r.json()
+        etag = r.headers.get("ETag")
+        last_modified = r.headers.get("Last-Modified")
+        final = immutable(body)
+        # Mutable resources without validators can't be revalidated, don't cache
+        if final or etag or last_modified:
+            self._cache.put(key, CacheEntry(body, etag, last_modified, final))
+        return body
+
+    def paginate(
+        self, url: str,
+        params: dict[str, Any] | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Any]:
+        """Iterate over the items of a list endpoint one page at a time.
+
+        Pages are requested with the "limit" and "cursor" query parameters. The
+        cursor of the next page is read from the X-Next-Cursor response header,
+        iteration stops when the header is absent or a short page is returned.
+        A first page longer than page_size means the server ignored the limit
+        and sent the whole list. A first page of exactly page_size items
+        without a cursor means the server can't page the endpoint, and the
+        whole list is requested at once instead.
+
+        Args:
+            url: List endpoint URL.
+            params: Additional query parameters, e.g. sort and search strings.
+            page_size: Maximum number of items requested per page.
+
+        Returns:
+            Iterator over decoded items.
+        """
+        if page_size < 1:
+            raise ValueError("Expected page_size to be at least 1")
+        list_params = params or {}
+        params = {**list_params, "limit": page_size}
+        first = True
+        while True:
+            r = self.get(url, params=params)
+            items: list[Any] = r.json()
+            cursor = r.headers.get("X-Next-Cursor")
+            if first and not cursor and len(items) == page_size:
+                yield from self.get(url, params=list_params).json()
+                return
+            yield from items
+            if not cursor or len(items) != page_size:
+                return
+            params["cursor"] = cursor
+            first = False
 
     def poll(
         self, url: str,
@@ -1,30 +1,33 @@
 from attrs import field, frozen
 from datetime import datetime
-from metafold.api import asdatetime, asdict, optional, optional_datetime
+from metafold.api import asdatetime, asdict, is_final, optional_datetime
 from metafold.assets import Asset
 from metafold.client import Client
 from metafold.exceptions import PollTimeout
 from requests import Response
-from typing import Any, TypeAlias, TypedDict
+from typing import Any, Iterator, TypeAlias, TypedDict
 
 
-def _assets(v: list[dict[str, Any] | Asset]) -> list[Asset]:
+# Converters are plain named functions rather than lambdas wrapping optional(),
+# they run once per field for every resource in a list response.
+def _assets(v: list[dict[str, Any] | Asset] | None) -> list[Asset] | None:
+    if v is None:
+        return None
     return [a if isinstance(a, Asset) else Asset(**a) for a in v]
 
 
 AssetDict: TypeAlias = dict[str, dict[str, Any] | Asset]
 
 
-def _assets_dict(v: AssetDict) -> dict[str, Asset]:
-    return dict(
-        (k, a if isinstance(a, Asset) else Asset(**a))
-        for k, a in v.items()
-    )
+def _assets_dict(v: AssetDict | None) -> dict[str, Asset] | None:
+    if v is None:
+        return None
+    return {k: a if isinstance(a, Asset) else Asset(**a) for k, a in v.items()}
 
 
 class IODict(TypedDict):
     params: dict[str, Any] | None
-    assets: dict[str, AssetDict] | None
+    assets: AssetDict | None
 
 
 @frozen(kw_only=True)
@@ -36,14 +39,17 @@ class IO:
         assets: Related assets.
     """
     params: dict[str, Any] | None = None
-    assets: dict[str, Asset] | None = field(
-        converter=lambda v: optional(_assets_dict)(v), default=None)
+    assets: dict[str, Asset] | None = field(converter=_assets_dict, default=None)
 
     @staticmethod
     def from_dict(d: IODict) -> "IO":
         return IO(params=d.get("params"), assets=d.get("assets"))
 
 
+def _io(v: IO | IODict) -> IO:
+    return v if isinstance(v, IO) else IO.from_dict(v)
+
+
 @frozen(kw_only=True)
 class Job:
     """Job resource.
@@ -72,19 +78,16 @@ class Job:
     type: str
     state: str
     created: datetime = field(converter=asdatetime)
-    started: datetime | None = field(
-        converter=lambda v: optional_datetime(v), default=None)
-    finished: datetime | None = field(
-        converter=lambda v: optional_datetime(v), default=None)
+    started: datetime | None = field(converter=optional_datetime, default=None)
+    finished: datetime | None = field(converter=optional_datetime, default=None)
     error: str | None = None
-    inputs: IO = field(converter=lambda v: v if isinstance(v, IO) else IO.from_dict(v))
-    outputs: IO = field(converter=lambda v: v if isinstance(v, IO) else IO.from_dict(v))
+    inputs: IO = field(converter=_io)
+    outputs: IO = field(converter=_io)
     needs: list[str]
     project_id: str | None = None
     workflow_id: str | None = None
     # NOTE(ryan): Deprecated
-    assets: list[Asset] | None = field(
-        converter=lambda v: optional(_assets)(v), default=None)
+    assets: list[Asset] | None = field(converter=_assets, default=None)
     parameters: dict[str, Any]
     meta: dict[str, Any]
 
@@ -120,6 +123,32 @@ class JobsEndpoint:
         r: Response = self._client.get(url, params=payload)
         return [Job(**j) for j in r.json()]
 
+    def iter_list(
+        self,
+        sort: str | None = None,
+        q: str | None = None,
+        project_id: str | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Job]:
+        """Iterate over jobs, fetching one page at a time.
+
+        Unlike :meth:`list`, resources are requested and constructed lazily as the
+        iterator is consumed.
+
+        Args:
+            sort: Sort string. See :meth:`list`.
+            q: Query string. See :meth:`list`.
+            project_id: Job project ID.
+            page_size: Maximum number of jobs requested per page.
+
+        Returns:
+            Iterator over job resources.
+        """
+        project_id = self._client.project_id(project_id)
+        url = f"/projects/{project_id}/jobs"
+        payload = asdict(sort=sort, q=q)
+        return (Job(**j) for j in self._client.paginate(url, payload, page_size))
+
     def get(self, job_id: str, project_id: str | None = None) -> Job:
         """Get a job.
 
@@ -132,8 +161,7 @@ class JobsEndpoint:
         """
         project_id = self._client.project_id(project_id)
         url = f"/projects/{project_id}/jobs/{job_id}"
-        r: Response = self._client.get(url)
-        return Job(**r.json())
+        return Job(**self._client.get_json(url, immutable=is_final))
 
     def delete(self, job_id: str, project_id: str | None = None):
         """Delete a job.
@@ -1,9 +1,6 @@
 from __future__ import annotations
 from dataclasses import dataclass
 from typing import Any, Optional, Union, List, cast
-from simulation_configurator.materials import (
-    _materials as simulation_configurator_materials,
-)
 
 
 class ParamsBase:
@@ -428,35 +425,45 @@ DEFAULT_OUTSOLE = Material(
     ),
 )
 
-# import and wrap the imported material definitions
-MATERIAL_ABS = Material.from_dict(simulation_configurator_materials["ABS"])
-MATERIAL_ALUMINUM = Material.from_dict(simulation_configurator_materials["Aluminum"])
-MATERIAL_BASF_EPD = Material.from_dict(simulation_configurator_materials["BASF_epd"])
-# MATERIAL_BASF_PA11_XY     = Material.from_dict(simulation_configurator_materials["BASF_PA11_xy"])
-# MATERIAL_BASF_PA11_Z      = Material.from_dict(simulation_configurator_materials["BASF_PA11_z"])
-MATERIAL_BASF_PP1400_XY = Material.from_dict(
-    simulation_configurator_materials["BASF_PP1400_xy"]
-)
-MATERIAL_BASF_PP1400_Z = Material.from_dict(
-    simulation_configurator_materials["BASF_PP1400_z"]
-)
-MATERIAL_BASF_RG3280 = Material.from_dict(
-    simulation_configurator_materials["BASF_RG3280"]
-)
-MATERIAL_BASF_TPU01 = Material.from_dict(
-    simulation_configurator_materials["BASF_TPU01"]
-)
-MATERIAL_EOS_PA11 = Material.from_dict(simulation_configurator_materials["EOS_PA11"])
-MATERIAL_EOS_TPE300 = Material.from_dict(
-    simulation_configurator_materials["EOS_TPE300"]
-)
-MATERIAL_EPU_41 = Material.from_dict(simulation_configurator_materials["EPU_41"])
-MATERIAL_EPU_45 = Material.from_dict(simulation_configurator_materials["EPU_45"])
-MATERIAL_NYLON_6 = Material.from_dict(simulation_configurator_materials["Nylon_6"])
-MATERIAL_NYLON_12 = Material.from_dict(simulation_configurator_materials["Nylon_12"])
-MATERIAL_PLA = Material.from_dict(simulation_configurator_materials["PLA"])
-MATERIAL_STAINLESS_STEEL = Material.from_dict(
-    simulation_configurator_materials["StainlessSteel"]
-)
-MATERIAL_TI64 = Material.from_dict(simulation_configurator_materials["Ti64"])
-MATERIAL_TPU = Material.from_dict(simulation_configurator_materials["TPU"])
+# Material definitions shipped with simulation_configurator, keyed by the
+# constant name they are exposed under. They are wrapped on first access so that
+# importing this module does not import simulation_configurator.
+CONFIGURATOR_MATERIALS = {
+    "MATERIAL_ABS": "ABS",
+    "MATERIAL_ALUMINUM": "Aluminum",
+    "MATERIAL_BASF_EPD": "BASF_epd",
+    # "MATERIAL_BASF_PA11_XY": "BASF_PA11_xy",
+    # "MATERIAL_BASF_PA11_Z": "BASF_PA11_z",
+    "MATERIAL_BASF_PP1400_XY": "BASF_PP1400_xy",
+    "MATERIAL_BASF_PP1400_Z": "BASF_PP1400_z",
+    "MATERIAL_BASF_RG3280": "BASF_RG3280",
+    "MATERIAL_BASF_TPU01": "BASF_TPU01",
+    "MATERIAL_EOS_PA11": "EOS_PA11",
+    "MATERIAL_EOS_TPE300": "EOS_TPE300",
+    "MATERIAL_EPU_41": "EPU_41",
+    "MATERIAL_EPU_45": "EPU_45",
+    "MATERIAL_NYLON_6": "Nylon_6",
+    "MATERIAL_NYLON_12": "Nylon_12",
+    "MATERIAL_PLA": "PLA",
+    "MATERIAL_STAINLESS_STEEL": "StainlessSteel",
+    "MATERIAL_TI64": "Ti64",
+    "MATERIAL_TPU": "TPU",
+}
+
+
+def __getattr__(name: str) -> Material:
+    if name not in CONFIGURATOR_MATERIALS:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from simulation_configurator.materials import (
+        _materials as simulation_configurator_materials,
+    )
+
+    material = Material.from_dict(
+        simulation_configurator_materials[CONFIGURATOR_MATERIALS[name]]
+    )
+    globals()[name] = material
+    return material
+
+
+def __dir__() -> list[str]:
+    return sorted(list(globals()) + list(CONFIGURATOR_MATERIALS))
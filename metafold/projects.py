@@ -4,7 +4,7 @@ from enum import Enum
 from metafold.api import asdatetime, asdict
 from metafold.client import Client
 from requests import Response
-from typing import Any
+from typing import Any, Iterator
 
 
 class Access(Enum):
@@ -96,6 +96,28 @@ class ProjectsEndpoint:
         r: Response = self._client.get("/projects", params=payload)
         return [Project(**a) for a in r.json()]
 
+    def iter_list(
+        self,
+        sort: str | None = None,
+        q: str | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Project]:
+        """Iterate over projects, fetching one page at a time.
+
+        Unlike :meth:`list`, resources are requested and constructed lazily as the
+        iterator is consumed.
+
+        Args:
+            sort: Sort string. See :meth:`list`.
+            q: Query string. See :meth:`list`.
+            page_size: Maximum number of projects requested per page.
+
+        Returns:
+            Iterator over project resources.
+        """
+        payload = asdict(sort=sort, q=q)
+        return (Project(**a) for a in self._client.paginate("/projects", payload, page_size))
+
     def get(self, id: str | None = None) -> Project:
         """Get an project.
 
@@ -17,6 +17,7 @@ from metafold.simulation.compression_simulation import (
     ExperimentSupportParallelepiped,
     ForceSource,
     ReferenceData,
+    SampledVolume,
     SimulationParameters,
     WorkflowStep,
     WorkflowStepType,
@@ -26,6 +27,15 @@ from metafold.simulation.compression_experiment import (
     ExperimentVarying,
     VaryMaterial,
     VaryMesh,
+    VaryProduct,
     VarySimulationParameter,
+    VarySimulationParameters,
+    VaryZip,
 )
+from metafold.simulation.adaptive_experiment import AdaptiveExperiment
+from metafold.simulation.experiment_results import ExperimentResults
+from metafold.simulation.local_metrics import LocalMetricsOptions, VolumeMetrics
+from metafold.simulation.local_postprocess import LocalPostprocessOptions
+from metafold.simulation.reduce_results import ReduceResultsOptions
+from metafold.simulation.result_store import ResultStore
 from metafold.simulation.run_experiment import run_experiment
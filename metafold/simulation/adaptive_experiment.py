@@ -0,0 +1,366 @@
+from typing import Any, List, Optional
+
+import numpy as np
+
+from metafold.simulation.compression_experiment import (
+    CompressionExperiment,
+    ExperimentVarying,
+    VaryMesh,
+    VaryProduct,
+    VarySimulationParameter,
+    VarySimulationParameters,
+    VaryZip,
+)
+from metafold.simulation.compression_simulation import CompressionSimulation
+from metafold.tracing import traced
+from metafold.workflows import Workflow
+
+
+def _children(varying: ExperimentVarying) -> List[ExperimentVarying]:
+    if isinstance(varying, (VaryProduct, VaryZip)):
+        return varying.varying
+    return []
+
+
+def _features(varying: ExperimentVarying, sim_index: int) -> List[float]:
+    """Numeric encoding of one candidate: parameter values as-is, anything
+    else (materials, velocity profiles) one-hot over its values."""
+    if isinstance(varying, VaryProduct):
+        return [
+            x
+            for v, i in zip(varying.varying, varying.indices(sim_index))
+            for x in _features(v, i)
+        ]
+    if isinstance(varying, VaryZip):
+        return [x for v in varying.varying for x in _features(v, sim_index)]
+    if isinstance(varying, VarySimulationParameters):
+        return [float(x) for x in varying.samples[sim_index]]
+    if isinstance(varying, VarySimulationParameter) and all(
+        isinstance(x, (int, float)) for x in varying.values
+    ):
+        return [float(varying.values[sim_index])]
+    one_hot = [0.0] * varying.sim_count
+    one_hot[sim_index] = 1.0
+    return one_hot
+
+
+class _Surrogate:
+    """Gaussian process regression with a squared exponential kernel, on
+    features scaled to [0, 1]. Cheap for the few dozen points an adaptive
+    experiment evaluates."""
+
+    def __init__(self, length_scale: float = 0.3, noise: float = 1e-6):
+        self.length_scale = length_scale
+        self.noise = noise
+
+    def _kernel(self, a: np.ndarray, b: np.ndarray) -> np.ndarray:
+        d2 = np.sum((a[:, None, :] - b[None, :, :]) ** 2, axis=-1)
+        return np.exp(-0.5 * d2 / self.length_scale**2)
+
+    def fit(self, x: np.ndarray, y: np.ndarray) -> "_Surrogate":
+        self._x = x
+        self._mean = float(np.mean(y))
+        self._scale = float(np.std(y)) or 1.0
+        k = self._kernel(x, x) + self.noise * np.eye(len(x))
+        self._chol = np.linalg.cholesky(k)
+        z = np.linalg.solve(self._chol, (y - self._mean) / self._scale)
+        self._alpha = np.linalg.solve(self._chol.T, z)
+        return self
+
+    def predict(self, x: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Posterior mean and standard deviation at x."""
+        ks = self._kernel(x, self._x)
+        mean = ks @ self._alpha
+        v = np.linalg.solve(self._chol, ks.T)
+        var = np.clip(1.0 - np.sum(v**2, axis=0), 0.0, None)
+        return mean * self._scale + self._mean, np.sqrt(var) * self._scale
+
+
+class AdaptiveExperiment(CompressionExperiment):
+    """Explore a pool of candidate variants in batches, choosing each batch
+    from the results of the previous ones.
+
+    The candidate pool is defined by varyings, as for CompressionExperiment
+    (e.g. a VaryProduct of VaryMaterial and VarySimulationParameter grids),
+    but variants are only cloned and dispatched when picked. After each batch
+    the scalar results (energyAbsorbed, loadingEnergy, unloadingEnergy,
+    volume) are read back from the energy-metrics job, a Gaussian process
+    surrogate of `metric` is fitted over the candidates, and the next batch is
+    picked by lower confidence bound: candidates predicted to be close to
+    `target` (or, without a target, highest), favouring ones the surrogate is
+    unsure about by `exploration` standard deviations.
+
+    Stops once `budget` simulations have run, when a result is within the
+    relative `tolerance` of `target`, or after `patience` batches without
+    improvement. Evaluated variants are kept in `history`, see `best`.
+
+    Meshes are sampled once up front, so VaryMesh candidates are not
+    supported; sweep meshes with CompressionExperiment.
+    """
+
+    history: List[dict]
+    _features: np.ndarray
+
+    def __init__(
+        self,
+        simulation: CompressionSimulation,
+        varying: List[ExperimentVarying],
+        target: Optional[float] = None,
+        metric: str = "energyAbsorbed",
+        budget: int = 20,
+        batch_size: int = 4,
+        initial_batch_size: Optional[int] = None,
+        tolerance: float = 0.02,
+        patience: Optional[int] = 2,
+        exploration: float = 1.0,
+        seed: Optional[int] = None,
+        auto_run: bool = True,
+        auto_download_results: bool = True,
+        auto_upload_server_manifest: bool = True,
+        **kwargs: Any,
+    ):
+        super().__init__(simulation, varying, auto_run=False, **kwargs)
+        if any(isinstance(v, VaryMesh) for v in self._walk(varying)):
+            raise ValueError(
+                "AdaptiveExperiment can't vary meshes, use CompressionExperiment"
+            )
+        self.target = target
+        self.metric = metric
+        self.budget = budget
+        self.batch_size = batch_size
+        self.initial_batch_size = initial_batch_size or batch_size
+        self.tolerance = tolerance
+        self.patience = patience
+        self.exploration = exploration
+        self._rng = np.random.default_rng(seed)
+        # One entry per evaluated variant: sim_index, name, values (scalar
+        # results, None if the simulation failed) and objective (lower is
+        # better, None if failed).
+        self.history = []
+
+        if auto_run:
+            self.prepare()
+            self.run(auto_upload_server_manifest)
+            if auto_download_results:
+                self.download_results()
+
+    @classmethod
+    def _walk(cls, varying: List[ExperimentVarying]):
+        for v in varying:
+            yield v
+            yield from cls._walk(_children(v))
+
+    @property
+    def best(self) -> Optional[dict]:
+        """History entry with the lowest objective."""
+        evaluated = [h for h in self.history if h["objective"] is not None]
+        return min(evaluated, key=lambda h: h["objective"], default=None)
+
+    def _candidate_features(self) -> np.ndarray:
+        """Feature matrix of the whole pool, columns scaled to [0, 1]."""
+        x = np.array(
+            [
+                [f for v in self.varying for f in _features(v, i)]
+                for i in range(self.sim_count)
+            ],
+            dtype=np.float64,
+        ).reshape(self.sim_count, -1)
+        lo, hi = x.min(axis=0), x.max(axis=0)
+        span = np.where(hi > lo, hi - lo, 1.0)
+        return (x - lo) / span
+
+    def _objective(self, value: float) -> float:
+        if self.target is None:
+            return -value
+        return abs(value - self.target) / (abs(self.target) or 1.0)
+
+    def _acquisition(self, mean: np.ndarray, std: np.ndarray) -> np.ndarray:
+        if self.target is None:
+            return -(mean + self.exploration * std)
+        return np.abs(mean - self.target) - self.exploration * std
+
+    def _next_batch(self, n: int) -> List[int]:
+        tried = {h["sim_index"] for h in self.history}
+        pending = [i for i in range(self.sim_count) if i not in tried]
+        if not pending:
+            return []
+        x = self._features
+        observed = [
+            (h["sim_index"], h["values"][self.metric])
+            for h in self.history
+            if h["values"] and self.metric in h["values"]
+        ]
+        batch: List[int] = []
+        if not observed:
+            # Nothing to model yet: spread the batch over the pool
+            batch.append(pending.pop(int(self._rng.integers(len(pending)))))
+            while pending and len(batch) < n:
+                d = np.min(
+                    np.linalg.norm(x[pending][:, None] - x[batch][None], axis=-1),
+                    axis=1,
+                )
+                batch.append(pending.pop(int(np.argmax(d))))
+            return batch
+
+        x_obs = x[[i for i, _ in observed]]
+        y_obs = np.array([y for _, y in observed], dtype=np.float64)
+        surrogate = _Surrogate()
+        while pending and len(batch) < n:
+            mean, std = surrogate.fit(x_obs, y_obs).predict(x[pending])
+            k = int(np.argmin(self._acquisition(mean, std)))
+            batch.append(pending.pop(k))
+            # Assume the prediction for the picked candidate so the rest of
+            # the batch explores elsewhere
+            x_obs = np.vstack([x_obs, x[batch[-1]]])
+            y_obs = np.append(y_obs, mean[k])
+        return batch
+
+    def _read_scalars(
+        self, sim: CompressionSimulation, workflow: Workflow
+    ) -> dict[str, float]:
+        """Resolve the scalar result fields of the server manifest (job output
+        refs) to values."""
+        lookup = sim._build_job_id_lookup(workflow)
+        scalars = sim._build_server_scalars_for_workflow(workflow, lookup)
+        job_params: dict[str, dict] = {}
+        values: dict[str, float] = {}
+        for key, scalar in scalars.items():
+            if not isinstance(scalar, dict):
+                values[key] = float(scalar)
+                continue
+            job_id = scalar["jobId"]
+            if not job_id:
+                continue
+            if job_id not in job_params:
+                job = sim.client.jobs.get(job_id, project_id=workflow.project_id)
+                job_params[job_id] = job.outputs.params or {}
+            raw = job_params[job_id].get(scalar["outputParam"])
+            if raw is not None:
+                values[key] = float(raw)
+        return values
+
+    def _evaluate(self, sim: CompressionSimulation) -> Optional[dict[str, float]]:
+        assert sim.workflow is not None
+        workflow = sim._wait_for_workflow(sim.workflow)
+        if workflow.state != "success":
+            print(
+                f"WARNING: {sim.simulation_name} finished with state "
+                f"'{workflow.state}', excluded from the surrogate"
+            )
+            return None
+        return self._read_scalars(sim, workflow)
+
+    def _record(self, sim_index: int, sim: CompressionSimulation, values):
+        value = (values or {}).get(self.metric)
+        if values is not None and value is None:
+            print(
+                f"WARNING: no {self.metric} for {sim.simulation_name}, "
+                "is the energy_metrics step enabled?"
+            )
+        self.history.append({
+            "sim_index": sim_index,
+            "name": sim.simulation_name,
+            "values": values,
+            "objective": self._objective(value) if value is not None else None,
+        })
+
+    def _target_reached(self) -> bool:
+        best = self.best
+        return (
+            self.target is not None
+            and best is not None
+            and best["objective"] <= self.tolerance
+        )
+
+    @traced("experiment.prepare")
+    def prepare(self):
+        self._log("=== PREPARE ADAPTIVE EXPERIMENT ===")
+
+        if self.force_rerun:
+            self._log("Clearing saved state.")
+            self._clear_saved_state()
+        elif self._experiment_state_filename.is_file():
+            self._log(
+                "Experiment already run — skipping prepare. Use force_rerun=True to redo."
+            )
+            self._rebuild_sims_from_state()
+            return
+
+        # Candidates only vary materials and parameters, so every variant
+        # shares the base meshes: prep them once, clones inherit the volumes.
+        self.experiment_part_infos = []
+        self.sims = []
+        self.history = []
+        part_infos = self.base_simulation.part_infos
+        self._log(f"Uploading assets ({len(part_infos)} part(s))...")
+        self.base_simulation.populate_assets(part_infos)
+        self._log("Sampling assets...")
+        self.base_simulation.sample_assets(part_infos)
+        self._log("Collecting sampled volumes...")
+        self.base_simulation.collect_sampled_volumes(part_infos)
+        self._features = self._candidate_features()
+        self._log(f"Prepare complete, {self.sim_count} candidate(s).")
+
+    @traced("experiment.run")
+    def run(self, upload_server_manifest: bool = False):
+        self._log("=== RUN ADAPTIVE EXPERIMENT ===")
+
+        if self.sims and not self.history:
+            # Rebuilt from saved state in prepare
+            self._log("Experiment already run. Use force_rerun=True to redo.")
+            if upload_server_manifest:
+                self.upload_server_manifest()
+            return
+
+        dispatched: dict[str, CompressionSimulation] = {}
+        stale = 0
+        while len(self.history) < self.budget:
+            n = self.batch_size if self.history else self.initial_batch_size
+            batch = self._next_batch(min(n, self.budget - len(self.history)))
+            if not batch:
+                self._log("All candidates evaluated.")
+                break
+
+            previous = self.best
+            sims: List[CompressionSimulation] = []
+            for sim_index in batch:
+                local_sim = self._clone_sim(sim_index)
+                for v in self.varying:
+                    v.apply_to(sim_index, local_sim)
+                self._log(
+                    f"  [{len(self.history) + len(sims) + 1}/{self.budget}] "
+                    f"Running {local_sim.simulation_name}"
+                )
+                self._dispatch(sim_index, local_sim, dispatched)
+                self.sims.append(local_sim)
+                sims.append(local_sim)
+            self._save_experiment_state()
+
+            self._log(f"Waiting for {len(batch)} simulation(s)...")
+            for sim_index, local_sim in zip(batch, sims):
+                self._record(sim_index, local_sim, self._evaluate(local_sim))
+
+            best = self.best
+            if best is not None:
+                self._log(
+                    f"Best so far: {best['name']} "
+                    f"({self.metric}={best['values'][self.metric]:g})"
+                )
+            if self._target_reached():
+                self._log("Target reached.")
+                break
+            if best is None or (
+                previous is not None
+                and not best["objective"] < previous["objective"]
+            ):
+                stale += 1
+                if self.patience is not None and stale >= self.patience:
+                    self._log(f"No improvement in {stale} batch(es), stopping.")
+                    break
+            else:
+                stale = 0
+
+        self._log(f"Ran {len(self.history)} of {self.sim_count} candidate(s).")
+
+        if upload_server_manifest:
+            self.upload_server_manifest()
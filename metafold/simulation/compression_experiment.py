@@ -1,13 +1,17 @@
 import copy
 import json
-from typing import Any, List, Optional, Union, cast
+import math
+from typing import Any, Callable, List, Optional, Sequence, Union, cast
 import glob
 from pathlib import Path
+import numpy as np
 from metafold.simulation.compression_simulation import (
     CompressionSimulation,
     ExperimentMesh,
 )
+from metafold.simulation.experiment_results import ExperimentResults
 from metafold.materials import Material
+from metafold.tracing import Tracer, traced
 from metafold.utils import natural_sort
 from zipfile import ZipFile
 
@@ -15,9 +19,27 @@ from zipfile import ZipFile
 class ExperimentVarying:
     sim_count: int = 0
 
+    @property
+    def part_names(self) -> List[str]:
+        """Names of the parts this varying modifies. Their part infos are
+        forked for every variant."""
+        part_name = getattr(self, "part_name", None)
+        return [part_name] if part_name is not None else []
+
     def resolve(self, _base_dir: Path) -> None:
         raise NotImplementedError
 
+    def apply_to(self, sim_index: int, sim: CompressionSimulation) -> None:
+        raise NotImplementedError
+
+
+def _set_field(obj: Any, field_path: str, value: Any) -> None:
+    """Set a dotted attribute path, e.g. "constitutive_model.params.he_PR"."""
+    parts = field_path.split(".")
+    for p in parts[:-1]:
+        obj = getattr(obj, p)
+    setattr(obj, parts[-1], value)
+
 
 class VaryMesh(ExperimentVarying):
     part_name: str
@@ -99,11 +121,153 @@ class VarySimulationParameter(ExperimentVarying):
         self.sim_count = len(self.values)
 
     def apply_to(self, sim_index: int, sim: CompressionSimulation):
-        parts = self.field_path.split(".")
-        obj = sim.simulation_parameters
-        for p in parts[:-1]:
-            obj = getattr(obj, p)
-        setattr(obj, parts[-1], self.values[sim_index])
+        _set_field(sim.simulation_parameters, self.field_path, self.values[sim_index])
+
+
+class VarySimulationParameters(ExperimentVarying):
+    """Vary several simulation parameters jointly, one sampled point of their
+    ranges per variant. Build with latin_hypercube() or sobol() to cover a
+    design space with far fewer variants than a full grid."""
+
+    field_paths: List[str]
+    samples: np.ndarray
+
+    def __init__(self, field_paths: List[str], samples: np.ndarray):
+        """samples has one row per variant and one column per field path."""
+        samples = np.asarray(samples)
+        if samples.ndim != 2 or samples.shape[1] != len(field_paths):
+            raise ValueError(
+                f"samples must have shape (n, {len(field_paths)}), got {samples.shape}"
+            )
+        self.field_paths = field_paths
+        self.samples = samples
+        # Integer ranges (e.g. max_resolution) get integer values
+        self._integer = [False] * len(field_paths)
+
+    def resolve(self, _base_dir: Path) -> None:
+        self.sim_count = len(self.samples)
+
+    def apply_to(self, sim_index: int, sim: CompressionSimulation):
+        for field_path, value, integer in zip(
+            self.field_paths, self.samples[sim_index], self._integer
+        ):
+            _set_field(
+                sim.simulation_parameters,
+                field_path,
+                int(round(value)) if integer else float(value),
+            )
+
+    @classmethod
+    def latin_hypercube(
+        cls, ranges: dict[str, Sequence[float]], n: int, seed: Optional[int] = None
+    ):
+        """Latin hypercube sample of n points: every range is split into n
+        strata and each stratum is used exactly once.
+
+        ranges maps field paths to (low, high) bounds.
+        """
+        from scipy.stats import qmc  # type: ignore
+
+        sampler = qmc.LatinHypercube(d=len(ranges), seed=seed)
+        return cls._scaled(ranges, sampler.random(n))
+
+    @classmethod
+    def sobol(
+        cls, ranges: dict[str, Sequence[float]], n: int, seed: Optional[int] = None
+    ):
+        """First n points of a scrambled Sobol sequence over the ranges. Any
+        prefix of the sequence is space-filling, so n need not be planned up
+        front (powers of two are best balanced).
+
+        ranges maps field paths to (low, high) bounds.
+        """
+        from scipy.stats import qmc  # type: ignore
+
+        sampler = qmc.Sobol(d=len(ranges), scramble=True, seed=seed)
+        m = max(0, math.ceil(math.log2(max(n, 1))))
+        return cls._scaled(ranges, sampler.random_base2(m)[:n])
+
+    @classmethod
+    def _scaled(cls, ranges: dict[str, Sequence[float]], unit: np.ndarray):
+        from scipy.stats import qmc  # type: ignore
+
+        for field_path, bounds in ranges.items():
+            if len(bounds) != 2 or not bounds[0] < bounds[1]:
+                raise ValueError(
+                    f"range for {field_path!r} must be (low, high), got {bounds!r}"
+                )
+        lows = [bounds[0] for bounds in ranges.values()]
+        highs = [bounds[1] for bounds in ranges.values()]
+        varying = cls(list(ranges), qmc.scale(unit, lows, highs))
+        varying._integer = [
+            isinstance(lo, int) and isinstance(hi, int) for lo, hi in zip(lows, highs)
+        ]
+        return varying
+
+
+class VaryProduct(ExperimentVarying):
+    """Cartesian product of varyings: one variant per combination of their
+    values, the last varying changing fastest (like itertools.product).
+
+    Combinations are decoded from the sim index when applied, so a
+    5 materials x 4 velocities x 3 meshes grid is three short lists rather
+    than 60-element ones.
+    """
+
+    varying: List[ExperimentVarying]
+
+    def __init__(self, *varying: ExperimentVarying):
+        self.varying = list(varying)
+
+    @property
+    def part_names(self) -> List[str]:
+        return [name for v in self.varying for name in v.part_names]
+
+    def resolve(self, base_dir: Path) -> None:
+        for v in self.varying:
+            v.resolve(base_dir)
+        self.sim_count = math.prod(v.sim_count for v in self.varying)
+
+    def indices(self, sim_index: int) -> List[int]:
+        """Index into each varying for the variant at sim_index."""
+        indices = []
+        for v in reversed(self.varying):
+            sim_index, i = divmod(sim_index, v.sim_count)
+            indices.append(i)
+        return indices[::-1]
+
+    def apply_to(self, sim_index: int, sim: CompressionSimulation):
+        for v, i in zip(self.varying, self.indices(sim_index)):
+            v.apply_to(i, sim)
+
+
+class VaryZip(ExperimentVarying):
+    """Varyings applied index-wise, e.g. to pair each mesh with its own
+    material inside a VaryProduct. All must have the same number of values."""
+
+    varying: List[ExperimentVarying]
+
+    def __init__(self, *varying: ExperimentVarying):
+        self.varying = list(varying)
+
+    @property
+    def part_names(self) -> List[str]:
+        return [name for v in self.varying for name in v.part_names]
+
+    def resolve(self, base_dir: Path) -> None:
+        for v in self.varying:
+            v.resolve(base_dir)
+        counts = {v.sim_count for v in self.varying}
+        if len(counts) > 1:
+            raise ValueError(
+                "All zipped varying entries must have the same number of values, "
+                f"got counts: {sorted(counts)}"
+            )
+        self.sim_count = counts.pop() if counts else 1
+
+    def apply_to(self, sim_index: int, sim: CompressionSimulation):
+        for v in self.varying:
+            v.apply_to(sim_index, sim)
 
 
 class VaryVelocity(ExperimentVarying):
@@ -160,6 +324,7 @@ class CompressionExperiment:
         use_legacy_results_format: bool = False,
         write_ups: bool = True,
         simulation_names: Optional[List[str]] = None,
+        priority: Optional[Callable[[int, CompressionSimulation], float]] = None,
     ):
         simulation.use_legacy_results_format = use_legacy_results_format
         simulation.write_ups = write_ups
@@ -169,14 +334,18 @@ class CompressionExperiment:
         # Optional per-simulation display names (index-aligned). A blank/missing
         # entry falls back to the auto "<base>_sim<index>" name.
         self.simulation_names = simulation_names or []
+        # Optional priority(sim_index, sim) -> float. Higher-priority variants
+        # are dispatched first, ties keep index order.
+        self.priority = priority
         self.verbose = verbose
         self.force_rerun = force_rerun
         self.varying_part_names = []
         for v in self.varying:
             assert self.base_simulation.stl_folder is not None
             v.resolve(self.base_simulation.stl_folder)
-            if hasattr(v, "part_name"):
-                self.varying_part_names.append(v.part_name)
+            for part_name in v.part_names:
+                if part_name not in self.varying_part_names:
+                    self.varying_part_names.append(part_name)
 
         # Every varying must produce the same number of variants — prepare()
         # sizes the sim loop from one of them and indexes into all of them.
@@ -195,6 +364,10 @@ class CompressionExperiment:
             if auto_download_results:
                 self.download_results()
 
+    @property
+    def sim_count(self) -> int:
+        return self.varying[0].sim_count if self.varying else 1
+
     def _sim_name(self, sim_index: int) -> str:
         """Name for the sim at sim_index: the caller-supplied name when present,
         otherwise the auto "<base>_sim<index>" name."""
@@ -223,8 +396,7 @@ class CompressionExperiment:
                     f"simulation name {name!r} contains a path separator"
                 )
 
-        sim_count = self.varying[0].sim_count if self.varying else 1
-        resolved = [self._sim_name(i) for i in range(sim_count)]
+        resolved = [self._sim_name(i) for i in range(self.sim_count)]
         duplicates = {n for n in resolved if resolved.count(n) > 1}
         if duplicates:
             raise ValueError(
@@ -273,41 +445,77 @@ class CompressionExperiment:
         with open(self._experiment_state_filename) as f:
             return json.load(f)
 
+    @property
+    def tracer(self) -> Tracer:
+        return self.base_simulation.tracer
+
     def _log(self, msg: str):
         if self.verbose:
             print(f"[experiment] {msg}")
 
     def _clone_sim(self, sim_index: int):
-        # do a deep copy but without the part infos
-        base_part_infos = self.base_simulation.part_infos
-        self.base_simulation.part_infos = []
-        clone = copy.deepcopy(self.base_simulation)
-        self.base_simulation.part_infos = base_part_infos
-
-        # give each sim a unique name so zip paths don't collide
-        clone.simulation_name = self._sim_name(sim_index)
-
-        # ok now for the part infos we want to do something different, we want to keep shared elements the same but fork
-        # the part infos which we are varying, that way we dont mess up other copies when experiments vary things
-        # but we also dont duplicate parts that are commmon
-        clone.part_infos = copy.copy(base_part_infos)
+        # Variants share the base simulation's client and invariant part
+        # infos; only the varying parts are forked, so changing them doesn't
+        # touch other variants. Unique names keep their jobs apart.
+        clone = self.base_simulation.fork(
+            self._sim_name(sim_index),
+            {name: f"{name}_{sim_index}" for name in self.varying_part_names},
+        )
         for forked_part_name in self.varying_part_names:
-            part_info = clone.get_part_info(forked_part_name)
-            new_part_info = copy.deepcopy(part_info)
-            new_part_info.part_unique_name = f"{forked_part_name}_{sim_index}"
-            # replace the part info in the cloned simualtion
-            clone.part_infos[clone.part_infos.index(part_info)] = new_part_info
-            self.experiment_part_infos.append(new_part_info)
+            self.experiment_part_infos.append(clone.get_part_info(forked_part_name))
 
         # now that the name has changed and everything is set up, reload its persisted results (if any)
         clone.reload_results()
         return clone
 
+    # PartInfo fields filled in by populate_assets, sample_assets and
+    # collect_sampled_volumes.
+    _PREP_FIELDS = (
+        "asset",
+        "bounds",
+        "preprocessed_filename",
+        "bvh_filename",
+        "sample_resolution",
+        "volume_filename",
+        "volume_checksum",
+        "volume_asset_id",
+        "interior_volume",
+    )
+
+    @staticmethod
+    def _prep_key(part_info) -> Any:
+        """Part infos with equal keys sample to the same volume: the same mesh
+        file for the same part. Only one of them is prepped."""
+        if part_info.file_path is None:
+            return id(part_info)
+        return (part_info.part.name, str(part_info.file_path))
+
+    def _unique_prep_part_infos(self) -> list:
+        unique: dict[Any, Any] = {}
+        for part_info in self.experiment_part_infos:
+            unique.setdefault(self._prep_key(part_info), part_info)
+        return list(unique.values())
+
+    def _share_prep_outputs(self, prepped: list):
+        """Copy prep outputs from each prepped part info to the forks that
+        share its mesh."""
+        by_key = {self._prep_key(p): p for p in prepped}
+        for part_info in self.experiment_part_infos:
+            source = by_key[self._prep_key(part_info)]
+            if source is part_info:
+                continue
+            for name in self._PREP_FIELDS:
+                setattr(part_info, name, getattr(source, name))
+            part_info.patch = dict(source.patch)
+            # Main-workflow jobs are added per part info later, copy
+            part_info.jobs = dict(source.jobs)
+
     def _populate_invariant_part_infos(self):
         for part_info in self.base_simulation.part_infos:
             if part_info.part.name not in self.varying_part_names:
                 self.experiment_part_infos.append(part_info)
 
+    @traced("experiment.prepare")
     def prepare(self):
         self._log("=== PREPARE EXPERIMENT ===")
 
@@ -324,7 +532,7 @@ class CompressionExperiment:
         self.experiment_part_infos = []
         self._populate_invariant_part_infos()
 
-        sim_count = self.varying[0].sim_count if self.varying else 1
+        sim_count = self.sim_count
         self._log(f"Creating {sim_count} simulation variant(s)...")
         self.sims = []
         for sim_index in range(sim_count):
@@ -334,18 +542,23 @@ class CompressionExperiment:
                 v.apply_to(sim_index, local_sim)
             self.sims.append(local_sim)
 
-        self._log(f"Uploading assets ({len(self.experiment_part_infos)} part(s))...")
-        self.base_simulation.populate_assets(self.experiment_part_infos)
+        # Variants repeating a mesh (e.g. a product of meshes and materials)
+        # share its upload and sampled volume.
+        prep_part_infos = self._unique_prep_part_infos()
+        self._log(f"Uploading assets ({len(prep_part_infos)} unique part(s))...")
+        self.base_simulation.populate_assets(prep_part_infos)
         self._log("Sampling assets...")
-        self.base_simulation.sample_assets(self.experiment_part_infos)
-        # Clones were deep-copied before sampling, so copy over the spacing that
+        self.base_simulation.sample_assets(prep_part_infos)
+        # Clones were forked before sampling, so copy over the spacing that
         # was anchored during sampling — each clone's grid must match it.
         for local_sim in self.sims:
             local_sim.sample_spacing = self.base_simulation.sample_spacing
         self._log("Collecting sampled volumes...")
-        self.base_simulation.collect_sampled_volumes(self.experiment_part_infos)
+        self.base_simulation.collect_sampled_volumes(prep_part_infos)
+        self._share_prep_outputs(prep_part_infos)
         self._log("Prepare complete.")
 
+    @traced("experiment.run")
     def run(self, upload_server_manifest: bool = False):
         self._log("=== RUN EXPERIMENT ===")
 
@@ -364,14 +577,13 @@ class CompressionExperiment:
                     self.upload_server_manifest()
                 return
 
-        for sim_index, local_sim in enumerate(self.sims):
+        dispatched: dict[str, CompressionSimulation] = {}
+        for sim_index in self._dispatch_order():
+            local_sim = self.sims[sim_index]
             self._log(
                 f"  [{sim_index + 1}/{len(self.sims)}] Running {local_sim.simulation_name}"
             )
-            name_suffix = f"_sim{sim_index}"
-            local_sim.create_sim_config(name_suffix)
-            local_sim.build_workflow(name_suffix)
-            local_sim.run_workflow(name_suffix)
+            self._dispatch(sim_index, local_sim, dispatched)
 
         self._save_experiment_state()
         self._log("All workflows dispatched.")
@@ -379,10 +591,56 @@ class CompressionExperiment:
         if upload_server_manifest:
             self.upload_server_manifest()
 
+    def _dispatch(
+        self,
+        sim_index: int,
+        local_sim: CompressionSimulation,
+        dispatched: dict[str, CompressionSimulation],
+    ):
+        """Build and dispatch one variant's workflow.
+
+        Variants that collapse to the same workflow (repeated presets, sweeps
+        over values that don't change the UPS) are dispatched once and the
+        result is shared by every variant name. dispatched maps fingerprints
+        to the sims that own their workflow, and is updated in place.
+        """
+        name_suffix = f"_sim{sim_index}"
+        local_sim.create_sim_config(name_suffix)
+        local_sim.build_workflow(name_suffix)
+        fingerprint = local_sim.fingerprint()
+        original = dispatched.get(fingerprint)
+        if original is not None:
+            assert original.workflow is not None
+            self._log(
+                f"    Identical to {original.simulation_name}, reusing its workflow"
+            )
+            local_sim.reuse_workflow(
+                original.workflow,
+                name_suffix,
+                {i.part.name: i.part_unique_name for i in original.part_infos},
+            )
+            return
+        local_sim.run_workflow(name_suffix)
+        dispatched[fingerprint] = local_sim
+
+    def _dispatch_order(self) -> List[int]:
+        order = list(range(len(self.sims)))
+        if self.priority is None:
+            return order
+        priorities = [self.priority(i, sim) for i, sim in enumerate(self.sims)]
+        return sorted(order, key=lambda i: -priorities[i])
+
     def cancel(self):
         self._log("=== CANCEL EXPERIMENT ===")
         self.base_simulation.cancel()
+        canceled = set()
         for local_sim in self.sims:
+            # Identical variants share a workflow, only cancel it once
+            if local_sim.workflow is not None and local_sim.workflow.id in canceled:
+                local_sim.workflow = None
+                continue
+            if local_sim.workflow is not None:
+                canceled.add(local_sim.workflow.id)
             local_sim.cancel()
         self._log("All workflows canceled.")
 
@@ -406,7 +664,13 @@ class CompressionExperiment:
             local_sim.reload_results()
             self.sims.append(local_sim)
 
-    def download_results(self):
+    @traced("experiment.download_results")
+    def download_results(self) -> Optional[ExperimentResults]:
+        """Write the results of all variants to out.zip.
+
+        Returns:
+            The written results, None if there are no sims to collect.
+        """
         self._log("=== DOWNLOAD RESULTS ===")
 
         if not self.sims:
@@ -414,8 +678,9 @@ class CompressionExperiment:
             self._rebuild_sims_from_state()
             if not self.sims:
                 print("No experiment state found — run prepare() and run() first.")
-                return
+                return None
 
+        assert self.base_simulation.out_dir is not None
         zip_filename = self.base_simulation.out_dir / "out.zip"
         with ZipFile(zip_filename, "w") as zf:
             all_results = []
@@ -436,11 +701,13 @@ class CompressionExperiment:
                 self.base_simulation._write_manifest_to_zip(zf, all_results)
 
         print(f"Experiment complete. Results written to: {zip_filename}")
+        return ExperimentResults(zip_filename)
 
     @property
     def server_manifest_filename(self) -> Path:
         return self.base_simulation.server_manifest_filename
 
+    @traced("experiment.write_server_manifest")
     def write_server_manifest(self):
         """Build and write a combined server manifest across all sub-sims."""
         self._log("=== WRITE SERVER MANIFEST ===")
@@ -453,10 +720,13 @@ class CompressionExperiment:
         pairs = [(s, r) for s in self.sims for r in s.results]
         return self.base_simulation._write_server_manifest_for_pairs(pairs)
 
-    def upload_server_manifest(self) -> None:
-        """Build, write, and set the combined experiment server manifest as project data."""
+    def upload_server_manifest(self, revalidate: bool = False) -> None:
+        """Build, write, and set the combined experiment server manifest as project data.
+
+        Args:
+            revalidate: See CompressionSimulation.upload_server_manifest.
+        """
         manifest = self.write_server_manifest()
         if manifest is None:
             return
-        self.base_simulation.client.projects.update(data=manifest)
-        print(f"Uploaded server manifest to project {self.base_simulation.project_id}")
+        self.base_simulation._upload_server_manifest(manifest, revalidate)
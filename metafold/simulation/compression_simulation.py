@@ -1,39 +1,34 @@
+from __future__ import annotations
 import copy
 from dataclasses import dataclass, field
 from enum import Enum
 from shutil import copyfileobj
-from typing import Any, Optional, Union
+from functools import partial
+from typing import TYPE_CHECKING, Any, Callable, Optional, Union
 from io import BytesIO
+import hashlib
 import uuid
 
 from requests import HTTPError
-import yaml
-from dotenv import load_dotenv  # type: ignore
-from metafold import MetafoldClient
+from metafold import MetafoldClient, ResponseCache
 from pathlib import Path
-from numpy.typing import DTypeLike
-from simulation_configurator import (
-    Simulation,
-    Grid,
-    BoundaryConditions,
-    GeometryStore,
-    Archive,
-    Contact,
-    Mpm,
-)
-from simulation_configurator.element import CompositeElement, Element
-from simulation_configurator.grid import Face
-from simulation_configurator.shapes import Box, File, Cylinder, Parallelepiped
-from plyfile import PlyData, PlyElement
 from tempfile import TemporaryDirectory
 from time import sleep
-from xml.etree import ElementTree
 from zipfile import ZipFile
 import json
 import numpy as np
 import os
-import pandas as pd
+import re
+
+# pandas, plyfile, yaml, dotenv and simulation_configurator are imported where
+# they are used: callers that only build or validate parts should not pay for
+# them at import time.
+if TYPE_CHECKING:
+    from numpy.typing import DTypeLike
+    from xml.etree import ElementTree
+    import pandas as pd
 
+from metafold.api import FINAL_STATES
 from metafold.assets import Asset
 from metafold.materials import (
     DEFAULT_PISTON_MATERIAL,
@@ -41,7 +36,28 @@ from metafold.materials import (
     Material,
 )
 from metafold.projects import Access, ProjectType
-from metafold.utils import sha256_file
+from metafold.simulation.local_metrics import (
+    LocalMetricsOptions,
+    VolumeMetrics,
+    volume_metrics,
+)
+from metafold.simulation.local_postprocess import (
+    SOURCES as LOCAL_POSTPROCESS_SOURCES,
+    LocalPostprocessOptions,
+    postprocess_hdf,
+)
+from metafold.simulation.parquet_export import DEFAULT_CHUNK_ROWS, ParquetResultsWriter
+from metafold.simulation.reduce_results import (
+    ReduceResultsOptions,
+    add_lod_levels,
+    lod_ids,
+    lod_key,
+    read_reduced,
+    reduce_hdf,
+)
+from metafold.simulation.result_store import ResultStore
+from metafold.tracing import Tracer, traced
+from metafold.utils import ChecksumCache, sha256_files
 from metafold.workflows import Workflow
 
 
@@ -100,6 +116,8 @@ def _velocity_neumann_face(side: str):
     # simulation_configurator.Face only provides fixed (symmetry) and unfixed
     # (velocity Dirichlet) faces; build the Neumann variant here until it can
     # move into a simulation-configurator release.
+    from simulation_configurator.element import CompositeElement, Element
+
     face = CompositeElement("Face", {"side": side})
     bc_type = CompositeElement(
         "BCType",
@@ -110,11 +128,14 @@ def _velocity_neumann_face(side: str):
     return face
 
 
-_FACE_BUILDERS = {
-    BoundaryCondition.SYMMETRIC: Face.fixed,
-    BoundaryCondition.VELOCITY_DIRICHLET: Face.unfixed,
-    BoundaryCondition.VELOCITY_NEUMANN: _velocity_neumann_face,
-}
+def _face_builder(bc: BoundaryCondition):
+    from simulation_configurator.grid import Face
+
+    return {
+        BoundaryCondition.SYMMETRIC: Face.fixed,
+        BoundaryCondition.VELOCITY_DIRICHLET: Face.unfixed,
+        BoundaryCondition.VELOCITY_NEUMANN: _velocity_neumann_face,
+    }[bc]
 
 
 def _normalize_boundary_conditions(
@@ -332,6 +353,34 @@ def validate_simulation_parts(parts: list) -> None:
         )
 
 
+@dataclass
+class SampledVolume:
+    """Volume sampled for a part by the prep workflow.
+
+    Samples span the patch box, corners included: data[k, j, i] is the value
+    at offset + (i, j, k) * spacing. Lengths are in mm, like PartInfo.patch.
+    """
+
+    data: np.ndarray
+    size: np.ndarray
+    offset: np.ndarray
+
+    @property
+    def resolution(self) -> tuple[int, int, int]:
+        """Number of samples along x, y and z."""
+        nz, ny, nx = self.data.shape
+        return nx, ny, nz
+
+    @property
+    def spacing(self) -> np.ndarray:
+        """Distance between samples along x, y and z."""
+        return self.size / np.maximum(np.array(self.resolution) - 1, 1)
+
+    def coordinates(self, axis: int) -> np.ndarray:
+        """Sample positions along an axis (0 for x)."""
+        return self.offset[axis] + np.arange(self.resolution[axis]) * self.spacing[axis]
+
+
 @dataclass
 class ReferenceData:
     csv_path: Path = Path("")
@@ -341,6 +390,27 @@ class ReferenceData:
     energy_absorbed = 5.06
     volume = 853000.0
 
+    def read_curve(self) -> Optional[pd.DataFrame]:
+        """Read the reference force-displacement curve from the CSV.
+
+        Returns:
+            Frame with "displacement" and "force" columns, matched case
+            insensitively in the CSV. None if the CSV lacks either.
+        """
+        import pandas as pd
+
+        df = pd.read_csv(self.csv_path)
+        # Normalize column names to what the viewer expects.
+        rename_map = {}
+        for col in df.columns:
+            lower = col.lower()
+            if lower in ("displacement", "force"):
+                rename_map[col] = lower
+        df = df.rename(columns=rename_map)
+        if "displacement" not in df.columns or "force" not in df.columns:
+            return None
+        return df[["displacement", "force"]]
+
 
 class WorkflowStepType(Enum):
     COMPUTE_BVH = "compute_bvh"
@@ -376,6 +446,124 @@ class WorkflowStep:
             )
 
 
+# Local processing stages are traced per simulation variant
+_traced = partial(traced, simulation="simulation_name")
+
+
+class _UpsTemplates:
+    """UPS templates by template key, shared by a simulation and its forks.
+
+    A template is the serialized UPS built with placeholder names
+    ("{{simulation}}", "{{suffix}}", "{{part<i>}}"); each variant is rendered
+    by substituting its own names. The first variant of a key is built
+    directly as well and checked against its render, if simulation_configurator
+    doesn't pass the names through verbatim every variant of that key is built
+    directly.
+    """
+
+    _PLACEHOLDER = re.compile(r"\{\{(\w+)\}\}")
+
+    def __init__(self) -> None:
+        # Template and whether it rendered the first variant verbatim, by key
+        self._templates: dict[str, tuple[str, bool]] = {}
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "_UpsTemplates":
+        return self
+
+    def render(
+        self,
+        key: str,
+        names: dict[str, str],
+        build: Callable[[dict[str, str]], str],
+    ) -> str:
+        """Serialized UPS for the given names.
+
+        Args:
+            key: Template key, covering everything but the names.
+            names: Placeholder values.
+            build: Builds the serialized UPS for the given names.
+
+        Returns:
+            Serialized UPS.
+        """
+        if not all(map(_is_plain_name, names.values())):
+            return build(names)
+        entry = self._templates.get(key)
+        if entry is None:
+            template = build({k: f"{{{{{k}}}}}" for k in names})
+            direct = build(names)
+            self._templates[key] = (template, self._substitute(template, names) == direct)
+            return direct
+        template, verified = entry
+        if not verified:
+            return build(names)
+        return self._substitute(template, names)
+
+    def canonical(self, key: str, names: dict[str, str], xml: str) -> str:
+        """Name-free form of a serialized UPS: the verified template of the key
+        if xml is its render for the given names, otherwise xml itself."""
+        template, verified = self._templates.get(key, ("", False))
+        if verified and self._substitute(template, names) == xml:
+            return template
+        return xml
+
+    def _substitute(self, template: str, names: dict[str, str]) -> str:
+        return self._PLACEHOLDER.sub(lambda m: names.get(m[1], m[0]), template)
+
+
+class _ServerManifestCache:
+    """Server manifest result entries by workflow ID, and a checksum of the
+    manifest last uploaded to each project, persisted next to the manifest.
+
+    An entry is only reused while the key it was stored with, a checksum of
+    the result and the simulation state its entry derives from, matches.
+    """
+
+    def __init__(self, path: Path) -> None:
+        self._path = path
+        self._results: dict[str, dict] = {}
+        self._uploaded: dict[str, str] = {}
+        if path.is_file():
+            try:
+                data = json.loads(path.read_text())
+                self._results = data["results"]
+                self._uploaded = data["uploaded"]
+            except (OSError, ValueError, KeyError, TypeError):
+                # Start over from an unreadable cache file
+                self._results, self._uploaded = {}, {}
+
+    def get(self, workflow_id: str, key: str) -> Optional[dict]:
+        entry = self._results.get(workflow_id)
+        if entry is None or entry["key"] != key:
+            return None
+        return copy.deepcopy(entry["entry"])
+
+    def put(self, workflow_id: str, key: str, entry: dict) -> None:
+        self._results[workflow_id] = {"key": key, "entry": copy.deepcopy(entry)}
+
+    def uploaded(self, project_id: str) -> Optional[str]:
+        return self._uploaded.get(project_id)
+
+    def set_uploaded(self, project_id: str, checksum: str) -> None:
+        self._uploaded[project_id] = checksum
+
+    def save(self) -> None:
+        data = json.dumps({"results": self._results, "uploaded": self._uploaded})
+        tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(data)
+        os.replace(tmp, self._path)
+
+
+def _manifest_checksum(manifest: Optional[dict]) -> str:
+    return hashlib.sha256(json.dumps(manifest, sort_keys=True).encode()).hexdigest()
+
+
+def _is_plain_name(name: str) -> bool:
+    """Whether a name serializes verbatim in XML, so it can be substituted
+    into a template."""
+    return name.isascii() and not any(c in name for c in "&<>\"'{}\t\n\r")
+
+
 class CompressionSimulation:
     @dataclass
     class PartInfo:
@@ -386,6 +574,10 @@ class CompressionSimulation:
         # workflow. Downstream main-workflow jobs (metrics, compress) consume
         # this directly as an asset by filename.
         volume_filename: Optional[str] = None
+        # Checksum of that volume asset, identifies its content across parts.
+        volume_checksum: Optional[str] = None
+        # ID of that volume asset, see load_sampled_volume.
+        volume_asset_id: Optional[str] = None
         # Mesh bounds ({"min": [...], "max": [...]}, mm) reported by the
         # pass-1 preprocess job; used to density-match sampling resolutions.
         bounds: Optional[dict] = None
@@ -395,7 +587,8 @@ class CompressionSimulation:
         bvh_filename: Optional[str] = None
         # Sampling resolution (longest axis) assigned for the pass-2 sample job.
         sample_resolution: Optional[int] = None
-        # From the prep metrics job; None until prep completes.
+        # From the prep metrics job, or computed locally (see local_metrics);
+        # None until prep completes.
         interior_volume: Optional[float] = None
         patch: dict = field(default_factory=dict)
         jobs: dict[str, Any] = field(default_factory=lambda: {})
@@ -429,6 +622,17 @@ class CompressionSimulation:
             self.disabled = saved.get("disabled", False)
             self.interior_volume = saved.get("interior_volume")
 
+        def fork(self, part_unique_name: str) -> "CompressionSimulation.PartInfo":
+            """Copy for one simulation variant. Owns its part (so the mesh,
+            material or velocity can be replaced), jobs and patch; shares the
+            rest, e.g. the uploaded asset."""
+            info = copy.copy(self)
+            info.part = copy.copy(self.part)
+            info.jobs = dict(self.jobs)
+            info.patch = dict(self.patch)
+            info.part_unique_name = part_unique_name
+            return info
+
     client: MetafoldClient
     project_id: str = ""
     stl_folder: Optional[Path] = None
@@ -443,7 +647,11 @@ class CompressionSimulation:
 
     reference_data: ReferenceData
 
-    ups: Optional[Any] = None
+    # Serialized UPS from create_sim_config, see ups for the parsed tree
+    ups_xml: Optional[str] = None
+    _ups_tree: Optional[ElementTree.ElementTree] = None
+    # Template key and names ups_xml was rendered from, see fingerprint
+    _ups_render: Optional[tuple[str, dict[str, str]]] = None
     manifest: dict = {}
 
     part_infos: list[PartInfo]
@@ -460,6 +668,11 @@ class CompressionSimulation:
     prep_workflows: list[Workflow] = []
     prep_workflow_batch_size: int = 10
     write_ups: bool = True
+    result_store: Optional[ResultStore] = None
+    reduce_results_locally: Optional[ReduceResultsOptions] = None
+    lod_levels: int = 0
+    local_postprocess: Optional[LocalPostprocessOptions] = None
+    local_metrics: Optional[LocalMetricsOptions] = None
     # Sample spacing (mm) anchored to the union ("total box") of every part's
     # bounds: longest_axis(total_box) / (max_resolution - 1). Cached so
     # experiment variants sampled later match the base simulation's density.
@@ -494,6 +707,11 @@ class CompressionSimulation:
         project_name: str = "",
         use_legacy_results_format: bool = False,
         write_ups: bool = True,
+        result_store: Optional[ResultStore] = None,
+        reduce_results_locally: Optional[ReduceResultsOptions] = None,
+        lod_levels: int = 0,
+        local_postprocess: Optional[LocalPostprocessOptions] = None,
+        local_metrics: Optional[LocalMetricsOptions] = None,
     ):
         if not output_path:
             if project_name:
@@ -511,6 +729,27 @@ class CompressionSimulation:
         self.use_legacy_results_format = use_legacy_results_format
         self.create_project_if_needed = create_project_if_needed
         self.project_name = project_name
+        # Opt-in: reuse workflows of identical simulations run before
+        self.result_store = result_store
+        # Shared with forks, see create_sim_config
+        self._ups_templates = _UpsTemplates()
+        # Opt-in: ship reduced particle datasets in the results zip, see
+        # metafold.simulation.reduce_results
+        self.reduce_results_locally = reduce_results_locally
+        # Opt-in: number of level of detail datasets (1/4, 1/16, ... of the
+        # particles) added below each particle dataset in the results zip.
+        # Server jobs don't build them, the server manifest has no levels.
+        self.lod_levels = lod_levels
+        # Opt-in: derive von Mises stress, effective strain and particle
+        # displacement from the compress output locally instead of in server
+        # jobs, see metafold.simulation.local_postprocess
+        self.local_postprocess = local_postprocess
+        # Opt-in: compute interior volumes from the downloaded sampled volumes
+        # instead of in implicit/metrics jobs, see
+        # metafold.simulation.local_metrics
+        self.local_metrics = local_metrics
+        # Metrics by volume checksum, shared with forks
+        self._volume_metrics: dict[str, VolumeMetrics] = {}
 
         # build the parts list
         self.part_infos = []
@@ -533,6 +772,40 @@ class CompressionSimulation:
         else:
             self.client = client
 
+    def fork(
+        self, simulation_name: str, part_unique_names: Optional[dict[str, str]] = None
+    ) -> "CompressionSimulation":
+        """Lightweight copy for an experiment variant.
+
+        The copy shares the client, output directory, reference data and the
+        part infos of unchanged parts by reference. It owns its name,
+        simulation parameters, generated config and workflow, and results.
+        Parts named in part_unique_names get their own part info under the
+        given unique name, see PartInfo.fork().
+        """
+        clone = copy.copy(self)
+        clone.simulation_name = simulation_name
+        clone.simulation_parameters = copy.deepcopy(self.simulation_parameters)
+        clone.results = []
+        clone.workflow = None
+        clone.prep_workflows = []
+        clone.ups_xml = None
+        clone._ups_tree = None
+        clone._ups_render = None
+        clone.manifest = {}
+        clone.workflow_yaml = ""
+        clone.workflow_jobs = {}
+        clone.workflow_params = {}
+        clone.workflow_assets = {}
+        part_unique_names = part_unique_names or {}
+        clone.part_infos = [
+            info.fork(part_unique_names[info.part.name])
+            if info.part.name in part_unique_names
+            else info
+            for info in self.part_infos
+        ]
+        return clone
+
     def _write_ups(self, content: str, filename: str) -> None:
         if self.write_ups and self.out_dir is not None:
             (self.out_dir / filename).write_text(content)
@@ -591,11 +864,30 @@ class CompressionSimulation:
         self.results = []
         self.reload_results()
 
+    @property
+    def tracer(self) -> Tracer:
+        return self.client.tracer
+
+    @property
+    def ups(self) -> Optional[ElementTree.ElementTree]:
+        """The UPS generated by create_sim_config, parsed on first access."""
+        if self._ups_tree is None and self.ups_xml is not None:
+            from xml.etree import ElementTree
+
+            root = ElementTree.fromstring(self.ups_xml.encode("ISO-8859-1"))
+            self._ups_tree = ElementTree.ElementTree(root)
+        return self._ups_tree
+
     @property
     def results_filename(self) -> Path:
         assert self.out_dir is not None
         return self.out_dir / f"{self.simulation_name}_results.json"
 
+    @property
+    def checksums_filename(self) -> Path:
+        assert self.out_dir is not None
+        return self.out_dir / "checksums.json"
+
     def _save_results(self):
         state = {
             "results": self.results,
@@ -635,15 +927,21 @@ class CompressionSimulation:
         experiment on an existing project, whose previous results we're about
         to overwrite anyway.
         """
+        # Collect every ID before cancelling anything: cancelling shrinks the
+        # listed states, so paging while cancelling would skip workflows.
+        active = [
+            wf.id
+            for state in ("pending", "started")
+            for wf in client.workflows.iter_list(q=f"state:{state}", project_id=project_id)
+        ]
         cancelled = []
-        for state in ("pending", "started"):
-            for wf in client.workflows.list(q=f"state:{state}", project_id=project_id):
-                try:
-                    client.workflows.cancel(wf.id, project_id=project_id)
-                    cancelled.append(wf.id)
-                except HTTPError:
-                    # Workflow already finished/uncancellable — ignore and move on.
-                    pass
+        for workflow_id in active:
+            try:
+                client.workflows.cancel(workflow_id, project_id=project_id)
+                cancelled.append(workflow_id)
+            except HTTPError:
+                # Workflow already finished/uncancellable — ignore and move on.
+                pass
         return cancelled
 
     @staticmethod
@@ -693,6 +991,8 @@ class CompressionSimulation:
         return created.id
 
     def setup_client(self, env_source, project_id) -> MetafoldClient:
+        from dotenv import load_dotenv  # type: ignore
+
         if env_source is not None:
             load_dotenv(env_source)
 
@@ -719,6 +1019,8 @@ class CompressionSimulation:
                 client_secret=os.environ["METAFOLD_CLIENT_SECRET"],
                 auth_domain=os.environ["METAFOLD_AUTH_DOMAIN"],
                 base_url=os.environ["METAFOLD_BASE_URL"],
+                # Manifest builds re-read every finished workflow and job
+                cache=ResponseCache(),
             )
             return self.client
         else:
@@ -767,34 +1069,53 @@ class CompressionSimulation:
         for p in self.part_infos:
             self.resolve_file_path(p)
 
+    @_traced("simulation.populate_assets")
     def populate_assets(self, part_infos=None):
         if part_infos is None:
             part_infos = self.part_infos
 
-        for info in part_infos:
-            if info.file_path and info.asset is None:
-                # Quote the filename so the search parser keeps it as one term,
-                # and match it exactly (the search is a case-insensitive ILIKE).
-                existing = [
-                    a for a in self.client.assets.list(q=f'filename:"{info.part.filename}"')
+        pending = [info for info in part_infos if info.file_path and info.asset is None]
+        # Quote the filename so the search parser keeps it as one term,
+        # and match it exactly (the search is a case-insensitive ILIKE).
+        # Only the first exact match is used, so stop paging once found.
+        assets = [
+            next(
+                (
+                    a for a in self.client.assets.iter_list(
+                        q=f'filename:"{info.part.filename}"'
+                    )
                     if a.filename == info.part.filename
-                ]
-                asset = None
-                if existing:
-                    asset = existing[0]
-                    checksum = sha256_file(info.file_path)
-                    if asset.checksum != checksum or self.force_reupload_files:
-                        # file has changed so replace it
-                        self.client.assets.delete(asset_id=asset.id)
-                        asset = None
-                if asset is None:
-                    asset = self.client.assets.create(str(info.file_path))
-                info.asset = asset
+                ),
+                None,
+            )
+            for info in pending
+        ]
+
+        # Hash every file that already has an asset in one go, unchanged files
+        # are served from the checksum cache kept next to the results.
+        to_verify = [i for i, asset in enumerate(assets) if asset is not None]
+        checksums = sha256_files(
+            [pending[i].file_path for i in to_verify],
+            cache=ChecksumCache(self.checksums_filename),
+        )
+        for i, checksum in zip(to_verify, checksums):
+            asset = assets[i]
+            if asset.checksum != checksum or self.force_reupload_files:
+                # file has changed so replace it
+                self.client.assets.delete(asset_id=asset.id)
+                assets[i] = None
+
+        for info, asset in zip(pending, assets):
+            if asset is None:
+                asset = self.client.assets.create(str(info.file_path))
+            info.asset = asset
 
     def _build_preprocess_workflow_for_batch(self, batch: list) -> tuple[str, dict, dict]:
         """Build the pass-1 prep workflow: preprocess (+ BVH) per part. The
         preprocess job outputs each mesh's exact bounds, used to density-match
         the pass-2 sampling resolutions. No sampling happens in this pass."""
+        import yaml
+
         jobs: dict = {}
         params: dict = {}
         assets: dict = {}
@@ -827,6 +1148,8 @@ class CompressionSimulation:
         """Build the pass-2 sampling workflow: one implicit/from-mesh job per
         part at its density-matched resolution, reusing the preprocessed mesh
         and BVH assets produced in pass 1."""
+        import yaml
+
         jobs: dict = {}
         params: dict = {}
         assets: dict = {}
@@ -878,8 +1201,10 @@ class CompressionSimulation:
 
             # Metrics run in prep (not the main workflow) so interior volume
             # is known before dispatch, when the server manifest is uploaded.
-            if self._is_analysis_target(part_info.part) and self._get_step(
-                WorkflowStepType.METRICS, part_info.part.name
+            if (
+                self.local_metrics is None
+                and self._is_analysis_target(part_info.part)
+                and self._get_step(WorkflowStepType.METRICS, part_info.part.name)
             ):
                 metrics_job = f"metrics-{unique_name}"
                 jobs[metrics_job] = {
@@ -909,16 +1234,25 @@ class CompressionSimulation:
             workflows.append(wf)
 
         for i, wf in enumerate(workflows):
-            while wf.state not in ["success", "failure", "canceled"]:
-                sleep(1)
-                wf = self.client.workflows.get(wf.id)
-            workflows[i] = wf
+            workflows[i] = self._wait_for_workflow(wf)
 
         failed = [wf for wf in workflows if wf.state != "success"]
         if failed:
             raise RuntimeError(f"{len(failed)} prep workflow(s) failed")
         return workflows
 
+    def _wait_for_workflow(self, wf: Workflow) -> Workflow:
+        """Poll a workflow until it reaches a final state and record its queue
+        and run durations."""
+        while wf.state not in ["success", "failure", "canceled"]:
+            sleep(1)
+            wf = self.client.workflows.get(wf.id)
+        self.tracer.record_lifecycle(
+            "workflow", wf.created, wf.started, wf.finished,
+            workflow_id=wf.id, state=wf.state,
+        )
+        return wf
+
     @staticmethod
     def _job_output_asset_filename(job) -> Optional[str]:
         """First output asset filename of a job, preferring the named outputs
@@ -1028,6 +1362,7 @@ class CompressionSimulation:
                 # Fallback: sample at max_resolution over the part's own bounds.
                 info.sample_resolution = max_resolution
 
+    @_traced("simulation.sample_assets")
     def sample_assets(self, part_infos=None):
         if part_infos is None:
             part_infos = self.part_infos
@@ -1058,6 +1393,7 @@ class CompressionSimulation:
 
         self.prep_workflows = preprocess_workflows + sample_workflows
 
+    @_traced("simulation.collect_sampled_volumes")
     def collect_sampled_volumes(self, part_infos=None):
         if part_infos is None:
             part_infos = self.part_infos
@@ -1094,6 +1430,8 @@ class CompressionSimulation:
                 volume_asset = next((a for a in sample_job.assets if a.filename), None)
             if volume_asset is not None:
                 info.volume_filename = volume_asset.filename
+                info.volume_checksum = volume_asset.checksum
+                info.volume_asset_id = volume_asset.id
 
             metrics_job = prep_workflow_jobs.get(info.jobs.get("metrics", ""))
             if metrics_job is not None:
@@ -1101,6 +1439,86 @@ class CompressionSimulation:
                 if raw is not None:
                     info.interior_volume = float(raw)
 
+        if self.local_metrics is not None:
+            for info in part_infos:
+                if (
+                    info.interior_volume is None
+                    and info.volume_asset_id is not None
+                    and self._is_analysis_target(info.part)
+                    and self._get_step(WorkflowStepType.METRICS, info.part.name)
+                ):
+                    info.interior_volume = self._part_volume_metrics(info).interior_volume
+
+    def load_sampled_volume(
+        self, part_name: str, dtype: DTypeLike = "float32", path: Optional[Path] = None
+    ) -> SampledVolume:
+        """Download the volume sampled for a part, e.g. to check the sampling
+        before running the compression. Call after collect_sampled_volumes().
+
+        Args:
+            part_name: Part name.
+            dtype: Sample type of the volume asset.
+            path: If given, the volume is downloaded into a memory-mapped file
+                at this path instead of memory.
+
+        Returns:
+            Sampled volume.
+        """
+        info = self.get_part_info(part_name)
+        if info is None:
+            raise RuntimeError(f"Unknown part name {part_name}")
+        return self._load_sampled_volume(info, dtype, path)
+
+    @_traced("simulation.volume_metrics")
+    def volume_metrics(self, part_name: str) -> VolumeMetrics:
+        """Interior volume, surface area and bounds of the volume sampled for
+        a part, computed locally. Call after collect_sampled_volumes().
+
+        Args:
+            part_name: Part name.
+
+        Returns:
+            Volume metrics, in mm.
+        """
+        info = self.get_part_info(part_name)
+        if info is None:
+            raise RuntimeError(f"Unknown part name {part_name}")
+        return self._part_volume_metrics(info)
+
+    def _part_volume_metrics(self, info: PartInfo) -> VolumeMetrics:
+        # Parts sampled to the same volume (e.g. across variants) share metrics
+        key = info.volume_checksum
+        if key is not None and key in self._volume_metrics:
+            return self._volume_metrics[key]
+        metrics = volume_metrics(
+            self._load_sampled_volume(info), self.local_metrics or LocalMetricsOptions()
+        )
+        if key is not None:
+            self._volume_metrics[key] = metrics
+        return metrics
+
+    def _load_sampled_volume(
+        self, info: PartInfo, dtype: DTypeLike = "float32", path: Optional[Path] = None
+    ) -> SampledVolume:
+        if info.volume_asset_id is None or not info.patch:
+            raise RuntimeError(
+                f"No sampled volume for part {info.part.name}, run sample_assets() first"
+            )
+        resolution = tuple(int(r) for r in info.patch["resolution"])
+        # Samples are stored x fastest
+        shape = resolution[::-1]
+        out = (
+            np.memmap(path, dtype=dtype, mode="w+", shape=shape) if path is not None else None
+        )
+        data = self.client.assets.download_array(
+            info.volume_asset_id, dtype, shape, project_id=self.project_id, out=out
+        )
+        return SampledVolume(
+            data=data,
+            size=np.asarray(info.patch["size"], dtype=np.float64),
+            offset=np.asarray(info.patch["offset"], dtype=np.float64),
+        )
+
     def _total_interior_volume(self, workflow: Optional[Workflow] = None) -> float:
         """Sum interior volumes across analysis-target parts. Falls back to
         the main-workflow metrics readback for experiments dispatched before
@@ -1125,13 +1543,93 @@ class CompressionSimulation:
                 return info
         return None
 
+    @_traced("simulation.create_sim_config")
     def create_sim_config(self, name_suffix=""):
         """
         The grid spans the total box (union of every part's bounds) and is
         sized by the shared sample spacing — no representative part.
         Piston velocity is [0,0,0] in the UPS — actual motion driven by velocity.txt.
+
+        Variants that only differ in names (e.g. velocity sweeps, whose motion
+        lives in velocity.txt) share a compiled UPS template, see
+        _UpsTemplates; only the first one builds it with simulation_configurator.
         """
-        name = self.simulation_name
+        for material_index, info in enumerate(self.part_infos):
+            info.material_name = f"{info.part.name}{name_suffix}_mat"
+            info.material_index = material_index
+        self._ensure_sample_spacing(self.part_infos)
+
+        names = {
+            "simulation": self.simulation_name,
+            "suffix": name_suffix,
+            **{
+                f"part{i}": info.part_unique_name
+                for i, info in enumerate(self.part_infos)
+            },
+        }
+        key = self._ups_template_key()
+        self._ups_tree = None
+        self._ups_render = (key, names)
+        self.ups_xml = self._ups_templates.render(key, names, self._build_ups_xml)
+
+    def _ups_template_key(self) -> str:
+        """Checksum of everything the UPS depends on except names."""
+        from dataclasses import asdict, fields
+
+        parts = []
+        for info in self.part_infos:
+            parts.append({
+                "type": type(info.part).__name__,
+                "name": info.part.name,
+                "material": info.part.material.to_dict(),
+                # Velocity profiles go to velocity.txt and meshes are read from
+                # their sampled volume, neither appears in the UPS
+                "fields": {
+                    f.name: getattr(info.part, f.name)
+                    for f in fields(info.part)
+                    if f.name not in ("name", "material", "velocity", "filename")
+                },
+                "patch": info.patch,
+                "disabled": info.disabled,
+            })
+        key = {
+            "type": type(self).__name__,
+            "parameters": asdict(self.simulation_parameters),
+            "sample_spacing": self.sample_spacing,
+            "parts": parts,
+        }
+        data = json.dumps(key, sort_keys=True, default=str).encode()
+        return hashlib.sha256(data).hexdigest()
+
+    def _build_ups_xml(self, names: dict[str, str]) -> str:
+        """Build and serialize the UPS with simulation_configurator. names
+        holds the simulation name, name suffix and part unique names (keys
+        "simulation", "suffix" and "part<i>")."""
+        from xml.etree import ElementTree
+
+        ups = self._build_ups(
+            names["simulation"],
+            names["suffix"],
+            [names[f"part{i}"] for i in range(len(self.part_infos))],
+        )
+        ElementTree.indent(ups)
+        return self._dump_xml(ups, encoding="ISO-8859-1", xml_declaration=True)
+
+    def _build_ups(
+        self, simulation_name: str, name_suffix: str, part_unique_names: list[str]
+    ) -> ElementTree.ElementTree:
+        from simulation_configurator import (
+            Archive,
+            BoundaryConditions,
+            Contact,
+            GeometryStore,
+            Grid,
+            Mpm,
+            Simulation,
+        )
+        from simulation_configurator.shapes import Box, Cylinder, File, Parallelepiped
+
+        name = simulation_name
 
         sim = Simulation(
             name,
@@ -1168,7 +1666,6 @@ class CompressionSimulation:
         grid_size = grid_max - grid_min
         # Every part is sampled at this uniform (isotropic) spacing, so the grid
         # cells match particle spacing. mm -> m.
-        self._ensure_sample_spacing(self.part_infos)
         spacing = (self.sample_spacing or 1.0) * 1e-3
         grid_resolution = np.ceil(
             grid_size / (self.simulation_parameters.points_per_cell * spacing)
@@ -1188,24 +1685,17 @@ class CompressionSimulation:
             self.simulation_parameters.boundary_conditions
         )
         for side, bc in boundary_conditions.items():
-            bcs._sub_elements[side] = _FACE_BUILDERS[bc](side)
+            bcs._sub_elements[side] = _face_builder(bc)(side)
         grid.add(bcs)
 
         store = GeometryStore()
 
-        material_index = 0
-        for info in self.part_infos:
-            part = info.part
-            material_name = f"{info.part.name}{name_suffix}_mat"
-            info.material_name = material_name
-            info.material_index = material_index
-            material_dict = part.material.to_dict()
-            store.add_material(material_name, material_dict, force=True)
-            material_index += 1
+        material_names = [f"{info.part.name}{name_suffix}_mat" for info in self.part_infos]
+        for info, material_name in zip(self.part_infos, material_names):
+            store.add_material(material_name, info.part.material.to_dict(), force=True)
 
-        for info in self.part_infos:
+        for info, material_name in zip(self.part_infos, material_names):
             part = info.part
-            material_name = info.material_name
             geometry_element = None
             common_attribs = {
                 "material": material_name,
@@ -1274,14 +1764,14 @@ class CompressionSimulation:
         ]
 
         rigid_contacts = []
-        for info in self.part_infos:
+        for info, unique_name in zip(self.part_infos, part_unique_names):
             if info.disabled:
                 continue
             if isinstance(info.part, (ExperimentPistonBase, ExperimentSupportBase)):
                 rigid_contacts.append(
                     Contact(
                         type=info.part.contact_type,
-                        filename=f"velocity_{info.part_unique_name}.txt",
+                        filename=f"velocity_{unique_name}.txt",
                         mu=info.part.mu,
                         master_material=info.material_index,
                         direction=[1, 1, 1],
@@ -1308,8 +1798,7 @@ class CompressionSimulation:
         sim.add([mpm, archive, store, grid])
 
         # this stuff should be fixed laster, this is just a workaround
-        self.ups = sim.to_xml()
-        ElementTree.indent(self.ups)
+        return sim.to_xml()
 
     def _add_to_workflow_metrics(self, part_infos: list[PartInfo]):
         # Duplicates the prep metrics jobs (which feed the server manifest):
@@ -1362,10 +1851,8 @@ class CompressionSimulation:
             volume_resolutions.append(json.dumps(part_info.patch["resolution"]))
             part_info.jobs["compress"] = compress_job_name
 
-        assert self.ups is not None
-        self.workflow_params[f"{compress_job_name}.ups"] = self._dump_xml(
-            self.ups, encoding="ISO-8859-1", xml_declaration=True
-        )
+        assert self.ups_xml is not None
+        self.workflow_params[f"{compress_job_name}.ups"] = self.ups_xml
         self.workflow_params[f"{compress_job_name}.volume_size"] = volume_sizes
         self.workflow_params[f"{compress_job_name}.volume_offset"] = volume_offsets
         self.workflow_params[f"{compress_job_name}.volume_resolution"] = (
@@ -1541,7 +2028,17 @@ class CompressionSimulation:
             "assets": {"data": [{"job": s, "asset": "output"} for s in sources]},
         }
 
+    # Steps local_postprocess computes instead of server jobs, and their datasets
+    _LOCAL_POSTPROCESS_STEPS = {
+        WorkflowStepType.VON_MISES_STRESS: "von_mises_stress",
+        WorkflowStepType.EFFECTIVE_STRAIN: "effective_strain",
+        WorkflowStepType.PARTICLE_DISPLACEMENT: "particle_displacement",
+    }
+
+    @_traced("simulation.build_workflow")
     def build_workflow(self, name_suffix=""):
+        import yaml
+
         self.workflow_yaml = ""
         self.workflow_params = {}
         self.workflow_jobs = {}
@@ -1558,10 +2055,14 @@ class CompressionSimulation:
                 raise RuntimeError(
                     f"Unknown part name {e.args[0]} in workflow step {step.type.value}"
                 )
-            if step.type == WorkflowStepType.METRICS:
+            if step.type == WorkflowStepType.METRICS and self.local_metrics:
+                pass  # computed from the sampled volumes in prep
+            elif step.type == WorkflowStepType.METRICS:
                 self._add_to_workflow_metrics(part_infos_for_step)
             elif step.type == WorkflowStepType.COMPRESS:
                 self._add_to_workflow_compress(part_infos_for_step)
+            elif step.type in self._LOCAL_POSTPROCESS_STEPS and self.local_postprocess:
+                pass  # derived from the compress output when writing results
             elif step.type == WorkflowStepType.VON_MISES_STRESS:
                 self._add_to_workflow_von_mises_stress(part_infos_for_step)
             elif step.type == WorkflowStepType.EFFECTIVE_STRAIN:
@@ -1583,23 +2084,160 @@ class CompressionSimulation:
         self.workflow_yaml = yaml.dump(
             {"jobs": self.workflow_jobs}, default_flow_style=False, sort_keys=False
         )
-        ups_str = self._dump_xml(self.ups, encoding="ISO-8859-1", xml_declaration=True)
-        self._write_ups(ups_str, f"{self.simulation_name}.ups")
+        assert self.ups_xml is not None
+        self._write_ups(self.ups_xml, f"{self.simulation_name}.ups")
 
         return self.workflow_yaml, self.workflow_params
 
+    def fingerprint(self) -> str:
+        """Canonical checksum of the main workflow, call after build_workflow().
+
+        Covers the workflow YAML, parameters (including the UPS and velocity
+        inputs) and the checksums of the input volumes. Names that only identify
+        the variant, i.e. the simulation name, name suffix and per-variant part
+        names, are replaced by placeholders where they occur: in the names of
+        per-part jobs and velocity tables, and in the UPS, which is compared by
+        its template (see _UpsTemplates). A UPS built without a verified
+        template is compared as is, so identical variants only share a
+        fingerprint if their UPS is rendered from the same template.
+        """
+        import yaml
+
+        workflow = yaml.safe_load(self.workflow_yaml) or {}
+        # Per-part jobs are named "<base>-<part unique name>", velocity tables
+        # "velocity_<part unique name>.txt". Longest first, one unique name may
+        # end with another.
+        infos = sorted(
+            enumerate(self.part_infos), key=lambda e: len(e[1].part_unique_name), reverse=True
+        )
+        names = {}
+        for job in workflow.get("jobs", {}):
+            for i, info in infos:
+                if info.part_unique_name and job.endswith(f"-{info.part_unique_name}"):
+                    names[job] = job[: -len(info.part_unique_name)] + f"<part{i}>"
+                    break
+        for i, info in infos:
+            names[f"velocity_{info.part_unique_name}.txt"] = f"velocity_<part{i}>.txt"
+
+        def rename(value: Any) -> Any:
+            if isinstance(value, dict):
+                return {rename(k): rename(v) for k, v in value.items()}
+            if isinstance(value, list):
+                return [rename(v) for v in value]
+            return names.get(value, value) if isinstance(value, str) else value
+
+        def rename_key(key: str) -> str:
+            job, dot, param = key.partition(".")
+            return names.get(job, job) + dot + param
+
+        params = {}
+        for key, value in self.workflow_params.items():
+            param = key.partition(".")[2]
+            if param == "ups" and self._ups_render is not None:
+                value = self._ups_templates.canonical(*self._ups_render, value)
+            elif param == "text_inputs":
+                value = rename(json.loads(value))
+            params[rename_key(key)] = value
+        volumes = {
+            info.volume_filename: info.volume_checksum or info.volume_filename
+            for info in self.part_infos
+            if info.volume_filename
+        }
+        assets = {
+            rename_key(k): (
+                [volumes.get(f, f) for f in v] if isinstance(v, list) else volumes.get(v, v)
+            )
+            for k, v in self.workflow_assets.items()
+        }
+        canonical = json.dumps(
+            {"workflow": rename(workflow), "params": params, "assets": assets},
+            sort_keys=True,
+        )
+        return "sha256:" + hashlib.sha256(canonical.encode()).hexdigest()
+
+    @_traced("simulation.run_workflow")
     def run_workflow(self, name_suffix=""):
-        self.workflow = self.client.workflows.run_async(
+        fingerprint = None
+        if self.result_store is not None:
+            fingerprint = self.fingerprint()
+            memoized = self._memoized_workflow(fingerprint)
+            if memoized is not None:
+                workflow, part_unique_names = memoized
+                print(
+                    f"Reusing workflow {workflow.id} from project "
+                    f"{workflow.project_id} for '{self.simulation_name}'"
+                )
+                self.reuse_workflow(workflow, name_suffix, part_unique_names)
+                return
+
+        workflow = self.client.workflows.run_async(
             self.workflow_yaml,
             parameters=self.workflow_params,
             assets=self.workflow_assets,
         )
+        self.reuse_workflow(workflow, name_suffix)
+        if self.result_store is not None and fingerprint is not None:
+            self.result_store.put(
+                fingerprint,
+                workflow,
+                {info.part.name: info.part_unique_name for info in self.part_infos},
+            )
+
+    def _memoized_workflow(
+        self, fingerprint: str
+    ) -> Optional[tuple[Workflow, dict[str, str]]]:
+        """Successful workflow recorded in the result store for the fingerprint,
+        with the part unique names it was built with."""
+        assert self.result_store is not None
+        entry = self.result_store.get(fingerprint)
+        if entry is None:
+            return None
+        try:
+            workflow = self.client.workflows.get(
+                entry["workflow_id"], project_id=entry["project_id"]
+            )
+        except HTTPError:
+            # Deleted along with its project, forget it
+            self.result_store.invalidate(fingerprint)
+            return None
+        if workflow.state != "success":
+            # Failed, canceled or still running: dispatch a fresh one, which
+            # replaces this entry
+            return None
+        return workflow, entry["part_unique_names"]
+
+    def reuse_workflow(
+        self,
+        workflow: Workflow,
+        name_suffix="",
+        part_unique_names: Optional[dict[str, str]] = None,
+    ):
+        """Record a dispatched workflow as this simulation's result, e.g. one
+        dispatched for an identical variant.
 
+        part_unique_names maps part names to the unique names the workflow was
+        built with, its job names are derived from them (e.g.
+        stress-strain-<unique name>). They replace this simulation's own.
+        """
+        self.workflow = workflow
+        # Part infos may be shared with other variants, fork renamed ones
+        part_unique_names = part_unique_names or {}
+        self.part_infos = [
+            info.fork(part_unique_names[info.part.name])
+            if part_unique_names.get(info.part.name, info.part_unique_name)
+            != info.part_unique_name
+            else info
+            for info in self.part_infos
+        ]
         ret = {
             "id": self.workflow.id,
             "name": self.simulation_name,
             "totalEnergyAbsorption": 100.0,
         }
+        # project_id is unset when the client was injected with a default
+        if workflow.project_id != self.client.project_id(self.project_id or None):
+            # Memoized from another project
+            ret["projectId"] = workflow.project_id
         for info in self.part_infos:
             if hasattr(info.part, "filename"):
                 element_name = f"{info.part.name}{name_suffix}"
@@ -1622,6 +2260,8 @@ class CompressionSimulation:
         df must have a 'time' level in its index and columns: x, y, z, + whatever
         is listed in `columns`.
         """
+        from plyfile import PlyData, PlyElement
+
         cols = [("x", np.float32), ("y", np.float32), ("z", np.float32)] + columns
 
         for i, (_, group) in enumerate(df.groupby("time")):
@@ -1637,6 +2277,8 @@ class CompressionSimulation:
 
     @staticmethod
     def write_histogram_csv(df, f, **kwargs):
+        import pandas as pd
+
         df = df.droplevel(1)
         df = df[["bin_left", "frequency"]]
         df.rename(columns={"bin_left": "bin_edges", "frequency": "count"}, inplace=True)
@@ -1779,6 +2421,8 @@ class CompressionSimulation:
         """Remove the 'toe' region from the start (displacement < shift_mm) and
         re-zero both displacement and force so the curve starts at (0, 0).
         Also appends a final (0, 0) row to close the loop."""
+        import pandas as pd
+
         if shift_mm <= 0 or df.empty:
             return df
 
@@ -1799,6 +2443,7 @@ class CompressionSimulation:
             df = pd.concat([df, zero_row], ignore_index=True)
         return df
 
+    @_traced("simulation.write_results")
     def write_results(self):
         if not self.results:
             print(
@@ -1814,22 +2459,163 @@ class CompressionSimulation:
                 self._write_results_to_zip(zf)
                 self._write_manifest_to_zip(zf, self.results)
 
+    @_traced("simulation.export_parquet")
+    def export_parquet(
+        self,
+        out_dir: Optional[Path] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> Path:
+        """Export results of successful workflows as partitioned Parquet.
+
+        Writes one dataset per table below out_dir (default: "parquet" in the
+        output directory):
+
+        - force_displacement, energy_metrics: partitioned by simulation
+        - stress_strain: by simulation and material
+        - position, von_mises_stress, effective_strain, particle_displacement:
+          by simulation, material and output time step
+
+        Materials are identified by part name. Floating point values are
+        stored as float32. Open a table with parquet_export.dataset().
+
+        Returns:
+            Output directory.
+        """
+        import pandas as pd
+
+        if out_dir is None:
+            assert self.out_dir is not None
+            out_dir = self.out_dir / "parquet"
+        params = self.simulation_parameters
+
+        def timestep(t: np.ndarray) -> np.ndarray:
+            return np.rint((t - params.init_time) / params.output_int).astype(np.int64)
+
+        # Per-particle tables: (step, asset_name, dataset_root)
+        particle_tables = [
+            (WorkflowStepType.VON_MISES_STRESS, "von-mises-stress.output", "von_mises_stress"),
+            (WorkflowStepType.EFFECTIVE_STRAIN, "effective-strain.output", "effective_strain"),
+            (
+                WorkflowStepType.PARTICLE_DISPLACEMENT,
+                "particle-displacement.output",
+                "particle_displacement",
+            ),
+        ]
+
+        with ParquetResultsWriter(out_dir) as writer:
+            for result in self.results:
+                w = self._wait_for_workflow(
+                    self.client.workflows.get(
+                        result["id"], project_id=result.get("projectId")
+                    )
+                )
+                if w.state != "success":
+                    continue
+                sim = {"simulation": result.get("name", self.simulation_name)}
+                materials = [
+                    (i, {**sim, "material": info.part.name})
+                    for i, info in enumerate(self.part_infos)
+                    if not info.disabled
+                ]
+
+                with TemporaryDirectory() as tempdir:
+                    tempdir_path = Path(tempdir)
+
+                    def export_particles(local_path: Path, dataset_root: str) -> None:
+                        with pd.HDFStore(local_path, "r") as store:
+                            for i, partitions in materials:
+                                key = f"/material{i}/{dataset_root}"
+                                if key in store:
+                                    writer.write_hdf(
+                                        dataset_root, store, key, partitions,
+                                        timestep=timestep, chunk_rows=chunk_rows,
+                                    )
+
+                    if self._contains_step(WorkflowStepType.COMPRESS):
+                        uo_asset = w.get_asset("compress.output")
+                        if uo_asset is not None:
+                            pn_hdf = tempdir_path / "position.h5"
+                            paths = [f"/material{i}/position" for i, _ in materials]
+                            if not self._copy_remote_datasets(uo_asset, paths, pn_hdf):
+                                self.client.assets.download_file(
+                                    uo_asset.id, pn_hdf, uo_asset.project_id
+                                )
+                            export_particles(pn_hdf, "position")
+
+                    local_outputs = self._postprocess_locally(w, tempdir_path)
+                    for step, asset_name, dataset_root in particle_tables:
+                        if not self._contains_step(step):
+                            continue
+                        if dataset_root in local_outputs:
+                            export_particles(local_outputs[dataset_root], dataset_root)
+                            continue
+                        asset = w.get_asset(asset_name)
+                        if asset is None:
+                            continue
+                        local_path = tempdir_path / f"{dataset_root}.h5"
+                        self.client.assets.download_file(asset.id, local_path, asset.project_id)
+                        export_particles(local_path, dataset_root)
+
+                    if self._contains_step(WorkflowStepType.FORCE_DISPLACEMENT):
+                        fd_asset = w.get_asset("force-displacement.output")
+                        if fd_asset is not None:
+                            fd_hdf = tempdir_path / "force_disp.h5"
+                            self.client.assets.download_file(
+                                fd_asset.id, fd_hdf, fd_asset.project_id
+                            )
+                            with pd.HDFStore(fd_hdf, "r") as store:
+                                writer.write_hdf(
+                                    "force_displacement", store, "/force_displacement",
+                                    sim, chunk_rows=chunk_rows,
+                                )
+
+                    if self._contains_step(WorkflowStepType.STRESS_STRAIN):
+                        for i, partitions in materials:
+                            info = self.part_infos[i]
+                            if not self._is_analysis_target(info.part):
+                                continue
+                            ss_asset = w.get_asset(
+                                f"stress-strain-{info.part_unique_name}.output"
+                            )
+                            if ss_asset is None:
+                                continue
+                            ss_hdf = tempdir_path / f"stress_strain_{i}.h5"
+                            self.client.assets.download_file(
+                                ss_asset.id, ss_hdf, ss_asset.project_id
+                            )
+                            with pd.HDFStore(ss_hdf, "r") as store:
+                                writer.write_hdf(
+                                    "stress_strain", store, "/stress_strain",
+                                    partitions, chunk_rows=chunk_rows,
+                                )
+
+                metrics: dict[str, Any] = {"volume": self._total_interior_volume(w)}
+                if self._contains_step(WorkflowStepType.ENERGY_METRICS):
+                    for name in ("energy_absorbed", "loading_energy", "unloading_energy"):
+                        raw = w.get_parameter(f"energy-metrics.{name}")
+                        metrics[name] = float(raw) if raw is not None else np.nan
+                writer.write_frame("energy_metrics", pd.DataFrame([metrics]), sim)
+        return out_dir
+
     @staticmethod
     def _is_analysis_target(p: ExperimentPart):
         if isinstance(p, ExperimentPistonBase) or isinstance(p, ExperimentSupportBase):
             return False
         return True
 
+    @_traced("simulation.write_results_to_zip")
     def _write_results_to_zip(self, zf: ZipFile):
         """Poll each workflow in self.results, download assets, and write
         per-sim files into the given zip. Mutates each entry of self.results
         in place, adding 'data', 'volume', 'energyAbsorbed', etc."""
+        import pandas as pd
+
         for result in self.results:
-            w = self.client.workflows.get(result["id"])
-            while w.state not in ["success", "failure", "canceled"]:
-                sleep(1)
-                # refresh the workflow
-                w = self.client.workflows.get(w.id)
+            w = self._wait_for_workflow(
+                self.client.workflows.get(
+                    result["id"], project_id=result.get("projectId")
+                )
+            )
 
             if w.state == "success":
                 name = self.simulation_name
@@ -1881,28 +2667,36 @@ class CompressionSimulation:
                         vm_asset = w.get_asset("von-mises-stress.output")
                         if vm_asset is not None:
                             vm_hdf = Path(tempdir) / "von_mises.h5"
-                            self.client.assets.download_file(vm_asset.id, vm_hdf)
+                            self.client.assets.download_file(
+                                vm_asset.id, vm_hdf, vm_asset.project_id
+                            )
 
                     es_hdf = None
                     if self._contains_step(WorkflowStepType.EFFECTIVE_STRAIN):
                         es_asset = w.get_asset("effective-strain.output")
                         if es_asset is not None:
                             es_hdf = Path(tempdir) / "eff_strain.h5"
-                            self.client.assets.download_file(es_asset.id, es_hdf)
+                            self.client.assets.download_file(
+                                es_asset.id, es_hdf, es_asset.project_id
+                            )
 
                     pd_hdf = None
                     if self._contains_step(WorkflowStepType.PARTICLE_DISPLACEMENT):
                         pd_asset = w.get_asset("particle-displacement.output")
                         if pd_asset is not None:
                             pd_hdf = Path(tempdir) / "part_disp.h5"
-                            self.client.assets.download_file(pd_asset.id, pd_hdf)
+                            self.client.assets.download_file(
+                                pd_asset.id, pd_hdf, pd_asset.project_id
+                            )
 
                     uo_hdf = None
                     if self._contains_step(WorkflowStepType.COMPRESS):
                         uo_asset = w.get_asset("compress.output")
                         if uo_asset is not None:
                             uo_hdf = Path(tempdir) / "compress.h5"
-                            self.client.assets.download_file(uo_asset.id, uo_hdf)
+                            self.client.assets.download_file(
+                                uo_asset.id, uo_hdf, uo_asset.project_id
+                            )
 
                     material_dfs = []  # one entry per material, concat'd at the end
 
@@ -2070,7 +2864,9 @@ class CompressionSimulation:
                     if self._contains_step(WorkflowStepType.FORCE_DISPLACEMENT):
                         fd_asset = w.get_asset("force-displacement.output")
                         assert fd_asset
-                        self.client.assets.download_file(fd_asset.id, hdf_filename)
+                        self.client.assets.download_file(
+                            fd_asset.id, hdf_filename, fd_asset.project_id
+                        )
                         with pd.HDFStore(hdf_filename) as store:
                             df = store["/force_displacement"].reset_index()
                             df = self._apply_force_displacement_correction(
@@ -2134,7 +2930,9 @@ class CompressionSimulation:
                             )
                             if ss_asset is None:
                                 continue
-                            self.client.assets.download_file(ss_asset.id, hdf_filename)
+                            self.client.assets.download_file(
+                                ss_asset.id, hdf_filename, ss_asset.project_id
+                            )
                             with pd.HDFStore(hdf_filename) as store:
                                 filename = f"{name}/stressStrain{i}.csv"
                                 with zf.open(filename, "w") as f:
@@ -2210,34 +3008,136 @@ class CompressionSimulation:
         """Build the data key for a part's mesh preview, e.g. 'midsole' → 'midsole_mesh'."""
         return f"{part_unique_name}_mesh"
 
+    def _lod_ids(self, positions_hdf: Path) -> dict[str, list[np.ndarray]]:
+        """Particle ids of each level of detail by material group, built from
+        the position datasets, reduced or not."""
+        import pandas as pd
+
+        ids = {}
+        with pd.HDFStore(positions_hdf, "r") as store:
+            for key in store.keys():
+                group, _, dataset = key.rpartition("/")
+                if dataset == "position":
+                    ids[group] = lod_ids(read_reduced(store, key), self.lod_levels)
+        return ids
+
+    @staticmethod
+    def _with_lod_levels(entry: dict, levels: int) -> dict:
+        """Add the levels of detail of a manifest data entry, coarsest last.
+        Each level references the same file or job asset as the full dataset."""
+        if levels:
+            entry["levels"] = [
+                {**entry, "path": lod_key(entry["path"], level), "fraction": 4.0**-level}
+                for level in range(1, levels + 1)
+            ]
+        return entry
+
+    def _reduce_for_zip(self, path: Path) -> Path:
+        """Path of the file to ship for a particle results HDF: the file itself,
+        or a reduced copy next to it if reduce_results_locally is set.
+        Histograms are shipped as is."""
+        if self.reduce_results_locally is None:
+            return path
+        reduced = path.with_name(f"reduced_{path.name}")
+        reduce_hdf(
+            path,
+            reduced,
+            self.reduce_results_locally,
+            include=lambda key: not key.endswith("_histogram"),
+        )
+        return reduced
+
+    def _copy_remote_datasets(self, asset: Asset, paths: list[str], dst_path: Path) -> bool:
+        """Copy HDF5 nodes of an asset into a new local file, reading only
+        their byte ranges. Nodes missing from the asset are skipped.
+
+        Returns False if the asset couldn't be read remotely (h5py missing, or
+        the download link doesn't serve ranges it can use), the caller should
+        then download it whole.
+        """
+        try:
+            import h5py
+        except ImportError:
+            return False
+        try:
+            with (
+                self.tracer.span("asset.copy_datasets", asset_id=asset.id) as span,
+                self.client.assets.open(asset.id, asset.project_id) as f,
+                h5py.File(f, "r") as src,
+                h5py.File(dst_path, "w") as dst,
+            ):
+                for path in paths:
+                    if path not in src:
+                        continue
+                    parent, _, leaf = path.rpartition("/")
+                    src.copy(src[path], dst.require_group(parent or "/"), name=leaf)
+                span.set_attribute("bytes_fetched", f.bytes_fetched)
+                span.set_attribute("size", f.size)
+                span.set_attribute("requests", f.requests)
+        except Exception as e:
+            print(f"WARNING: couldn't read {asset.filename} remotely ({e}), downloading it")
+            return False
+        return True
+
+    @_traced("simulation.postprocess_locally")
+    def _postprocess_locally(self, w: Workflow, tempdir_path: Path) -> dict[str, Path]:
+        """Derive the local_postprocess fields of a workflow from its compress
+        output, reading only the source datasets where possible.
+
+        Returns:
+            HDF file of each derived dataset root, e.g. "von_mises_stress",
+            empty if local_postprocess is off or there's no compress output.
+        """
+        if self.local_postprocess is None:
+            return {}
+        fields = [
+            root
+            for step, root in self._LOCAL_POSTPROCESS_STEPS.items()
+            if self._contains_step(step)
+        ]
+        asset = w.get_asset("compress.output") if fields else None
+        if asset is None:
+            return {}
+        materials = [i for i, info in enumerate(self.part_infos) if not info.disabled]
+        src = tempdir_path / "postprocess_input.h5"
+        paths = [
+            f"/material{i}/{LOCAL_POSTPROCESS_SOURCES[f]}" for f in fields for i in materials
+        ]
+        if not self._copy_remote_datasets(asset, sorted(set(paths)), src):
+            self.client.assets.download_file(asset.id, src, asset.project_id)
+        outputs = {f: tempdir_path / f"local_{f}.h5" for f in fields}
+        postprocess_hdf(src, outputs, materials, self.local_postprocess)
+        return outputs
+
+    @_traced("simulation.write_results_to_zip")
     def _write_results_to_zip_v2(self, zf: ZipFile):
         """New schema: ship HDF files into the zip and reference per-material
         datasets via {name, path} entries in `data`. Mesh previews are copies
-        of the original input PLY files. Disabled parts are skipped entirely."""
+        of the original input PLY files, stored once per distinct file in the
+        zip (see _write_shared_member). Disabled parts are skipped entirely."""
+        import pandas as pd
+
         name = self.simulation_name
 
         # Always write mesh files regardless of workflow outcome, for debugging.
+        meshes = [
+            (info, info.file_path) for info in self.part_infos if info.file_path is not None
+        ]
+        checksums = sha256_files(
+            [mesh for _, mesh in meshes], cache=ChecksumCache(self.checksums_filename)
+        )
         mesh_data: dict[str, Any] = {}
-        for part_info in self.part_infos:
-            if part_info.file_path is None:
-                continue
-            zip_path = (
-                f"{name}/original_{part_info.part_unique_name}"
-                f"{part_info.file_path.suffix.lower()}"
-            )
-            with (
-                open(part_info.file_path, "rb") as src,
-                zf.open(zip_path, "w") as dst,
-            ):
-                copyfileobj(src, dst)
+        for (part_info, mesh), checksum in zip(meshes, checksums):
+            zip_path = self._write_shared_member(zf, mesh, checksum)
             if self._is_analysis_target(part_info.part) and not part_info.disabled:
                 mesh_data[self._mesh_data_key(part_info.part.name)] = {"name": zip_path}
 
         for result in self.results:
-            w = self.client.workflows.get(result["id"])
-            while w.state not in ["success", "failure", "canceled"]:
-                sleep(1)
-                w = self.client.workflows.get(w.id)
+            w = self._wait_for_workflow(
+                self.client.workflows.get(
+                    result["id"], project_id=result.get("projectId")
+                )
+            )
 
             if w.state != "success":
                 continue
@@ -2250,6 +3150,50 @@ class CompressionSimulation:
             with TemporaryDirectory() as tempdir:
                 tempdir_path = Path(tempdir)
 
+                # Compress output: ship only the position datasets to keep the
+                # zip small. They're read remotely where possible, the rest of
+                # the output (stress, deformation) isn't transferred. Comes
+                # first, level of detail pyramids are built from positions.
+                # Levels are built after reduce_results_locally, so each is a
+                # subset of the shipped dataset and of the finer levels.
+                lod: dict[str, list[np.ndarray]] = {}
+                if self._contains_step(WorkflowStepType.COMPRESS):
+                    uo_asset = w.get_asset("compress.output")
+                    if uo_asset is not None:
+                        pn_hdf = tempdir_path / "position.h5"
+                        paths = [
+                            f"/material{i}/position"
+                            for i in range(n_materials)
+                            if not self.part_infos[i].disabled
+                        ]
+                        if not self._copy_remote_datasets(uo_asset, paths, pn_hdf):
+                            uo_hdf = tempdir_path / "compress.h5"
+                            self.client.assets.download_file(
+                                uo_asset.id, uo_hdf, uo_asset.project_id
+                            )
+                            with (
+                                pd.HDFStore(uo_hdf, "r") as src,
+                                pd.HDFStore(pn_hdf, "w") as dst,
+                            ):
+                                for path in paths:
+                                    if path in src:
+                                        dst[path] = src[path]
+
+                        pn_hdf = self._reduce_for_zip(pn_hdf)
+                        if self.lod_levels:
+                            lod = self._lod_ids(pn_hdf)
+                            add_lod_levels(pn_hdf, lod)
+
+                        pn_zip_path = f"{name}/position.h5"
+                        zf.write(pn_hdf, arcname=pn_zip_path)
+                        for i in range(n_materials):
+                            if self.part_infos[i].disabled:
+                                continue
+                            data[f"position{i}"] = self._with_lod_levels(
+                                {"name": pn_zip_path, "path": f"/material{i}/position"},
+                                len(lod.get(f"/material{i}", [])),
+                            )
+
                 # Postprocess HDFs that ship whole. Each entry:
                 # (step, asset_name, basename, dataset_root, key_prefix, has_histogram)
                 full_hdf_refs = [
@@ -2279,6 +3223,7 @@ class CompressionSimulation:
                     ),
                 ]
 
+                local_outputs = self._postprocess_locally(w, tempdir_path)
                 for (
                     step,
                     asset_name,
@@ -2289,56 +3234,36 @@ class CompressionSimulation:
                 ) in full_hdf_refs:
                     if not self._contains_step(step):
                         continue
-                    asset = w.get_asset(asset_name)
-                    if asset is None:
-                        continue
-                    local_path = tempdir_path / basename
-                    self.client.assets.download_file(asset.id, local_path)
+                    if dataset_root in local_outputs:
+                        local_path = local_outputs[dataset_root]
+                    else:
+                        asset = w.get_asset(asset_name)
+                        if asset is None:
+                            continue
+                        local_path = tempdir_path / basename
+                        self.client.assets.download_file(
+                            asset.id, local_path, asset.project_id
+                        )
+                    local_path = self._reduce_for_zip(local_path)
+                    if lod:
+                        add_lod_levels(
+                            local_path, lod, include=lambda key: not key.endswith("_histogram")
+                        )
                     zip_path = f"{name}/{basename}"
                     zf.write(local_path, arcname=zip_path)
                     for i in range(n_materials):
                         if self.part_infos[i].disabled:
                             continue
-                        data[f"{key_prefix}{i}"] = {
-                            "name": zip_path,
-                            "path": f"/material{i}/{dataset_root}",
-                        }
+                        data[f"{key_prefix}{i}"] = self._with_lod_levels(
+                            {"name": zip_path, "path": f"/material{i}/{dataset_root}"},
+                            len(lod.get(f"/material{i}", [])),
+                        )
                         if has_histogram:
                             data[f"{key_prefix}Histogram{i}"] = {
                                 "name": zip_path,
                                 "path": f"/material{i}/{dataset_root}_histogram",
                             }
 
-                # Compress output: download whole, but ship only the position
-                # datasets to keep the zip small.
-                if self._contains_step(WorkflowStepType.COMPRESS):
-                    uo_asset = w.get_asset("compress.output")
-                    if uo_asset is not None:
-                        uo_hdf = tempdir_path / "compress.h5"
-                        self.client.assets.download_file(uo_asset.id, uo_hdf)
-
-                        pn_hdf = tempdir_path / "position.h5"
-                        with (
-                            pd.HDFStore(uo_hdf, "r") as src,
-                            pd.HDFStore(pn_hdf, "w") as dst,
-                        ):
-                            for i in range(n_materials):
-                                if self.part_infos[i].disabled:
-                                    continue
-                                path = f"/material{i}/position"
-                                if path in src:
-                                    dst[path] = src[path]
-
-                        pn_zip_path = f"{name}/position.h5"
-                        zf.write(pn_hdf, arcname=pn_zip_path)
-                        for i in range(n_materials):
-                            if self.part_infos[i].disabled:
-                                continue
-                            data[f"position{i}"] = {
-                                "name": pn_zip_path,
-                                "path": f"/material{i}/position",
-                            }
-
                 # Force-displacement: ship whole.
                 energy_absorbed_cumulative = None
                 loading_energy = None
@@ -2347,7 +3272,9 @@ class CompressionSimulation:
                     fd_asset = w.get_asset("force-displacement.output")
                     if fd_asset is not None:
                         fd_hdf = tempdir_path / "force_disp.h5"
-                        self.client.assets.download_file(fd_asset.id, fd_hdf)
+                        self.client.assets.download_file(
+                            fd_asset.id, fd_hdf, fd_asset.project_id
+                        )
                         fd_zip_path = f"{name}/force_disp.h5"
                         zf.write(fd_hdf, arcname=fd_zip_path)
                         data["forceDisplacement"] = {
@@ -2379,7 +3306,9 @@ class CompressionSimulation:
                         )
                         if ss_asset is not None:
                             ss_hdf = tempdir_path / f"stress_strain_{i}.h5"
-                            self.client.assets.download_file(ss_asset.id, ss_hdf)
+                            self.client.assets.download_file(
+                                ss_asset.id, ss_hdf, ss_asset.project_id
+                            )
                             ss_zip_path = f"{name}/stress_strain_{i}.h5"
                             zf.write(ss_hdf, arcname=ss_zip_path)
                             data[f"stressStrain{i}"] = {
@@ -2403,6 +3332,27 @@ class CompressionSimulation:
             if unloading_energy is not None:
                 result["unloadingEnergy"] = round(float(unloading_energy), 4)
 
+    # Zip directory of the files shared by simulations, named by checksum
+    _SHARED_ZIP_DIR = "shared"
+
+    def _write_shared_member(self, zf: ZipFile, path: Path, checksum: str) -> str:
+        """Write a file into the zip under a name derived from its checksum,
+        unless an earlier simulation written to the zip already did. An
+        invariant mesh is stored once per experiment rather than once per
+        variant.
+
+        Returns:
+            Name of the zip member.
+        """
+        digest = checksum.split(":")[-1]
+        zip_path = f"{self._SHARED_ZIP_DIR}/{digest}{path.suffix.lower()}"
+        try:
+            zf.getinfo(zip_path)
+        except KeyError:
+            with open(path, "rb") as src, zf.open(zip_path, "w") as dst:
+                copyfileobj(src, dst)
+        return zip_path
+
     def _write_manifest_to_zip_v2(self, zf: ZipFile, all_results: list):
         """New schema manifest. If reference data is configured, prepend a
         reference result entry that the viewer will display alongside the
@@ -2429,7 +3379,7 @@ class CompressionSimulation:
         by jobId/assetName."""
         lookup: dict[str, str] = {}
         for job_id in workflow.jobs:
-            job = self.client.jobs.get(job_id)
+            job = self.client.jobs.get(job_id, project_id=workflow.project_id)
             if job is None or job.name is None:
                 continue
             lookup[job.name] = job_id
@@ -2489,6 +3439,8 @@ class CompressionSimulation:
         for step, dataset_root, key_prefix, has_histogram, local_job in full_hdf_refs:
             if not self._contains_step(step):
                 continue
+            if self.local_postprocess and step in self._LOCAL_POSTPROCESS_STEPS:
+                continue  # no server job to point at, only in the results zip
             raw_job_id = job_id_lookup.get(local_job, "")
             data_job_id = reduce_job_id or raw_job_id
             for i in range(n_materials):
@@ -2567,31 +3519,74 @@ class CompressionSimulation:
 
         return scalars
 
+    @property
+    def server_manifest_cache_filename(self) -> Path:
+        assert self.out_dir is not None
+        return self.out_dir / "server_manifest_cache.json"
+
+    def _server_result_key(self, result: dict) -> str:
+        """Checksum of a result and the simulation state its server manifest
+        entry is built from."""
+        state = {
+            "result": result,
+            "steps": [(s.type.value, s.part_names) for s in self.workflow_steps],
+            "local_postprocess": self.local_postprocess is not None,
+            "parts": [
+                (
+                    info.part.name,
+                    info.part_unique_name,
+                    info.disabled,
+                    info.material_index,
+                    info.interior_volume,
+                    info.file_path.name if info.file_path else None,
+                )
+                for info in self.part_infos
+            ],
+        }
+        data = json.dumps(state, sort_keys=True, default=str).encode()
+        return hashlib.sha256(data).hexdigest()
+
     def _write_server_manifest_for_pairs(
         self, pairs: list[tuple["CompressionSimulation", dict]]
     ) -> Optional[dict]:
         """Shared manifest-write path. `pairs` is a list of (sim, result) tuples;
         each result's server data is built from its associated sim's part_infos.
-        Used by both single-sim and experiment-level manifest writes."""
+        Used by both single-sim and experiment-level manifest writes.
+
+        Entries of finished workflows are cached by workflow ID, so rewriting
+        the manifest after adding variants only queries the new ones."""
+        # ensure material index is set on all parts for a multi-simulation experiment
+        for i, part_info in enumerate(self.part_infos):
+            part_info.material_index = i
+
+        cache = _ServerManifestCache(self.server_manifest_cache_filename)
         server_results = []
         for sim, result in pairs:
             wf_id = result.get("id")
             if not wf_id:
                 continue
+            key = sim._server_result_key(result)
+            cached = cache.get(wf_id, key)
+            if cached is not None:
+                server_results.append(cached)
+                continue
             server_result = {k: v for k, v in result.items() if k != "data"}
             try:
-                workflow = sim.client.workflows.get(wf_id)
+                workflow = sim.client.workflows.get(
+                    wf_id, project_id=result.get("projectId")
+                )
                 job_id_lookup = sim._build_job_id_lookup(workflow)
                 server_result["data"] = sim._build_server_data_for_workflow(workflow, job_id_lookup)
                 server_result.update(sim._build_server_scalars_for_workflow(workflow, job_id_lookup))
             except Exception as e:
                 print(f"WARNING: couldn't build server data for {wf_id}: {e}")
                 server_result["data"] = {}
+            else:
+                # Jobs of unfinished workflows may still change
+                if workflow.state in FINAL_STATES:
+                    cache.put(wf_id, key, server_result)
             server_results.append(server_result)
-
-        # ensure material index is set on all parts for a multi-simulation experiment
-        for i, part_info in enumerate(self.part_infos):
-            part_info.material_index = i
+        cache.save()
 
         self.make_manifest_v2(results=server_results)
         manifest = copy.deepcopy(self.manifest)
@@ -2601,6 +3596,7 @@ class CompressionSimulation:
         )
         return manifest
 
+    @_traced("simulation.write_server_manifest")
     def write_server_manifest(self) -> Optional[dict]:
         """Build and write a server manifest covering this sim's own results."""
         if not self.results:
@@ -2609,43 +3605,57 @@ class CompressionSimulation:
         pairs = [(self, r) for r in self.results]
         return self._write_server_manifest_for_pairs(pairs)
 
-    def upload_server_manifest(self) -> None:
-        """Build, write, and set the server manifest as project data."""
+    @_traced("simulation.upload_server_manifest")
+    def upload_server_manifest(self, revalidate: bool = False) -> None:
+        """Build, write, and set the server manifest as project data.
+
+        Args:
+            revalidate: Download the project data to check it still holds the
+                manifest last uploaded, e.g. if it may have been edited
+                elsewhere, instead of trusting the local record of the upload.
+        """
         manifest = self.write_server_manifest()
         if manifest is None:
             return
-        self.client.projects.update(data=manifest)
-        print(f"Uploaded server manifest to project {self.project_id}")
+        self._upload_server_manifest(manifest, revalidate)
+
+    def _upload_server_manifest(self, manifest: dict, revalidate: bool = False) -> None:
+        """Set the manifest as project data, unless it's the manifest last
+        uploaded to the project (and, if revalidate is set, the project still
+        holds it). Project data can only be replaced as a whole."""
+        project_id = self.client.project_id(self.project_id or None)
+        checksum = _manifest_checksum(manifest)
+        cache = _ServerManifestCache(self.server_manifest_cache_filename)
+        if cache.uploaded(project_id) == checksum and (
+            not revalidate
+            or _manifest_checksum(self.client.projects.get(project_id).project) == checksum
+        ):
+            print(f"Server manifest of project {project_id} is up to date")
+            return
+        self.client.projects.update(project_id, data=manifest)
+        cache.set_uploaded(project_id, checksum)
+        cache.save()
+        print(f"Uploaded server manifest to project {project_id}")
 
     def _build_reference_result_v2(self, zf: ZipFile) -> Optional[dict]:
         """Read the reference CSV (expected columns: Displacement, Force),
         write it as an HDF into the zip, and return a result entry pointing
         at it. Returns None if the CSV can't be read."""
+        import pandas as pd
+
         try:
-            ref_df = pd.read_csv(self.reference_data.csv_path)
+            ref_df = self.reference_data.read_curve()
         except Exception as e:
             print(f"WARNING: failed to read reference CSV: {e}")
             return None
 
-        # Normalize column names to what the viewer expects.
-        rename_map = {}
-        for col in ref_df.columns:
-            lower = col.lower()
-            if lower == "displacement":
-                rename_map[col] = "displacement"
-            elif lower == "force":
-                rename_map[col] = "force"
-        ref_df = ref_df.rename(columns=rename_map)
-
-        if "displacement" not in ref_df.columns or "force" not in ref_df.columns:
+        if ref_df is None:
             print(
                 "WARNING: reference CSV missing 'displacement' or 'force' columns — "
                 "reference curve will not appear."
             )
             return None
 
-        ref_df = ref_df[["displacement", "force"]]
-
         with TemporaryDirectory() as tempdir:
             hdf_path = Path(tempdir) / "reference.h5"
             with pd.HDFStore(hdf_path, "w") as store:
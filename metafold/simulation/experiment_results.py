@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from functools import cached_property
+from os import PathLike
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Optional, Sequence
+from zipfile import ZIP_STORED, ZipFile
+import json
+import mmap
+import numpy as np
+import struct
+import uuid
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+    from metafold.simulation.compression_simulation import ReferenceData
+
+# Scalar result fields, as written to the manifest
+SCALAR_KEYS = ("volume", "energyAbsorbed", "loadingEnergy", "unloadingEnergy")
+
+# Size of a zip local file header before its variable length fields
+_LOCAL_HEADER_SIZE = 30
+
+
+class ExperimentResults:
+    """Results of an experiment, for analysis across its variants.
+
+    Reads the out.zip written by CompressionExperiment.download_results (or
+    CompressionSimulation.write_results), or a directory it was extracted to.
+    Nothing is read up front. HDF members are opened when first needed: in a
+    directory they are opened in place, in a zip they are read into memory
+    (see _member_bytes), so an open zip member costs up to twice its size.
+
+    Data of all variants is returned stacked, one row per variant in manifest
+    order, so comparisons are single array operations:
+
+        results = ExperimentResults("out/out.zip")
+        grid, force = results.resample("forceDisplacement")
+        best = results.names[np.argmax(results.scalars("energyAbsorbed"))]
+
+    The experimental reference curve, if any, is kept apart as `reference`.
+    """
+
+    def __init__(self, path: str | PathLike) -> None:
+        """Initialize results. Nothing is read until it's needed.
+
+        Args:
+            path: Results zip or directory.
+        """
+        self.path = Path(path)
+        self._zip: Optional[ZipFile] = None
+        self._mmap: Optional[mmap.mmap] = None
+        self._curves: dict[tuple[str, str], pd.DataFrame] = {}
+
+    @cached_property
+    def manifest(self) -> dict[str, Any]:
+        """Results manifest."""
+        if self.path.is_dir():
+            return json.loads((self.path / "manifest.json").read_text())
+        return json.loads(self._archive().read("manifest.json"))
+
+    @cached_property
+    def results(self) -> list[dict]:
+        """Result entries of the variants, in manifest order."""
+        return [r for r in self.manifest.get("results", []) if not r.get("isExperimental")]
+
+    @cached_property
+    def reference(self) -> Optional[dict]:
+        """Result entry of the experimental reference, if any."""
+        return next(
+            (r for r in self.manifest.get("results", []) if r.get("isExperimental")), None
+        )
+
+    def __enter__(self) -> "ExperimentResults":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def __len__(self) -> int:
+        return len(self.results)
+
+    def close(self) -> None:
+        """Release the archive and its memory map."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._zip is not None:
+            self._zip.close()
+            self._zip = None
+
+    @property
+    def names(self) -> list[str]:
+        """Variant names."""
+        return [r.get("name", "") for r in self.results]
+
+    def scalars(self, key: str) -> np.ndarray:
+        """A scalar of every variant, e.g. "energyAbsorbed".
+
+        Returns:
+            Array of shape (variants,), NaN where the scalar is missing.
+        """
+        return np.array(
+            [float(r[key]) if r.get(key) is not None else np.nan for r in self.results]
+        )
+
+    def scalar_table(self, keys: Sequence[str] = SCALAR_KEYS) -> np.ndarray:
+        """Several scalars of every variant.
+
+        Returns:
+            Array of shape (variants, len(keys)).
+        """
+        return np.stack([self.scalars(k) for k in keys], axis=1)
+
+    def frame(self, index: int, data_key: str) -> Optional[pd.DataFrame]:
+        """Read a dataset of a variant, e.g. "position1".
+
+        Returns:
+            The dataset, None if the variant doesn't have it.
+        """
+        return self._read(self.results[index], data_key)
+
+    def reference_frame(self, data_key: str = "forceDisplacement") -> Optional[pd.DataFrame]:
+        """Read a dataset of the reference result, None without one."""
+        return self._read(self.reference, data_key) if self.reference else None
+
+    def curves(
+        self, data_key: str = "forceDisplacement", x: str = "displacement", y: str = "force"
+    ) -> list[Optional[tuple[np.ndarray, np.ndarray]]]:
+        """The (x, y) curve of every variant, None where it's missing.
+
+        Curves are cached, they're small and read repeatedly.
+        """
+        return [self._curve(r, data_key, x, y) for r in self.results]
+
+    def resample(
+        self,
+        data_key: str = "forceDisplacement",
+        x: str = "displacement",
+        y: str = "force",
+        grid: Optional[np.ndarray] = None,
+        num: int = 200,
+        branch: str = "loading",
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Curves of every variant, resampled onto a common grid.
+
+        Compression curves go out and back (loading, then unloading), so one
+        branch is resampled at a time. A branch is the part of the curve up to
+        (loading) or from (unloading) its largest x, made monotonic to absorb
+        noise.
+
+        Args:
+            data_key: Dataset of the curves, e.g. "stressStrain1".
+            x: Column of the grid axis.
+            y: Column of the values.
+            grid: Grid to resample onto. Defaults to num points from 0 to the
+                smallest x range of all curves, where every curve has values.
+            num: Number of grid points if grid isn't given.
+            branch: "loading" or "unloading".
+
+        Returns:
+            Grid, and values of shape (variants, grid points). Rows of
+            variants without the curve, and points outside a curve's range,
+            are NaN.
+        """
+        branches = [
+            _branch(*c, branch) if c is not None else None
+            for c in self.curves(data_key, x, y)
+        ]
+        if grid is None:
+            extents = [b[0][-1] for b in branches if b is not None and len(b[0])]
+            grid = np.linspace(0.0, min(extents) if extents else 0.0, num)
+        grid = np.asarray(grid, dtype=np.float64)
+        return grid, batch_interp(grid, branches)
+
+    def score(
+        self,
+        reference: Optional[ReferenceData] = None,
+        data_key: str = "forceDisplacement",
+        branch: str = "loading",
+    ) -> CurveScores:
+        """Score the force-displacement curve of every variant against the
+        experimental reference.
+
+        Curves are interpolated onto the displacements of the reference
+        branch, all variants at once.
+
+        Args:
+            reference: Reference curve (CSV) and energy. Defaults to the
+                reference result shipped in the results.
+            data_key: Dataset of the simulated curves.
+            branch: Branch of the curves to compare, "loading" or
+                "unloading".
+
+        Returns:
+            Scores of every variant.
+
+        Raises:
+            ValueError: If there's no reference curve.
+        """
+        ref_energy: Optional[float]
+        if reference is not None:
+            ref_df = reference.read_curve()
+            ref_energy = reference.energy_absorbed
+        else:
+            ref_df = self.reference_frame()
+            ref_energy = (self.reference or {}).get("energyAbsorbed")
+        if ref_df is None or ref_df.empty:
+            raise ValueError("No reference force-displacement curve to score against")
+        ref_x, ref_y = _branch(
+            ref_df["displacement"].to_numpy(dtype=np.float64),
+            ref_df["force"].to_numpy(dtype=np.float64),
+            branch,
+        )
+
+        curves = self.curves(data_key)
+        residuals = batch_interp(
+            ref_x, [_branch(*c, branch) if c is not None else None for c in curves]
+        ) - ref_y
+        matched = np.isfinite(residuals)
+        counts = matched.sum(axis=1)
+        squares = np.where(matched, residuals, 0.0) ** 2
+        rmse = np.sqrt(
+            np.divide(squares.sum(axis=1), counts, out=np.full(len(curves), np.nan), where=counts > 0)
+        )
+
+        ref_peak = float(np.nanmax(ref_df["force"].to_numpy(dtype=np.float64)))
+        peaks = np.array(
+            [np.nanmax(c[1]) if c is not None and len(c[1]) else np.nan for c in curves]
+        )
+        energies = self.scalars("energyAbsorbed")
+        return CurveScores(
+            names=self.names,
+            rmse=rmse,
+            coverage=counts / max(len(ref_x), 1),
+            peak_force_error=(peaks - ref_peak) / ref_peak if ref_peak else peaks * np.nan,
+            energy_error=(
+                (energies - ref_energy) / ref_energy if ref_energy else energies * np.nan
+            ),
+        )
+
+    def _curve(
+        self, result: dict, data_key: str, x: str, y: str
+    ) -> Optional[tuple[np.ndarray, np.ndarray]]:
+        ref = result.get("data", {}).get(data_key)
+        if ref is None or "path" not in ref:
+            return None
+        cache_key = (ref["name"], ref["path"])
+        df = self._curves.get(cache_key)
+        if df is None:
+            df = self._read(result, data_key)
+            if df is None:
+                return None
+            self._curves[cache_key] = df
+        if x not in df.columns or y not in df.columns:
+            return None
+        return (
+            df[x].to_numpy(dtype=np.float64),
+            df[y].to_numpy(dtype=np.float64),
+        )
+
+    def _read(self, result: Optional[dict], data_key: str) -> Optional[pd.DataFrame]:
+        import pandas as pd
+
+        ref = (result or {}).get("data", {}).get(data_key)
+        if ref is None or "path" not in ref:
+            return None
+        with self._open_store(ref["name"]) as store:
+            if ref["path"] not in store:
+                return None
+            df: Any = store[ref["path"]]
+        return df if isinstance(df, pd.DataFrame) else df.to_frame()
+
+    def _open_store(self, member: str) -> pd.HDFStore:
+        import pandas as pd
+
+        if self.path.is_dir():
+            return pd.HDFStore(self.path / member, "r")
+        # PyTables' in-memory driver opens an HDF image without a backing
+        # file, the name only has to be unique
+        return pd.HDFStore(
+            f"{uuid.uuid4().hex}.h5",
+            "r",
+            driver="H5FD_CORE",
+            driver_core_image=self._member_bytes(member),
+            driver_core_backing_store=0,
+        )
+
+    def _archive(self) -> ZipFile:
+        if self._zip is None:
+            self._zip = ZipFile(self.path)
+        return self._zip
+
+    def _member_bytes(self, member: str) -> bytes:
+        """Contents of a zip member, for PyTables' in-memory driver.
+
+        Stored members are sliced from a memory map of the archive, which
+        skips zipfile's buffered read and CRC pass but still copies the
+        member into a bytes object. PyTables copies that again into the
+        driver's image. HDF5 can't open a file at an arbitrary offset, and
+        PyTables can't read from a Python file object, so the copies can't be
+        avoided without extracting the member to disk.
+        """
+        archive = self._archive()
+        info = archive.getinfo(member)
+        if info.compress_type != ZIP_STORED:
+            return archive.read(info)
+        if self._mmap is None:
+            assert archive.fp is not None
+            self._mmap = mmap.mmap(archive.fp.fileno(), 0, access=mmap.ACCESS_READ)
+        # Data follows the member's local header, whose name and extra fields
+        # may differ in length from the central directory's
+        offset = info.header_offset
+        name_len, extra_len = struct.unpack_from("<HH", self._mmap, offset + 26)
+        start = offset + _LOCAL_HEADER_SIZE + name_len + extra_len
+        return self._mmap[start:start + info.file_size]
+
+
+@dataclass
+class CurveScores:
+    """Scores of simulated curves against a reference curve, one entry per
+    variant. NaN where a variant has no curve or scalar to compare."""
+
+    names: list[str]
+    # Root mean square force error over the reference displacements the
+    # simulated curve covers, see coverage for how many that are
+    rmse: np.ndarray
+    # Fraction of the reference displacements the simulated curve covers
+    coverage: np.ndarray
+    # Relative error of the peak force, signed
+    peak_force_error: np.ndarray
+    # Relative error of the absorbed energy, signed
+    energy_error: np.ndarray
+
+    def ranking(self, by: str = "rmse") -> np.ndarray:
+        """Variant indices, best first by the absolute value of a score
+        ("rmse", "peak_force_error" or "energy_error"). Variants without the
+        score come last."""
+        if by not in ("rmse", "peak_force_error", "energy_error"):
+            raise ValueError(f"Unknown score '{by}'")
+        values = np.abs(getattr(self, by))
+        return np.argsort(np.where(np.isnan(values), np.inf, values), kind="stable")
+
+
+def batch_interp(
+    grid: np.ndarray, curves: Sequence[Optional[tuple[np.ndarray, np.ndarray]]]
+) -> np.ndarray:
+    """Linearly interpolate many curves onto one grid.
+
+    Equivalent to np.interp per curve, but a single search over all curves:
+    curves and copies of the grid are shifted apart onto disjoint intervals
+    and concatenated.
+
+    Args:
+        grid: Points to interpolate at.
+        curves: (x, y) of each curve, x non-decreasing, or None.
+
+    Returns:
+        Array of shape (curves, grid points). NaN outside a curve's x range
+        and for missing curves.
+    """
+    grid = np.asarray(grid, dtype=np.float64)
+    values = np.full((len(curves), grid.size), np.nan)
+    present = [(i, c) for i, c in enumerate(curves) if c is not None and len(c[0])]
+    if not present or grid.size == 0:
+        return values
+    rows = [i for i, _ in present]
+    # Single points are interpolated as zero-length segments
+    xs = [np.resize(np.asarray(c[0], np.float64), max(len(c[0]), 2)) for _, c in present]
+    ys = [np.resize(np.asarray(c[1], np.float64), max(len(c[1]), 2)) for _, c in present]
+    lengths = np.array([len(x) for x in xs])
+    ends = np.cumsum(lengths)
+    starts = ends - lengths
+    x = np.concatenate(xs)
+    y = np.concatenate(ys)
+
+    lo = min(x.min(), grid.min())
+    span = max(x.max(), grid.max()) - lo + 1.0
+    offsets = np.arange(len(rows)) * span
+    shifted_x = x - lo + np.repeat(offsets, lengths)
+    shifted_grid = (grid - lo)[None, :] + offsets[:, None]
+
+    right = np.searchsorted(shifted_x, shifted_grid, side="right")
+    right = np.clip(right, starts[:, None] + 1, ends[:, None] - 1)
+    x0, x1 = shifted_x[right - 1], shifted_x[right]
+    y0, y1 = y[right - 1], y[right]
+    dx = x1 - x0
+    t = np.divide(shifted_grid - x0, dx, out=np.zeros_like(shifted_grid), where=dx > 0)
+    inside = (grid[None, :] >= x[starts][:, None]) & (grid[None, :] <= x[ends - 1][:, None])
+    values[rows] = np.where(inside, y0 + t * (y1 - y0), np.nan)
+    return values
+
+
+def _branch(x: np.ndarray, y: np.ndarray, branch: str) -> tuple[np.ndarray, np.ndarray]:
+    finite = np.isfinite(x) & np.isfinite(y)
+    x, y = x[finite], y[finite]
+    if x.size == 0:
+        return x, y
+    peak = int(np.argmax(x))
+    if branch == "loading":
+        x, y = x[:peak + 1], y[:peak + 1]
+    elif branch == "unloading":
+        x, y = x[peak:][::-1], y[peak:][::-1]
+    else:
+        raise ValueError(f"Unknown branch '{branch}', expected 'loading' or 'unloading'")
+    return np.maximum.accumulate(x), y
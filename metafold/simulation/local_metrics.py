@@ -0,0 +1,173 @@
+"""Local counterpart of the implicit/metrics job.
+
+Computes the interior volume, surface area and bounds of a part from the
+volume sampled for it by the prep workflow (see
+CompressionSimulation.load_sampled_volume). Samples below the iso-level are
+interior.
+
+The volume is processed a slab of z slices at a time on a thread pool (see
+local_postprocess.worker_threads), so memory-mapped volumes never have to be
+read whole.
+"""
+from __future__ import annotations
+
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import TYPE_CHECKING, Optional
+import numpy as np
+
+from metafold.simulation.local_postprocess import worker_threads
+
+if TYPE_CHECKING:
+    from metafold.simulation.compression_simulation import SampledVolume
+
+
+@dataclass
+class LocalMetricsOptions:
+    # Samples below this level are interior
+    iso_level: float = 0.0
+    # z slices processed at a time
+    chunk_slices: int = 32
+    # Worker threads, see local_postprocess.worker_threads
+    threads: Optional[int] = None
+
+    def __post_init__(self):
+        if self.chunk_slices < 1:
+            raise ValueError("Expected chunk_slices to be at least 1")
+
+
+@dataclass
+class VolumeMetrics:
+    # Number of interior samples
+    interior_samples: int
+    # Interior samples times the volume of a voxel
+    interior_volume: float
+    # Area of the iso-surface
+    surface_area: float
+    # Corners of the box around the interior samples, None without any
+    bounds_min: Optional[np.ndarray] = None
+    bounds_max: Optional[np.ndarray] = None
+
+    @property
+    def extents(self) -> np.ndarray:
+        """Size of the box around the interior samples along x, y and z."""
+        if self.bounds_min is None or self.bounds_max is None:
+            return np.zeros(3)
+        return self.bounds_max - self.bounds_min
+
+
+@dataclass
+class _SlabMetrics:
+    interior_samples: int
+    surface_area: float
+    # Interior samples along each array axis (z, y, x) of the slab
+    occupied: tuple[np.ndarray, ...]
+
+
+def volume_metrics(
+    volume: SampledVolume, options: Optional[LocalMetricsOptions] = None
+) -> VolumeMetrics:
+    """Metrics of a sampled volume.
+
+    The surface area is estimated from the sign changes between neighbouring
+    samples: each change along an axis stands for a patch of surface whose
+    projection is a voxel face, weighted by the alignment of the surface
+    normal (the field gradient) with the axis, so slanted surfaces aren't
+    over-counted.
+
+    Args:
+        volume: Sampled volume.
+        options: Processing options.
+
+    Returns:
+        Volume metrics. Lengths are in the units of the volume.
+    """
+    options = options or LocalMetricsOptions()
+    data = volume.data
+    if data.ndim != 3:
+        raise ValueError(f"Expected a 3D volume, got shape {data.shape}")
+    # Spacing along the array axes (z, y, x)
+    spacing = volume.spacing[::-1].astype(np.float64)
+    nz = data.shape[0]
+    starts = range(0, nz, options.chunk_slices)
+    threads = worker_threads(options.threads)
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        slabs = list(
+            pool.map(
+                lambda z0: _slab_metrics(
+                    data, z0, min(z0 + options.chunk_slices, nz), spacing, options.iso_level
+                ),
+                starts,
+            )
+        )
+
+    interior_samples = sum(s.interior_samples for s in slabs)
+    metrics = VolumeMetrics(
+        interior_samples=interior_samples,
+        interior_volume=interior_samples * float(np.prod(spacing)),
+        surface_area=sum(s.surface_area for s in slabs),
+    )
+    if interior_samples:
+        occupied = [np.concatenate([s.occupied[0] for s in slabs])]
+        occupied += [np.any([s.occupied[a] for s in slabs], axis=0) for a in (1, 2)]
+        first = np.array([np.argmax(o) for o in occupied])
+        last = np.array([len(o) - 1 - np.argmax(o[::-1]) for o in occupied])
+        # Back to x, y, z
+        metrics.bounds_min = volume.offset + first[::-1] * volume.spacing
+        metrics.bounds_max = volume.offset + last[::-1] * volume.spacing
+    return metrics
+
+
+def _slab_metrics(
+    data: np.ndarray, z0: int, z1: int, spacing: np.ndarray, iso_level: float
+) -> _SlabMetrics:
+    # Metrics of slices [z0, z1), and of the sign changes between them and
+    # the following slice. Reads a slice either side for the gradients.
+    nz = data.shape[0]
+    lo, hi = max(z0 - 1, 0), min(z1 + 1, nz)
+    block = np.ascontiguousarray(data[lo:hi], dtype=np.float32)
+    inside = block < iso_level
+    own = inside[z0 - lo : z1 - lo]
+    interior_samples = int(np.count_nonzero(own))
+
+    # Sign changes are found on the flattened block, comparing each sample
+    # with the one a stride on, which is much faster than in 3D
+    area = 0.0
+    flat = block.reshape(-1)
+    flat_inside = inside.reshape(-1)
+    strides = np.array(block.strides) // block.itemsize
+    start, stop = (z0 - lo) * strides[0], (z1 - lo) * strides[0]
+    for axis in range(3):
+        stride = strides[axis]
+        # Pairs (p, q = p + 1 along axis) with p in the slab
+        end = min(stop, len(flat) - stride)
+        fp = np.flatnonzero(flat_inside[start:end] != flat_inside[start + stride : end + stride])
+        fp += start
+        p = [fp // strides[0], fp // strides[1] % block.shape[1], fp % block.shape[2]]
+        if axis > 0:
+            # Drop the pairs that wrap around to the next row or slice
+            keep = p[axis] < block.shape[axis] - 1
+            fp, p = fp[keep], [c[keep] for c in p]
+        if not len(fp):
+            continue
+        fq = fp + stride
+        # Field gradient between p and q: the difference along the axis, and
+        # the central differences (one-sided at the borders) across it at p.
+        # Single precision is plenty for the weights.
+        h = spacing.astype(np.float32)
+        aligned = ((flat.take(fq) - flat.take(fp)) / h[axis]) ** 2
+        g2 = aligned.copy()
+        for t in range(3):
+            if t == axis:
+                continue
+            up = p[t] < block.shape[t] - 1
+            down = p[t] > 0
+            diff = flat.take(fp + up * strides[t]) - flat.take(fp - down * strides[t])
+            g2 += (diff / (h[t] * np.maximum(up.astype(np.float32) + down, 1))) ** 2
+        alignment = np.sqrt(aligned / np.where(g2 > 0, g2, 1))
+        face = np.prod(np.delete(spacing, axis))
+        area += float(alignment.sum(dtype=np.float64)) * face
+
+    occupied = tuple(np.asarray(own.any(axis=a)) for a in ((1, 2), (0, 2), (0, 1)))
+    return _SlabMetrics(interior_samples, area, occupied)
+
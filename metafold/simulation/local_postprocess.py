@@ -0,0 +1,318 @@
+"""Local counterparts of the sim/postprocess/von-mises-stress,
+effective-strain and particle-displacement jobs.
+
+Derives the per-particle fields and their histograms from the tensors and
+positions in the compress output. Outputs have the layout of the server jobs:
+"/material<i>/<field>" with "time", "id" and a value column ("v", or "norm"
+for displacements), and "/material<i>/<field>_histogram" indexed by (time,
+bin) with "bin_left", "bin_right" and "frequency" columns.
+
+Tensors are read a chunk of rows at a time and processed as (n, 3, 3) blocks
+on a thread pool, see worker_threads(). Each chunk is appended to the output
+as soon as it's done, and histograms are counted in a second pass over the
+output, so memory doesn't grow with the size of the compress output.
+"""
+from __future__ import annotations
+
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Callable, Iterable, Iterator, Optional
+import numpy as np
+import os
+
+from metafold.simulation.parquet_export import iter_hdf_chunks
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Output datasets and the compress output datasets they're derived from
+VON_MISES_STRESS = "von_mises_stress"
+EFFECTIVE_STRAIN = "effective_strain"
+PARTICLE_DISPLACEMENT = "particle_displacement"
+SOURCES = {
+    VON_MISES_STRESS: "cauchy_stress",
+    EFFECTIVE_STRAIN: "deformation_gradient",
+    PARTICLE_DISPLACEMENT: "position",
+}
+
+# Symmetric tensors stored as 6 columns are in Voigt order
+_VOIGT = [(0, 0), (1, 1), (2, 2), (1, 2), (0, 2), (0, 1)]
+
+
+@dataclass
+class LocalPostprocessOptions:
+    # Rows of the compress output read and processed at a time
+    chunk_rows: int = 1 << 18
+    # Worker threads, see worker_threads()
+    threads: Optional[int] = None
+    # Histogram bins per time step, spanning the range over all time steps
+    histogram_bins: int = 50
+
+    def __post_init__(self):
+        if self.chunk_rows < 1:
+            raise ValueError("Expected chunk_rows to be at least 1")
+        if self.histogram_bins < 1:
+            raise ValueError("Expected histogram_bins to be at least 1")
+
+
+def worker_threads(threads: Optional[int]) -> int:
+    """Size of the thread pool for a threads option, None for one per CPU.
+
+    Threads rather than processes, as NumPy releases the GIL for the heavy
+    lifting and the data is shared without copies.
+    """
+    return threads or os.cpu_count() or 1
+
+
+def tensors(values: np.ndarray) -> np.ndarray:
+    """(n, 3, 3) tensors from rows of 9 (row-major) or 6 (Voigt: xx, yy, zz,
+    yz, xz, xy) components."""
+    values = np.asarray(values, dtype=np.float64)
+    if values.shape[1] == 9:
+        return values.reshape(-1, 3, 3)
+    if values.shape[1] == 6:
+        t = np.empty((len(values), 3, 3))
+        for k, (i, j) in enumerate(_VOIGT):
+            t[:, i, j] = t[:, j, i] = values[:, k]
+        return t
+    raise ValueError(f"Expected 6 or 9 tensor components, got {values.shape[1]}")
+
+
+def von_mises_stress(sigma: np.ndarray) -> np.ndarray:
+    """Von Mises equivalent of (n, 3, 3) Cauchy stresses:
+    sqrt(3/2 s:s) of the deviatoric stress s."""
+    s = _deviatoric(sigma)
+    return np.sqrt(1.5 * np.einsum("nij,nij->n", s, s))
+
+
+def effective_strain(f: np.ndarray) -> np.ndarray:
+    """Von Mises equivalent strain of (n, 3, 3) deformation gradients:
+    sqrt(2/3 e:e) of the deviatoric logarithmic (Hencky) strain e, computed
+    from the principal stretches of C = F^T F."""
+    c = np.einsum("nki,nkj->nij", f, f)
+    # Principal logarithmic strains, clipped for degenerate gradients
+    e = 0.5 * np.log(np.maximum(np.linalg.eigvalsh(c), np.finfo(np.float64).tiny))
+    e -= e.mean(axis=1, keepdims=True)
+    return np.sqrt(2.0 / 3.0 * np.einsum("ni,ni->n", e, e))
+
+
+def displacement_norm(
+    ids: np.ndarray, positions: np.ndarray, ref_ids: np.ndarray, ref_positions: np.ndarray
+) -> np.ndarray:
+    """Distance of particles from their reference positions.
+
+    Args:
+        ids: Particle ids.
+        positions: (n, 3) positions.
+        ref_ids: Sorted ids of the reference positions.
+        ref_positions: (m, 3) reference positions.
+
+    Returns:
+        Displacement norms, NaN for particles without a reference position.
+    """
+    if len(ref_ids) == 0:
+        return np.full(len(ids), np.nan)
+    index = np.clip(np.searchsorted(ref_ids, ids), 0, len(ref_ids) - 1)
+    d = np.linalg.norm(positions - ref_positions[index], axis=1)
+    return np.where(ref_ids[index] == ids, d, np.nan)
+
+
+def histogram(times: np.ndarray, values: np.ndarray, bins: int) -> pd.DataFrame:
+    """Histogram of values per time step, over common bins.
+
+    Returns:
+        Frame indexed by (time, bin) with "bin_left", "bin_right" and
+        "frequency" columns.
+    """
+    finite = values[np.isfinite(values)]
+    h = _Histogram(
+        float(finite.min()) if len(finite) else 0.0,
+        float(finite.max()) if len(finite) else 1.0,
+        bins,
+    )
+    h.add(times, values)
+    return h.frame()
+
+
+class _Histogram:
+    # Histogram counted a chunk of values at a time, over bins spanning [lo, hi]
+
+    def __init__(self, lo: float, hi: float, bins: int) -> None:
+        self.edges = np.linspace(lo, hi if hi > lo else lo + 1.0, bins + 1)
+        self.counts: dict[float, np.ndarray] = {}
+
+    def add(self, times: np.ndarray, values: np.ndarray) -> None:
+        bins = len(self.edges) - 1
+        unique_times, time_index = np.unique(times, return_inverse=True)
+        finite = np.isfinite(values)
+        bin_index = np.clip(
+            np.searchsorted(self.edges, values[finite], side="right") - 1, 0, bins - 1
+        )
+        counts = np.bincount(
+            time_index[finite] * bins + bin_index, minlength=len(unique_times) * bins
+        ).reshape(-1, bins)
+        for t, c in zip(unique_times.tolist(), counts):
+            if t in self.counts:
+                self.counts[t] += c
+            else:
+                self.counts[t] = c
+
+    def frame(self) -> pd.DataFrame:
+        import pandas as pd
+
+        bins = len(self.edges) - 1
+        times = sorted(self.counts)
+        return pd.DataFrame(
+            {
+                "bin_left": np.tile(self.edges[:-1], len(times)),
+                "bin_right": np.tile(self.edges[1:], len(times)),
+                "frequency": np.concatenate(
+                    [self.counts[t] for t in times] or [np.empty(0, dtype=np.int64)]
+                ),
+            },
+            index=pd.MultiIndex.from_product([times, np.arange(bins)], names=["time", "bin"]),
+        )
+
+
+def postprocess_hdf(
+    src: Path,
+    outputs: dict[str, Path],
+    materials: Iterable[int],
+    options: LocalPostprocessOptions,
+) -> None:
+    """Derive fields from a compress output.
+
+    Args:
+        src: Compress output HDF store.
+        outputs: HDF store to write by field, any of VON_MISES_STRESS,
+            EFFECTIVE_STRAIN and PARTICLE_DISPLACEMENT.
+        materials: Material indices to process. Materials without the source
+            dataset are skipped.
+        options: Processing options.
+    """
+    import pandas as pd
+
+    materials = list(materials)
+    threads = worker_threads(options.threads)
+    with (
+        pd.HDFStore(src, "r") as store,
+        ThreadPoolExecutor(max_workers=threads) as pool,
+    ):
+        for field, dst in outputs.items():
+            with pd.HDFStore(dst, "w") as out:
+                for i in materials:
+                    key = f"/material{i}/{SOURCES[field]}"
+                    if key not in store:
+                        continue
+                    fn, column = _field_fn(field, store, key, options)
+                    out_key = f"/material{i}/{field}"
+                    rows = 0
+                    lo, hi = np.inf, -np.inf
+                    for times, ids, values in _map_chunks(
+                        pool, fn, iter_hdf_chunks(store, key, options.chunk_rows), 2 * threads
+                    ):
+                        finite = values[np.isfinite(values)]
+                        if len(finite):
+                            lo, hi = min(lo, finite.min()), max(hi, finite.max())
+                        out.append(
+                            out_key,
+                            pd.DataFrame(
+                                {"time": times, "id": ids, column: values},
+                                index=pd.RangeIndex(rows, rows + len(times)),
+                            ),
+                            format="table",
+                        )
+                        rows += len(times)
+                    if not rows:
+                        out[out_key] = pd.DataFrame(
+                            {"time": np.empty(0), "id": np.empty(0, dtype=np.int64), column: np.empty(0)}
+                        )
+                    if field == PARTICLE_DISPLACEMENT:
+                        continue
+                    # Second pass, the bins span the range of all time steps
+                    h = _Histogram(
+                        float(lo) if lo <= hi else 0.0,
+                        float(hi) if lo <= hi else 1.0,
+                        options.histogram_bins,
+                    )
+                    for chunk in iter_hdf_chunks(out, out_key, options.chunk_rows):
+                        h.add(chunk["time"].to_numpy(), chunk[column].to_numpy())
+                    out[f"{out_key}_histogram"] = h.frame()
+
+
+def _field_fn(
+    field: str, store: pd.HDFStore, key: str, options: LocalPostprocessOptions
+) -> tuple[Callable[[pd.DataFrame], np.ndarray], str]:
+    # Per-chunk computation of a field, and its value column
+    if field == VON_MISES_STRESS:
+        return lambda df: von_mises_stress(tensors(_values(df))), "v"
+    if field == EFFECTIVE_STRAIN:
+        return lambda df: effective_strain(tensors(_values(df))), "v"
+    ref_ids, ref_positions = _reference_positions(store, key, options)
+    return (
+        lambda df: displacement_norm(
+            df["id"].to_numpy(),
+            df[["x", "y", "z"]].to_numpy(dtype=np.float64),
+            ref_ids,
+            ref_positions,
+        ),
+        "norm",
+    )
+
+
+def _map_chunks(
+    pool: ThreadPoolExecutor,
+    fn: Callable[[pd.DataFrame], np.ndarray],
+    chunks: Iterator[pd.DataFrame],
+    in_flight: int,
+) -> Iterator[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    # Times, ids and values of each chunk, in order. Chunks are read on this
+    # thread (HDF5 reads aren't thread safe) and computed on the pool, with at
+    # most in_flight chunks pending so memory stays bounded.
+    pending: deque[tuple[np.ndarray, np.ndarray, Future]] = deque()
+    for chunk in chunks:
+        pending.append(
+            (chunk["time"].to_numpy(), chunk["id"].to_numpy(), pool.submit(fn, chunk))
+        )
+        if len(pending) >= in_flight:
+            times, ids, future = pending.popleft()
+            yield times, ids, future.result()
+    while pending:
+        times, ids, future = pending.popleft()
+        yield times, ids, future.result()
+
+
+def _reference_positions(
+    store: pd.HDFStore, key: str, options: LocalPostprocessOptions
+) -> tuple[np.ndarray, np.ndarray]:
+    # Positions at the first time step, sorted by id
+    first_time = np.inf
+    ids: list[np.ndarray] = []
+    positions: list[np.ndarray] = []
+    for chunk in iter_hdf_chunks(store, key, options.chunk_rows):
+        times = chunk["time"].to_numpy()
+        if not len(times):
+            continue
+        if times.min() < first_time:
+            first_time = times.min()
+            ids, positions = [], []
+        chunk = chunk[times == first_time]
+        ids.append(chunk["id"].to_numpy())
+        positions.append(chunk[["x", "y", "z"]].to_numpy(dtype=np.float64))
+    if not ids:
+        return np.empty(0, dtype=np.int64), np.empty((0, 3))
+    all_ids = np.concatenate(ids)
+    order = np.argsort(all_ids, kind="stable")
+    return all_ids[order], np.concatenate(positions)[order]
+
+
+def _deviatoric(t: np.ndarray) -> np.ndarray:
+    mean = np.einsum("nii->n", t) / 3.0
+    return t - mean[:, None, None] * np.eye(3)
+
+
+def _values(df: pd.DataFrame) -> np.ndarray:
+    columns = [c for c in df.columns if c not in ("time", "id", "index")]
+    return df[columns].to_numpy(dtype=np.float64)
@@ -0,0 +1,236 @@
+"""Columnar export of simulation results.
+
+Result tables are written as Parquet datasets in hive layout, partitioned
+by simulation, material and output time step, so they can be queried with
+pyarrow, pandas, DuckDB or Spark without loading whole HDF files. HDF
+datasets are streamed a chunk of rows at a time.
+"""
+from __future__ import annotations
+
+from collections import OrderedDict
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Iterator, Optional
+from urllib.parse import quote
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Rows read from an HDF dataset at a time, each becomes (at most) one row group
+DEFAULT_CHUNK_ROWS = 1 << 20
+
+# Partition files a writer keeps open at a time
+DEFAULT_MAX_OPEN_FILES = 32
+
+
+def _require_pyarrow() -> Any:
+    try:
+        import pyarrow
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "Parquet export requires pyarrow, install with: pip install metafold[parquet]"
+        ) from e
+    return pyarrow
+
+
+def iter_hdf_chunks(
+    store: pd.HDFStore, key: str, chunk_rows: int = DEFAULT_CHUNK_ROWS
+) -> Iterator[pd.DataFrame]:
+    """Read an HDF dataset a slice of rows at a time.
+
+    Works for both pandas storage formats. Index levels (e.g. time and id) are
+    returned as columns.
+
+    Args:
+        store: Open HDF store.
+        key: Dataset key.
+        chunk_rows: Maximum number of rows per chunk.
+
+    Returns:
+        Iterator over data frames.
+    """
+    storer = _storer(store, key)
+    if storer.is_table:
+        chunks: Any = store.select(key, chunksize=chunk_rows)
+        for chunk in chunks:
+            yield _flatten(chunk)
+        return
+    nrows = int(storer.shape[0]) if storer.shape else 0
+    for start in range(0, nrows, chunk_rows):
+        yield _flatten(_read_fixed_rows(storer, start, min(nrows, start + chunk_rows)))
+
+
+def _read_fixed_rows(storer: Any, start: int, stop: int) -> pd.DataFrame:
+    # FrameFixed.read(start=, stop=) slices MultiIndex levels along with the
+    # codes, so the index is assembled here from whole levels
+    import pandas as pd
+
+    nlevels = getattr(storer.attrs, "axis1_nlevels", None)
+    if nlevels is None:
+        return storer.read(start=start, stop=stop)
+    levels = [
+        storer.read_index_node(getattr(storer.group, f"axis1_level{i}"))
+        for i in range(nlevels)
+    ]
+    index = pd.MultiIndex(
+        levels=levels,
+        codes=[storer.read_array(f"axis1_label{i}", start, stop) for i in range(nlevels)],
+        names=[level.name for level in levels],
+    )
+    columns = storer.read_index("axis0")
+    blocks = [
+        pd.DataFrame(
+            storer.read_array(f"block{i}_values", start, stop).T,
+            columns=storer.read_index(f"block{i}_items"),
+            index=index,
+        )
+        for i in range(storer.nblocks)
+    ]
+    return pd.concat(blocks, axis=1)[columns]
+
+
+def _storer(store: Any, key: str) -> Any:
+    return store.get_storer(key)
+
+
+def _flatten(df: pd.DataFrame) -> pd.DataFrame:
+    if any(name is not None for name in df.index.names):
+        df = df.reset_index()
+    df.columns = [str(c) for c in df.columns]
+    return df
+
+
+class ParquetResultsWriter:
+    """Writes result tables as hive-partitioned Parquet datasets.
+
+    Each table lives in its own directory below the root, partitioned by the
+    given keys, e.g. "position/simulation=s0/material=midsole/timestep=3/".
+    Floating point columns are stored as float32. Every write becomes a row
+    group of the partition's file. At most max_open_files files are open at a
+    time, the least recently written is finished when another is needed, and a
+    partition written to again gets a new file ("part-1.parquet", ...). Time
+    steps come in order, so that's rare. The rest are finished by close().
+
+    Read the datasets back with dataset(), which dictionary-encodes the
+    partition keys so e.g. material filters are pushed down to the files.
+    """
+
+    def __init__(
+        self, root: str | Path, max_open_files: int = DEFAULT_MAX_OPEN_FILES
+    ) -> None:
+        """Initialize writer.
+
+        Args:
+            root: Output directory.
+            max_open_files: Maximum number of partition files open at a time.
+        """
+        if max_open_files < 1:
+            raise ValueError("Expected max_open_files to be at least 1")
+        self._pa = _require_pyarrow()
+        self.root = Path(root)
+        self._max_open_files = max_open_files
+        # Open writers, least recently written first
+        self._writers: OrderedDict[Path, Any] = OrderedDict()
+        # Schema and number of files of each partition written so far
+        self._schemas: dict[Path, Any] = {}
+        self._files: dict[Path, int] = {}
+
+    def __enter__(self) -> "ParquetResultsWriter":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def write_frame(self, table: str, df: pd.DataFrame, partitions: dict[str, Any]) -> None:
+        """Append rows to a partition of a table.
+
+        Args:
+            table: Table name, e.g. "force_displacement".
+            df: Rows, without the partition columns.
+            partitions: Partition key values, in directory order.
+        """
+        if df.empty:
+            return
+        pa = self._pa
+        arrays = {}
+        for c in df.columns:
+            values = df[c].to_numpy()
+            if np.issubdtype(values.dtype, np.floating):
+                values = values.astype(np.float32)
+            arrays[str(c)] = pa.array(values)
+        batch = pa.Table.from_pydict(arrays)
+        path = self.root / table
+        for k, v in partitions.items():
+            # Percent-encoded, as expected by pyarrow's hive partitioning
+            path /= f"{k}={quote(str(v), safe='')}"
+        writer = self._writers.get(path)
+        if writer is None:
+            while len(self._writers) >= self._max_open_files:
+                self._writers.popitem(last=False)[1].close()
+            path.mkdir(parents=True, exist_ok=True)
+            schema = self._schemas.setdefault(path, batch.schema)
+            n = self._files.get(path, 0)
+            writer = self._pa.parquet.ParquetWriter(path / f"part-{n}.parquet", schema)
+            self._files[path] = n + 1
+            self._writers[path] = writer
+        else:
+            self._writers.move_to_end(path)
+        writer.write_table(batch.cast(writer.schema))
+
+    def write_hdf(
+        self,
+        table: str,
+        store: pd.HDFStore,
+        key: str,
+        partitions: dict[str, Any],
+        timestep: Optional[Callable[[np.ndarray], np.ndarray]] = None,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+    ) -> None:
+        """Stream an HDF dataset into a table, one chunk of rows at a time.
+
+        Args:
+            table: Table name.
+            store: Open HDF store.
+            key: Dataset key.
+            partitions: Partition key values.
+            timestep: Optional mapping from the "time" column to time step
+                indices. Rows are further partitioned by time step if given.
+            chunk_rows: Maximum number of rows read at a time.
+        """
+        for chunk in iter_hdf_chunks(store, key, chunk_rows):
+            if timestep is None:
+                self.write_frame(table, chunk, partitions)
+                continue
+            steps = timestep(chunk["time"].to_numpy())
+            for step in np.unique(steps):
+                self.write_frame(
+                    table, chunk[steps == step], {**partitions, "timestep": int(step)}
+                )
+
+    def close(self) -> None:
+        """Finish all files."""
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def dataset(root: str | Path, table: str) -> Any:
+    """Open an exported table as a pyarrow dataset.
+
+    Args:
+        root: Export directory.
+        table: Table name.
+
+    Returns:
+        pyarrow.dataset.Dataset with hive partition columns, string keys
+        dictionary-encoded.
+    """
+    _require_pyarrow()
+    import pyarrow.dataset as ds
+
+    return ds.dataset(
+        Path(root) / table,
+        format="parquet",
+        partitioning=ds.HivePartitioning.discover(infer_dictionary=True),
+    )
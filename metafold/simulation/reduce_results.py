@@ -0,0 +1,284 @@
+"""Local counterpart of the sim/postprocess/reduce-results job.
+
+Shrinks per-particle result datasets (positions, stress, strain,
+displacement) for previews: a subset of the time steps, a deterministic
+subset of the particles, and values quantized to int16. The quantization
+parameters are stored with each dataset so values can be restored with
+dequantize_frame().
+
+Also builds level-of-detail pyramids: level l of a dataset "<key>" is stored
+as "<key>_lod<l>" and holds 1/4**l of the particles, see lod_ids().
+"""
+from __future__ import annotations
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Callable, Optional
+import json
+import numpy as np
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+# Quantized values span [-QMAX, QMAX], NaNs are stored as NAN_CODE
+QMAX = 32767
+NAN_CODE = -32768
+
+# Attribute of a reduced dataset holding its dequantization metadata
+QUANTIZATION_ATTR = "quantization"
+
+
+@dataclass
+class ReduceResultsOptions:
+    # Keep every time_stride-th time step. The last step is always kept.
+    time_stride: int = 1
+    # Keep at most this many particles per dataset, None keeps all
+    max_particles: Optional[int] = 20000
+    # Store values as int16 with per-column offset and scale
+    quantize: bool = True
+
+    def __post_init__(self):
+        if self.time_stride < 1:
+            raise ValueError("Expected time_stride to be at least 1")
+        if self.max_particles is not None and self.max_particles < 1:
+            raise ValueError("Expected max_particles to be at least 1")
+
+
+def select_times(times: np.ndarray, stride: int) -> np.ndarray:
+    """Every stride-th of the sorted unique times, and the last one."""
+    unique = np.unique(times)
+    if stride == 1 or unique.size == 0:
+        return unique
+    keep = unique[::stride]
+    if keep[-1] != unique[-1]:
+        keep = np.append(keep, unique[-1])
+    return keep
+
+
+def select_particles(ids: np.ndarray, max_particles: Optional[int]) -> np.ndarray:
+    """Deterministic subset of the sorted unique ids, evenly spaced over the
+    id range. The same ids are picked for every dataset of a material, so
+    reduced datasets still join on (time, id)."""
+    unique = np.unique(ids)
+    if max_particles is None or unique.size <= max_particles:
+        return unique
+    index = np.linspace(0, unique.size - 1, max_particles).round().astype(np.intp)
+    return unique[index]
+
+
+def quantize(values: np.ndarray) -> tuple[np.ndarray, float, float]:
+    """Map values onto int16 by min/max.
+
+    Returns:
+        Quantized values, offset and scale, such that
+        values ~= quantized * scale + offset.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    finite = np.isfinite(values)
+    if not finite.any():
+        return np.full(values.shape, NAN_CODE, dtype=np.int16), 0.0, 1.0
+    lo = float(values[finite].min())
+    hi = float(values[finite].max())
+    offset = (lo + hi) / 2
+    scale = (hi - lo) / (2 * QMAX) or 1.0
+    q = np.full(values.shape, NAN_CODE, dtype=np.int16)
+    q[finite] = np.clip(np.rint((values[finite] - offset) / scale), -QMAX, QMAX)
+    return q, offset, scale
+
+
+def dequantize(q: np.ndarray, offset: float, scale: float) -> np.ndarray:
+    """Inverse of quantize(), NaN where the value was missing."""
+    values = q.astype(np.float64) * scale + offset
+    values[q == NAN_CODE] = np.nan
+    return values
+
+
+def reduce_frame(
+    df: pd.DataFrame, options: ReduceResultsOptions
+) -> tuple[pd.DataFrame, dict[str, Any]]:
+    """Reduce a per-particle dataset.
+
+    Args:
+        df: Dataset with "time" and "id" columns or index levels and one
+            column per value, e.g. x, y, z.
+        options: Reduction options.
+
+    Returns:
+        Reduced dataset with "time" and "id" columns, and its dequantization
+        metadata: {"columns": {name: {"offset", "scale"}}, "nan": NAN_CODE}.
+        Empty if values aren't quantized.
+    """
+    import pandas as pd
+
+    df = df.reset_index()
+    times = df["time"].to_numpy()
+    ids = df["id"].to_numpy()
+
+    mask = np.isin(times, select_times(times, options.time_stride))
+    mask &= np.isin(ids, select_particles(ids, options.max_particles))
+
+    reduced = {"time": times[mask], "id": ids[mask]}
+    metadata: dict[str, Any] = {}
+    columns = [
+        c for c in df.columns
+        if c not in ("time", "id", "index") and pd.api.types.is_numeric_dtype(df[c])
+    ]
+    if options.quantize:
+        metadata = {"columns": {}, "nan": NAN_CODE}
+    for c in columns:
+        values = df[c].to_numpy()[mask]
+        if options.quantize:
+            q, offset, scale = quantize(values)
+            reduced[c] = q
+            metadata["columns"][str(c)] = {"offset": offset, "scale": scale}
+        else:
+            reduced[c] = values
+    return pd.DataFrame(reduced), metadata
+
+
+def dequantize_frame(df: pd.DataFrame, metadata: dict[str, Any]) -> pd.DataFrame:
+    """Restore float values of a dataset reduced by reduce_frame()."""
+    df = df.copy()
+    for c, m in metadata.get("columns", {}).items():
+        df[c] = dequantize(df[c].to_numpy(), m["offset"], m["scale"])
+    return df
+
+
+def reduce_hdf(
+    src: Path,
+    dst: Path,
+    options: ReduceResultsOptions,
+    include: Callable[[str], bool] = lambda key: True,
+) -> None:
+    """Write the reduced datasets of an HDF store to a new store.
+
+    Datasets excluded by include, e.g. histograms, are copied as is. The
+    dequantization metadata of a reduced dataset is stored as JSON in its
+    "quantization" attribute.
+
+    Args:
+        src: Source HDF store.
+        dst: Destination HDF store.
+        options: Reduction options.
+        include: Predicate on dataset keys, true for datasets to reduce.
+    """
+    import pandas as pd
+
+    with pd.HDFStore(src, "r") as s, pd.HDFStore(dst, "w") as d:
+        for key in s.keys():
+            df: Any = s[key]
+            if not include(key) or not {"time", "id"} <= _fields(df):
+                d[key] = df
+                continue
+            reduced, metadata = reduce_frame(df, options)
+            d[key] = reduced
+            if metadata:
+                setattr(_attrs(d, key), QUANTIZATION_ATTR, json.dumps(metadata))
+
+
+def read_reduced(store: pd.HDFStore, key: str) -> pd.DataFrame:
+    """Read a dataset written by reduce_hdf(), dequantizing its values."""
+    df: Any = store[key]
+    metadata = getattr(_attrs(store, key), QUANTIZATION_ATTR, None)
+    return dequantize_frame(df, json.loads(metadata)) if metadata else df
+
+
+def morton_codes(points: np.ndarray) -> np.ndarray:
+    """Z-order curve codes of 3D points, at 21 bits per axis over their
+    bounding box."""
+    points = np.asarray(points, dtype=np.float64)
+    lo = points.min(axis=0)
+    extent = np.maximum(points.max(axis=0) - lo, np.finfo(np.float64).tiny)
+    cells = ((points - lo) / extent * 0x1FFFFF).astype(np.uint64)
+    codes = np.zeros(len(points), dtype=np.uint64)
+    for axis in range(3):
+        codes |= _spread_bits(cells[:, axis]) << np.uint64(axis)
+    return codes
+
+
+def _spread_bits(v: np.ndarray) -> np.ndarray:
+    # Insert two zero bits between each of the low 21 bits
+    v = v & np.uint64(0x1FFFFF)
+    for shift, mask in (
+        (32, 0x1F00000000FFFF),
+        (16, 0x1F0000FF0000FF),
+        (8, 0x100F00F00F00F00F),
+        (4, 0x10C30C30C30C30C3),
+        (2, 0x1249249249249249),
+    ):
+        v = (v | (v << np.uint64(shift))) & np.uint64(mask)
+    return v
+
+
+def lod_ids(positions: pd.DataFrame, levels: int) -> list[np.ndarray]:
+    """Particle ids of each level of detail of a material.
+
+    Particles are ordered along a Z-order curve through their positions at
+    the first time step, and level l keeps every 4**l-th of them. Each level
+    thereby samples space evenly and is a subset of the finer levels, so
+    clients can load coarse levels first and refine.
+
+    Args:
+        positions: Position dataset with "time" and "id" columns or index
+            levels, and "x", "y" and "z" columns.
+        levels: Number of levels below the full dataset.
+
+    Returns:
+        Sorted ids of levels 1 to levels.
+    """
+    df = positions.reset_index()
+    first = df[df["time"] == df["time"].min()]
+    ids = first["id"].to_numpy()
+    if ids.size == 0:
+        return [ids] * levels
+    order = ids[np.argsort(morton_codes(first[["x", "y", "z"]].to_numpy()), kind="stable")]
+    return [np.sort(order[::4**level]) for level in range(1, levels + 1)]
+
+
+def add_lod_levels(
+    path: Path,
+    ids: dict[str, list[np.ndarray]],
+    include: Callable[[str], bool] = lambda key: True,
+) -> None:
+    """Add level-of-detail datasets to an HDF store.
+
+    Levels of datasets written by reduce_hdf() keep their dequantization
+    metadata, read them with read_reduced().
+
+    Args:
+        path: HDF store, updated in place.
+        ids: Particle ids of each level by material group, e.g. "/material0",
+            see lod_ids().
+        include: Predicate on dataset keys, true for datasets to add levels of.
+    """
+    import pandas as pd
+
+    with pd.HDFStore(path, "a") as store:
+        for key in store.keys():
+            group = key.rsplit("/", 1)[0]
+            if group not in ids or not include(key) or "_lod" in key:
+                continue
+            df: Any = store[key]
+            if not {"time", "id"} <= _fields(df):
+                continue
+            metadata = getattr(_attrs(store, key), QUANTIZATION_ATTR, None)
+            particle_ids = df.reset_index()["id"].to_numpy()
+            for level, level_ids in enumerate(ids[group], 1):
+                store[lod_key(key, level)] = df[np.isin(particle_ids, level_ids)]
+                if metadata:
+                    setattr(_attrs(store, lod_key(key, level)), QUANTIZATION_ATTR, metadata)
+
+
+def lod_key(key: str, level: int) -> str:
+    """Key of a level of detail of a dataset."""
+    return f"{key}_lod{level}"
+
+
+def _attrs(store: Any, key: str) -> Any:
+    return store.get_storer(key).attrs
+
+
+def _fields(df: Any) -> set[str]:
+    return {str(c) for c in getattr(df, "columns", [])} | {
+        str(n) for n in df.index.names
+    }
@@ -0,0 +1,93 @@
+from os import PathLike
+from pathlib import Path
+from threading import Lock
+from typing import Any, Optional
+import json
+import os
+
+from metafold.workflows import Workflow
+
+
+class ResultStore:
+    """Persistent map from simulation fingerprints to completed workflows.
+
+    Lets identical simulations reuse an existing workflow instead of being
+    dispatched again, across experiments and projects. See
+    CompressionSimulation.fingerprint() for what makes two simulations
+    identical.
+
+    Entries are kept in a JSON file which may be shared between runs; it is
+    re-read before every write so concurrent experiments don't drop each
+    other's entries.
+    """
+
+    def __init__(self, path: str | PathLike) -> None:
+        """Initialize result store.
+
+        Args:
+            path: JSON file backing the store, created on first write.
+        """
+        self._path = Path(path)
+        self._lock = Lock()
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "ResultStore":
+        # Shared by every variant of an experiment.
+        return self
+
+    def get(self, fingerprint: str) -> Optional[dict]:
+        """Look up the workflow recorded for a fingerprint.
+
+        Args:
+            fingerprint: Simulation fingerprint.
+
+        Returns:
+            Entry with "workflow_id", "project_id" and "part_unique_names" keys,
+            or None.
+        """
+        with self._lock:
+            return self._read().get(fingerprint)
+
+    def put(
+        self, fingerprint: str, workflow: Workflow, part_unique_names: dict[str, str],
+    ) -> None:
+        """Record the workflow dispatched for a fingerprint.
+
+        Args:
+            fingerprint: Simulation fingerprint.
+            workflow: Dispatched workflow.
+            part_unique_names: Mapping of part names to the unique names used
+                for job and file names in the workflow.
+        """
+        with self._lock:
+            entries = self._read()
+            entries[fingerprint] = {
+                "workflow_id": workflow.id,
+                "project_id": workflow.project_id,
+                "part_unique_names": part_unique_names,
+            }
+            self._write(entries)
+
+    def invalidate(self, fingerprint: str) -> None:
+        """Remove the entry of a fingerprint.
+
+        Args:
+            fingerprint: Simulation fingerprint.
+        """
+        with self._lock:
+            entries = self._read()
+            if entries.pop(fingerprint, None) is not None:
+                self._write(entries)
+
+    def _read(self) -> dict[str, dict]:
+        if not self._path.is_file():
+            return {}
+        try:
+            return json.loads(self._path.read_text())
+        except (OSError, ValueError):
+            return {}
+
+    def _write(self, entries: dict[str, dict]) -> None:
+        self._path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(json.dumps(entries, indent=2))
+        os.replace(tmp, self._path)
@@ -65,6 +65,20 @@ JSON manifest format
         {"field": "max_time", "values": [0.02, 0.04, 0.06]}
     ],
 
+    # Varying entries compose. "product" runs every combination of its entries
+    # (here 3 x 2 = 6 variants), "zip" pairs them index-wise, and "sample"
+    # draws "count" points over simulation parameter ranges with a
+    # "latin_hypercube" or "sobol" design:
+    #   "varying": [{"product": [
+    #       {"part": "midsole", "files": ["v1.ply", "v2.ply", "v3.ply"]},
+    #       {"zip": [
+    #           {"part": "midsole", "material": ["default_midsole_nominal", "default_outsole"]},
+    #           {"field": "max_time", "values": [0.02, 0.04]}
+    #       ]}
+    #   ]}]
+    #   "varying": [{"sample": "sobol", "count": 16, "seed": 0,
+    #                "ranges": {"max_time": [0.02, 0.06], "max_resolution": [256, 512]}}]
+
     "simulation": {
         "max_time": 0.04,
         # Sampling resolution along the longest axis of the total box (the
@@ -139,7 +153,7 @@ from pathlib import Path
 from typing import Optional, Union
 from zipfile import ZipFile
 
-from metafold import MetafoldClient
+from metafold import MetafoldClient, ResponseCache
 
 import metafold.materials as _materials_module
 from metafold.materials import Material
@@ -148,8 +162,11 @@ from metafold.simulation.compression_experiment import (
     ExperimentVarying,
     VaryMaterial,
     VaryMesh,
+    VaryProduct,
     VarySimulationParameter,
+    VarySimulationParameters,
     VaryVelocity,
+    VaryZip,
 )
 from metafold.simulation.compression_simulation import (
     CompressionSimulation,
@@ -163,13 +180,14 @@ from metafold.simulation.compression_simulation import (
     validate_simulation_parts,
 )
 
-# Build preset lookup from all Material constants in the materials module.
-# Keys are lowercased constant names, e.g. "default_midsole_nominal", "material_tpu".
-_MATERIAL_PRESETS: dict[str, Material] = {
-    name.lower(): obj
+# Preset names are the lowercased Material constant names in the materials
+# module, e.g. "default_midsole_nominal", "material_tpu". simulation_configurator
+# presets are resolved on first use, see metafold.materials.__getattr__.
+_MATERIAL_PRESETS: list[str] = [
+    name.lower()
     for name, obj in vars(_materials_module).items()
     if isinstance(obj, Material)
-}
+] + [name.lower() for name in _materials_module.CONFIGURATOR_MATERIALS]
 
 
 def _resolve_material(value: Union[str, dict, Material]) -> Material:
@@ -179,10 +197,10 @@ def _resolve_material(value: Union[str, dict, Material]) -> Material:
         return Material.from_dict(value)
     key = value.lower()
     if key in _MATERIAL_PRESETS:
-        return _MATERIAL_PRESETS[key]
+        return getattr(_materials_module, key.upper())
     raise ValueError(
         f"Unknown material preset {value!r}. "
-        f"Available: {list(_MATERIAL_PRESETS)}. "
+        f"Available: {_MATERIAL_PRESETS}. "
         "Pass a Material instance or inline dict for custom materials."
     )
 
@@ -284,6 +302,31 @@ def _build_varying(varying_config: list[dict]) -> list[ExperimentVarying]:
         elif "field" in entry and "values" in entry:
             varying.append(VarySimulationParameter(entry["field"], entry["values"]))
 
+        elif "product" in entry or "zip" in entry:
+            combine = VaryProduct if "product" in entry else VaryZip
+            entries = entry.get("product", entry.get("zip"))
+            if not isinstance(entries, list):
+                raise ValueError(
+                    f"varying {combine.__name__} entries must be a list, got: {entries!r}"
+                )
+            varying.append(combine(*_build_varying(entries)))
+
+        elif "sample" in entry and "ranges" in entry:
+            samplers = {
+                "latin_hypercube": VarySimulationParameters.latin_hypercube,
+                "sobol": VarySimulationParameters.sobol,
+            }
+            if entry["sample"] not in samplers:
+                raise ValueError(
+                    f"Unknown varying sample design {entry['sample']!r}, "
+                    f"expected one of: {sorted(samplers)}"
+                )
+            varying.append(
+                samplers[entry["sample"]](
+                    entry["ranges"], int(entry["count"]), seed=entry.get("seed")
+                )
+            )
+
         else:
             raise ValueError(f"Unrecognised varying entry: {entry}")
     return varying
@@ -389,6 +432,7 @@ def run_experiment(
             access_token=access_token,
             project_id=project_id or None,
             base_url=base_url,
+            cache=ResponseCache(),
         )
     elif credentials is not None:
         sim_kwargs["client"] = MetafoldClient(
@@ -397,6 +441,7 @@ def run_experiment(
             auth_domain=credentials.get("auth_domain", "metafold3d.us.auth0.com"),
             base_url=credentials.get("base_url", "https://api.metafold3d.com/"),
             project_id=project_id or None,
+            cache=ResponseCache(),
         )
 
     sim = CompressionSimulation(**sim_kwargs)
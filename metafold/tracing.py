@@ -0,0 +1,243 @@
+from collections.abc import Callable, Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from functools import wraps
+from os import PathLike
+from threading import Lock
+from typing import Any, TypeVar, cast
+import itertools
+import json
+import time
+
+
+class Span:
+    """Handle to an active span."""
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set a span attribute.
+
+        Args:
+            key: Attribute name.
+            value: Attribute value, a string, bool, int or float.
+        """
+
+
+class Tracer:
+    """Tracer interface.
+
+    The base implementation discards everything and is used when no tracer is
+    configured. Subclasses override :meth:`span` and :meth:`record`.
+    """
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        """Time the enclosed block.
+
+        Spans opened inside the block are recorded as children of this span.
+
+        Args:
+            name: Span name, e.g. "http.get" or "experiment.prepare".
+            attributes: Initial span attributes.
+
+        Returns:
+            Context manager yielding the active span.
+        """
+        yield Span()
+
+    def record(
+        self, name: str, start: datetime, end: datetime,
+        **attributes: Any,
+    ) -> None:
+        """Record a span that has already ended.
+
+        Used for durations measured elsewhere, e.g. from server timestamps.
+
+        Args:
+            name: Span name.
+            start: Span start time.
+            end: Span end time.
+            attributes: Span attributes.
+        """
+
+    def record_lifecycle(
+        self, name: str,
+        created: datetime,
+        started: datetime | None,
+        finished: datetime | None,
+        **attributes: Any,
+    ) -> None:
+        """Record queue and run spans of a job or workflow from its timestamps.
+
+        Emits "{name}.queue" (created to started) and "{name}.run" (started to
+        finished) for whichever intervals are known.
+
+        Args:
+            name: Span name prefix, e.g. "workflow".
+            created: Creation datetime.
+            started: Start datetime.
+            finished: Finish datetime.
+            attributes: Attributes added to both spans.
+        """
+        if started is None:
+            return
+        self.record(f"{name}.queue", created, started, **attributes)
+        if finished is not None:
+            self.record(f"{name}.run", started, finished, **attributes)
+
+
+class _RecordedSpan(Span):
+    def __init__(self, attributes: dict[str, Any]) -> None:
+        self.attributes = attributes
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+
+class JSONTracer(Tracer):
+    """Tracer collecting finished spans in memory.
+
+    Spans are plain dicts with "name", "id", "parent_id", "start" (seconds since
+    the epoch), "duration" (seconds) and "attributes" keys, in the order they
+    finished. Write them out with :meth:`write`.
+    """
+
+    def __init__(self) -> None:
+        self.spans: list[dict[str, Any]] = []
+        self._lock = Lock()
+        self._ids = itertools.count(1)
+        self._current: ContextVar[int | None] = ContextVar("span", default=None)
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "JSONTracer":
+        # Copies of a client keep reporting to the same tracer.
+        return self
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        span_id = next(self._ids)
+        parent_id = self._current.get()
+        token = self._current.set(span_id)
+        s = _RecordedSpan(dict(attributes))
+        start = time.time()
+        t0 = time.perf_counter()
+        try:
+            yield s
+        except BaseException as e:
+            s.set_attribute("error", f"{type(e).__name__}: {e}")
+            raise
+        finally:
+            duration = time.perf_counter() - t0
+            self._current.reset(token)
+            self._append(name, span_id, parent_id, start, duration, s.attributes)
+
+    def record(
+        self, name: str, start: datetime, end: datetime,
+        **attributes: Any,
+    ) -> None:
+        self._append(
+            name, next(self._ids), self._current.get(),
+            start.timestamp(), (end - start).total_seconds(), attributes,
+        )
+
+    def write(self, path: str | PathLike) -> None:
+        """Write recorded spans to a JSON file.
+
+        Args:
+            path: Output file path.
+        """
+        with self._lock:
+            spans = list(self.spans)
+        with open(path, "w") as f:
+            json.dump({"spans": spans}, f, indent=2)
+
+    def _append(
+        self, name: str, span_id: int, parent_id: int | None,
+        start: float, duration: float, attributes: dict[str, Any],
+    ) -> None:
+        with self._lock:
+            self.spans.append({
+                "name": name,
+                "id": span_id,
+                "parent_id": parent_id,
+                "start": start,
+                "duration": duration,
+                "attributes": attributes,
+            })
+
+
+class _OpenTelemetrySpan(Span):
+    def __init__(self, span: Any) -> None:
+        self._span = span
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self._span.set_attribute(key, value)
+
+
+class OpenTelemetryTracer(Tracer):
+    """Tracer reporting spans through the OpenTelemetry API.
+
+    Requires the opentelemetry-api package, install with the "tracing" extra.
+    """
+
+    def __init__(self, tracer: Any = None) -> None:
+        """Initialize OpenTelemetry tracer.
+
+        Args:
+            tracer: OpenTelemetry tracer. Defaults to the "metafold" tracer of
+                the global tracer provider.
+        """
+        if tracer is None:
+            try:
+                from opentelemetry import trace
+            except ImportError as e:
+                raise ImportError(
+                    "OpenTelemetryTracer requires opentelemetry-api, "
+                    "install with: pip install metafold[tracing]"
+                ) from e
+            tracer = trace.get_tracer("metafold")
+        self._tracer = tracer
+
+    def __deepcopy__(self, memo: dict[int, Any]) -> "OpenTelemetryTracer":
+        return self
+
+    @contextmanager
+    def span(self, name: str, **attributes: Any) -> Iterator[Span]:
+        with self._tracer.start_as_current_span(name, attributes=attributes) as s:
+            yield _OpenTelemetrySpan(s)
+
+    def record(
+        self, name: str, start: datetime, end: datetime,
+        **attributes: Any,
+    ) -> None:
+        s = self._tracer.start_span(
+            name, attributes=attributes, start_time=_ns(start),
+        )
+        s.end(end_time=_ns(end))
+
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def traced(name: str, **attributes: str) -> Callable[[F], F]:
+    """Run the decorated method inside a span of ``self.tracer``.
+
+    Args:
+        name: Span name.
+        attributes: Span attributes, mapping attribute names to the names of
+            instance attributes holding their values.
+
+    Returns:
+        Method decorator.
+    """
+    def decorator(f: F) -> F:
+        @wraps(f)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            values = {k: getattr(self, v) for k, v in attributes.items()}
+            with self.tracer.span(name, **values):
+                return f(self, *args, **kwargs)
+        return cast(F, wrapper)
+    return decorator
+
+
+def _ns(dt: datetime) -> int:
+    return int(dt.timestamp() * 1e9)
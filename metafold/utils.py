@@ -1,8 +1,14 @@
-import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from os import PathLike
+from pathlib import Path
+from threading import Lock
 from typing import List
 from numpy.typing import ArrayLike
-from scipy.spatial.transform import Rotation as R  # type: ignore
+import hashlib
+import json
+import mmap
 import numpy as np
+import os
 import re
 
 
@@ -19,6 +25,9 @@ def xform(
      Returns:
          4 x 4 affine transformation matrix.
     """
+    # scipy is slow to import and only needed here
+    from scipy.spatial.transform import Rotation as R  # type: ignore
+
     translation = translation or np.array([0.0, 0.0, 0.0])
     rotation = rotation or np.array([0.0, 0.0, 0.0])
 
@@ -32,11 +41,129 @@ def xform(
 def sha256_file(path):
     h = hashlib.sha256()
     with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
+        try:
+            # Hash straight from the page cache, hashlib releases the GIL for
+            # large buffers so this parallelizes across threads.
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as m:
+                h.update(m)
+        except (OSError, ValueError):
+            # Empty files can't be mapped, and some filesystems don't support it
+            for chunk in iter(lambda: f.read(1 << 20), b""):  # 1 MiB
+                h.update(chunk)
     return "sha256:" + h.hexdigest()
 
 
+class ChecksumCache:
+    """Cache of file checksums keyed by path, size and modification time.
+
+    Files whose size and mtime are unchanged since they were last hashed are not
+    hashed again. When a path is given the cache is loaded from and saved to a
+    JSON file so it persists across runs.
+    """
+
+    def __init__(self, path: str | PathLike | None = None) -> None:
+        """Initialize checksum cache.
+
+        Args:
+            path: Optional JSON file backing the cache.
+        """
+        self._path = Path(path) if path is not None else None
+        self._lock = Lock()
+        self._entries: dict[str, tuple[int, int, str]] = {}
+        if self._path is not None and self._path.is_file():
+            try:
+                self._entries = {
+                    k: tuple(v) for k, v in json.loads(self._path.read_text()).items()
+                }
+            except (OSError, ValueError, TypeError):
+                # Start over from an unreadable cache file
+                self._entries = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, path: str | PathLike) -> str | None:
+        """Look up the checksum of an unchanged file.
+
+        Args:
+            path: File path.
+
+        Returns:
+            Cached checksum or None if the file is unknown or has changed.
+        """
+        key, size, mtime = _stat_key(path)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[:2] != (size, mtime):
+            return None
+        return entry[2]
+
+    def put(self, path: str | PathLike, checksum: str, stat: tuple[int, int]) -> None:
+        """Store the checksum of a file.
+
+        Args:
+            path: File path.
+            checksum: File checksum.
+            stat: Size and mtime (st_size, st_mtime_ns) of the file taken before
+                hashing it, so a file changed while hashing is hashed again.
+        """
+        key = str(Path(path).resolve())
+        size, mtime = stat
+        with self._lock:
+            self._entries[key] = (size, mtime, checksum)
+
+    def save(self) -> None:
+        """Write the cache to its backing file, if any."""
+        if self._path is None:
+            return
+        with self._lock:
+            data = json.dumps(self._entries)
+        tmp = self._path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(data)
+        os.replace(tmp, self._path)
+
+
+def _stat_key(path: str | PathLike) -> tuple[str, int, int]:
+    st = os.stat(path)
+    return str(Path(path).resolve()), st.st_size, st.st_mtime_ns
+
+
+def sha256_files(
+    paths: List[str | PathLike],
+    cache: ChecksumCache | None = None,
+    max_workers: int | None = None,
+) -> List[str]:
+    """Compute checksums of many files concurrently.
+
+    Args:
+        paths: File paths.
+        cache: Optional checksum cache. Unchanged files are served from the cache,
+            new checksums are added to it and the cache is saved.
+        max_workers: Maximum number of hashing threads.
+
+    Returns:
+        Checksums in the same order as the given paths.
+    """
+    checksums = [cache.get(p) if cache else None for p in paths]
+    misses = [i for i, c in enumerate(checksums) if c is None]
+    hashed: dict[int, str] = {}
+    if misses:
+        with ThreadPoolExecutor(max_workers) as executor:
+            results = executor.map(_stat_and_hash, [paths[i] for i in misses])
+            for i, (stat, checksum) in zip(misses, results):
+                hashed[i] = checksum
+                if cache is not None:
+                    cache.put(paths[i], checksum, stat)
+        if cache is not None:
+            cache.save()
+    return [hashed[i] if c is None else c for i, c in enumerate(checksums)]
+
+
+def _stat_and_hash(path: str | PathLike) -> tuple[tuple[int, int], str]:
+    _, size, mtime = _stat_key(path)
+    return (size, mtime), sha256_file(path)
+
+
 def natural_sort(l: List):
     def natural_key(s):
         return [int(c) if c.isdigit() else c for c in re.split(r"(\d+)", s)]
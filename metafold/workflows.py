@@ -1,12 +1,12 @@
 from attrs import field, frozen
 from datetime import datetime
-from metafold.api import asdatetime, asdict, optional_datetime
+from metafold.api import asdatetime, asdict, is_final, optional_datetime
 from metafold.assets import Asset
 from metafold.client import Client
 from metafold.exceptions import PollTimeout
 from metafold.jobs import Job
 from requests import Response
-from typing import cast
+from typing import Iterator, cast
 import typing
 
 if typing.TYPE_CHECKING:
@@ -35,10 +35,8 @@ class Workflow:
     jobs: list[str] = field(factory=list)
     state: str
     created: datetime = field(converter=asdatetime)
-    started: datetime | None = field(
-        converter=lambda v: optional_datetime(v), default=None)
-    finished: datetime | None = field(
-        converter=lambda v: optional_datetime(v), default=None)
+    started: datetime | None = field(converter=optional_datetime, default=None)
+    finished: datetime | None = field(converter=optional_datetime, default=None)
     definition: str
     project_id: str
 
@@ -78,10 +76,10 @@ class Workflow:
         # FIXME(ryan): Update API to return job names as well as IDs.
         # For now we cache a mapping b/w job name and job id.
         if job_id := self._jobs.get(name):
-            return self._client.jobs.get(job_id)
+            return self._client.jobs.get(job_id, self.project_id)
 
         for job_id in self.jobs:
-            job = self._client.jobs.get(job_id)
+            job = self._client.jobs.get(job_id, self.project_id)
             if job.name == name:
                 self._jobs[name] = job_id
                 return job
@@ -123,6 +121,36 @@ class WorkflowsEndpoint:
         r: Response = self._client.get(url, params=payload)
         return [Workflow(client=cast("MetafoldClient", self._client), **w) for w in r.json()]
 
+    def iter_list(
+        self,
+        sort: str | None = None,
+        q: str | None = None,
+        project_id: str | None = None,
+        page_size: int = 100,
+    ) -> Iterator[Workflow]:
+        """Iterate over workflows, fetching one page at a time.
+
+        Unlike :meth:`list`, resources are requested and constructed lazily as the
+        iterator is consumed.
+
+        Args:
+            sort: Sort string. See :meth:`list`.
+            q: Query string. See :meth:`list`.
+            project_id: Workflow project ID.
+            page_size: Maximum number of workflows requested per page.
+
+        Returns:
+            Iterator over workflow resources.
+        """
+        project_id = self._client.project_id(project_id)
+        url = f"/projects/{project_id}/workflows"
+        payload = asdict(sort=sort, q=q)
+        client = cast("MetafoldClient", self._client)
+        return (
+            Workflow(client=client, **w)
+            for w in self._client.paginate(url, payload, page_size)
+        )
+
     def get(self, workflow_id: str, project_id: str | None = None) -> Workflow:
         """Get a workflow.
 
@@ -135,8 +163,8 @@ class WorkflowsEndpoint:
         """
         project_id = self._client.project_id(project_id)
         url = f"/projects/{project_id}/workflows/{workflow_id}"
-        r: Response = self._client.get(url)
-        return Workflow(client=cast("MetafoldClient", self._client), **r.json())
+        w = self._client.get_json(url, immutable=is_final)
+        return Workflow(client=cast("MetafoldClient", self._client), **w)
 
     def run(
         self, definition: str,
@@ -167,7 +195,11 @@ class WorkflowsEndpoint:
             raise RuntimeError(
                 f"Workflow failed to complete within {timeout} seconds"
             ) from e
-        return Workflow(client=cast("MetafoldClient", self._client), **r.json())
+        w = Workflow(client=cast("MetafoldClient", self._client), **r.json())
+        self._client.tracer.record_lifecycle(
+            "workflow", w.created, w.started, w.finished, workflow_id=w.id, state=w.state,
+        )
+        return w
 
     def run_async(
         self, definition: str,
@@ -0,0 +1,143 @@
+import copy
+import numpy as np
+import pytest
+from types import SimpleNamespace
+from unittest.mock import MagicMock
+
+from metafold.simulation.adaptive_experiment import (
+    AdaptiveExperiment,
+    _Surrogate,
+    _features,
+)
+from metafold.simulation.compression_experiment import (
+    VaryMaterial,
+    VaryMesh,
+    VaryProduct,
+    VarySimulationParameter,
+)
+
+POOL = [float(t) for t in np.linspace(0.01, 0.1, 50)]
+
+
+def fork_mock_sim(sim, simulation_name, part_unique_names):
+    """Stand-in for CompressionSimulation.fork on a mock sim."""
+    clone = copy.deepcopy(sim)
+    clone.simulation_name = simulation_name
+    clone.part_infos = []
+    for info in sim.part_infos:
+        if info.part.name in part_unique_names:
+            info = copy.deepcopy(info)
+            info.part_unique_name = part_unique_names[info.part.name]
+        clone.part_infos.append(info)
+    clone.get_part_info.side_effect = lambda n: next(
+        (p for p in clone.part_infos if p.part.name == n), None
+    )
+    return clone
+
+
+@pytest.fixture
+def mock_sim(tmp_path):
+    """A fake CompressionSimulation whose energy absorbed is 1000 * max_time."""
+    sim = MagicMock()
+    sim.stl_folder = tmp_path
+    sim.out_dir = tmp_path
+    sim.simulation_name = "base_sim"
+    sim.part_infos = []
+    sim._wait_for_workflow.side_effect = lambda wf: SimpleNamespace(state="success")
+    sim.fork.side_effect = lambda name, part_unique_names: fork_mock_sim(
+        sim, name, part_unique_names
+    )
+    return sim
+
+
+def energy(sim, workflow):
+    return {"energyAbsorbed": 1000 * sim.simulation_parameters.max_time}
+
+
+def make_experiment(mock_sim, **kwargs):
+    exp = AdaptiveExperiment(
+        mock_sim,
+        [VarySimulationParameter("max_time", POOL)],
+        auto_run=False,
+        force_rerun=True,
+        seed=0,
+        **kwargs,
+    )
+    exp._read_scalars = energy
+    exp.prepare()
+    return exp
+
+
+def test_surrogate_interpolates():
+    x = np.linspace(0, 1, 6)[:, None]
+    y = np.sin(3 * x[:, 0])
+    mean, std = _Surrogate().fit(x, y).predict(x)
+    assert np.allclose(mean, y, atol=1e-3)
+    assert np.all(std < 1e-2)
+
+
+def test_features_one_hot_materials():
+    v = VaryProduct(
+        VaryMaterial("midsole", [MagicMock(), MagicMock()]),
+        VarySimulationParameter("max_time", [0.02, 0.04]),
+    )
+    v.resolve(None)
+    assert _features(v, 3) == [0.0, 1.0, 0.04]
+
+
+def test_reaches_target_within_fraction_of_pool(mock_sim):
+    exp = make_experiment(mock_sim, target=55.0, budget=50, patience=None)
+    exp.run()
+    assert exp.best["objective"] <= exp.tolerance
+    assert len(exp.history) < len(POOL) // 2
+    # Every evaluated variant was cloned and dispatched once
+    assert len(exp.sims) == len(exp.history)
+    assert len({h["sim_index"] for h in exp.history}) == len(exp.history)
+
+
+def test_budget_respected(mock_sim):
+    exp = make_experiment(mock_sim, target=-1.0, budget=6, batch_size=4, patience=None)
+    exp.run()
+    assert len(exp.history) == 6
+
+
+def test_patience_stops_early(mock_sim):
+    exp = make_experiment(mock_sim, target=-1.0, budget=40, batch_size=2, patience=1)
+    exp.run()
+    assert len(exp.history) < 40
+
+
+def test_failed_simulations_excluded(mock_sim):
+    mock_sim._wait_for_workflow.side_effect = lambda wf: SimpleNamespace(state="failure")
+    exp = make_experiment(mock_sim, target=55.0, budget=4, patience=None)
+    exp.run()
+    assert len(exp.history) == 4
+    assert exp.best is None
+
+
+def test_read_scalars_resolves_job_refs(mock_sim):
+    exp = AdaptiveExperiment(
+        mock_sim, [VarySimulationParameter("max_time", POOL)], auto_run=False
+    )
+    sim = MagicMock()
+    sim._build_server_scalars_for_workflow.return_value = {
+        "volume": 2.5,
+        "energyAbsorbed": {"jobId": "7", "outputParam": "energy_absorbed"},
+        "loadingEnergy": {"jobId": "7", "outputParam": "loading_energy"},
+    }
+    sim.client.jobs.get.return_value = SimpleNamespace(
+        outputs=SimpleNamespace(
+            params={"energy_absorbed": "4.5", "loading_energy": "6"}
+        )
+    )
+    workflow = SimpleNamespace(project_id="1")
+    assert exp._read_scalars(sim, workflow) == {
+        "volume": 2.5, "energyAbsorbed": 4.5, "loadingEnergy": 6.0,
+    }
+    sim.client.jobs.get.assert_called_once_with("7", project_id="1")
+
+
+def test_mesh_varying_rejected(mock_sim):
+    (mock_sim.stl_folder / "mid-0.ply").write_bytes(b"ply\n")
+    with pytest.raises(ValueError, match="meshes"):
+        AdaptiveExperiment(mock_sim, [VaryMesh("midsole", "mid-*.ply")], auto_run=False)
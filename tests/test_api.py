@@ -0,0 +1,26 @@
+from datetime import datetime, timezone
+from metafold.api import asdatetime, optional_datetime
+
+
+def test_asdatetime():
+    assert asdatetime("Mon, 01 Jan 2024 13:14:15 GMT") == datetime(
+        2024, 1, 1, 13, 14, 15, tzinfo=timezone.utc)
+    assert asdatetime("Sun, 31 Dec 2023 23:59:59 GMT") == datetime(
+        2023, 12, 31, 23, 59, 59, tzinfo=timezone.utc)
+
+
+def test_asdatetime_fallback():
+    # Not the fixed-width GMT form, handled by strptime
+    assert asdatetime("Mon, 01 Jan 2024 13:14:15 UTC") == datetime(
+        2024, 1, 1, 13, 14, 15, tzinfo=timezone.utc)
+
+
+def test_asdatetime_passthrough():
+    dt = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    assert asdatetime(dt) is dt
+
+
+def test_optional_datetime():
+    assert optional_datetime(None) is None
+    assert optional_datetime("Mon, 01 Jan 2024 00:00:00 GMT") == datetime(
+        2024, 1, 1, tzinfo=timezone.utc)
@@ -2,13 +2,15 @@ from copy import deepcopy
 from datetime import datetime, timezone
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
-from metafold.assets import Asset
+from metafold.assets import Asset, RemoteFile
 from pathlib import Path
 from requests_toolbelt import MultipartDecoder
 from urllib.parse import parse_qs, urlparse
 import filecmp
 import json
+import numpy as np
 import pytest
+import re
 
 test_root = Path(__file__).parent
 test_file = test_root / "test.png"
@@ -60,20 +62,45 @@ new_asset = {
     "job_id": None,
 }
 
+# Files served with range request support, by path
+ranged_files: dict[str, bytes] = {"/blob": bytes(range(256)) * 4096}
+ranges_seen: list[tuple[int, int]] = []
+
 
 class MockRequestHandler(BaseHTTPRequestHandler):
+    def _send_range(self, content):
+        m = re.fullmatch(r"bytes=(\d+)-(\d+)", self.headers.get("Range", ""))
+        if m is None:
+            self.send_error(HTTPStatus.BAD_REQUEST)
+            return
+        start, end = int(m[1]), min(int(m[2]), len(content) - 1)
+        ranges_seen.append((start, end + 1))
+        self.send_response(HTTPStatus.PARTIAL_CONTENT)
+        self.send_header("Content-Range", f"bytes {start}-{end}/{len(content)}")
+        self.send_header("Content-Length", str(end + 1 - start))
+        self.end_headers()
+        self.wfile.write(content[start:end + 1])
+
     def do_GET(self):
         u = urlparse(self.path)
         params = parse_qs(u.query)
-        if u.path == "/projects/1/assets":
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
+        if u.path in ranged_files:
+            self._send_range(ranged_files[u.path])
+        elif u.path == "/projects/1/assets":
             payload = asset_list
             if params.get("sort") == ["id:1"]:
                 payload = sorted(asset_list, key=lambda p: p["id"])
             elif params.get("q") == ["filename:f763df409e79eb1c.bin"]:
                 payload = [p for p in asset_list if p["filename"] == "f763df409e79eb1c.bin"]
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/json")
+            if "limit" in params:
+                limit = int(params["limit"][0])
+                start = int(params.get("cursor", ["0"])[0])
+                if start + limit < len(payload):
+                    self.send_header("X-Next-Cursor", str(start + limit))
+                payload = payload[start:start + limit]
+            self.end_headers()
             self.wfile.write(json.dumps(payload).encode())
         elif u.path == "/projects/1/assets/1":
             self.send_response(HTTPStatus.OK)
@@ -148,6 +175,11 @@ def test_list_assets_filtered(client):
     assert all([a.filename == "f763df409e79eb1c.bin" for a in assets])
 
 
+def test_iter_assets_paginated(client):
+    assets = client.assets.iter_list(sort="id:1", page_size=2)
+    assert [a.id for a in assets] == ["1", "2", "3"]
+
+
 def test_get_asset(client):
     a = client.assets.get("1")
     assert a == Asset(
@@ -186,3 +218,116 @@ def test_create_asset(client):
 def test_delete_asset(client):
     # FIXME: Assert something
     client.assets.delete("1")
+
+
+@pytest.fixture
+def blob():
+    ranges_seen.clear()
+    return ranged_files["/blob"]
+
+
+def test_remote_file_reads_ranges(blob):
+    with RemoteFile("http://localhost:8000/blob", size=len(blob), block_size=4096) as f:
+        f.seek(100_000)
+        assert f.read(10) == blob[100_000:100_010]
+        f.seek(-5, 2)
+        assert f.read() == blob[-5:]
+        assert f.read() == b""
+        # One block per read, nothing else was transferred
+        assert f.bytes_fetched == 2 * 4096
+        assert ranges_seen == [(98304, 102400), (len(blob) - 4096, len(blob))]
+
+
+def test_remote_file_block_cache(blob):
+    with RemoteFile("http://localhost:8000/blob", block_size=4096, readahead=0) as f:
+        assert f.size == len(blob)
+        for _ in range(3):
+            f.seek(5000)
+            assert f.read(100) == blob[5000:5100]
+        assert f.requests == 2  # size and one block
+
+
+def test_remote_file_readahead(blob):
+    with RemoteFile(
+        "http://localhost:8000/blob", size=len(blob), block_size=4096, readahead=3,
+    ) as f:
+        f.read(4096)
+        # Continuing sequentially fetches the next block and three more
+        for i in range(1, 5):
+            assert f.read(4096) == blob[i * 4096:(i + 1) * 4096]
+        assert ranges_seen == [(0, 4096), (4096, 5 * 4096)]
+
+
+def test_remote_file_cache_evicts(blob):
+    with RemoteFile(
+        "http://localhost:8000/blob", size=len(blob),
+        block_size=4096, cache_size=2, readahead=0,
+    ) as f:
+        for offset in (0, 8192, 16384, 0):
+            f.seek(offset)
+            assert f.read(10) == blob[offset:offset + 10]
+        assert f.requests == 4
+
+
+def test_remote_hdf5_partial_read(tmp_path):
+    h5py = pytest.importorskip("h5py")
+    path = tmp_path / "results.h5"
+    position = np.arange(3000, dtype=np.float64).reshape(-1, 3)
+    with h5py.File(path, "w") as f:
+        f["/material0/position"] = position
+        f["/material0/stress"] = np.random.default_rng(0).random((200_000, 6))
+    ranged_files["/results.h5"] = path.read_bytes()
+    with (
+        RemoteFile("http://localhost:8000/results.h5", block_size=16384) as rf,
+        h5py.File(rf, "r") as f,
+    ):
+        assert np.array_equal(f["/material0/position"][:], position)
+        assert rf.bytes_fetched < rf.size // 4
+
+
+def test_open_asset_without_range_support(client):
+    # The download link of asset 1 ignores the Range header
+    with client.assets.open("1") as f:
+        f.seek(10)
+        assert f.read(5) == test_file.read_bytes()[10:15]
+        assert f.size == test_file.stat().st_size
+
+
+def test_download_array(client):
+    a = client.assets.download_array("1", np.uint8, test_file.stat().st_size)
+    assert a.tobytes() == test_file.read_bytes()
+
+
+def test_download_array_into_memmap(client, tmp_path):
+    size = test_file.stat().st_size
+    out = np.memmap(tmp_path / "volume.bin", dtype=np.uint8, mode="w+", shape=(size,))
+    a = client.assets.download_array("1", out=out)
+    assert a is out
+    out.flush()
+    assert (tmp_path / "volume.bin").read_bytes() == test_file.read_bytes()
+
+
+def test_download_array_reads_bounded_slices(client, monkeypatch):
+    from urllib3.response import HTTPResponse
+
+    reads = []
+    readinto = HTTPResponse.readinto
+
+    def recording_readinto(self, b):
+        reads.append(len(b))
+        return readinto(self, b)
+
+    monkeypatch.setattr("metafold.assets._DOWNLOAD_SLICE", 64)
+    monkeypatch.setattr(HTTPResponse, "readinto", recording_readinto)
+    a = client.assets.download_array("1", np.uint8, test_file.stat().st_size)
+    assert a.tobytes() == test_file.read_bytes()
+    assert max(reads) <= 64
+
+
+def test_download_array_size_mismatch(client):
+    size = test_file.stat().st_size
+    for shape in (size - 1, size + 1):
+        with pytest.raises(ValueError, match="size"):
+            client.assets.download_array("1", np.uint8, shape)
+    with pytest.raises(ValueError, match="contiguous"):
+        client.assets.download_array("1", out=np.zeros((size, 2), np.uint8)[:, 0])
@@ -0,0 +1,146 @@
+from collections import Counter
+from copy import deepcopy
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from metafold import MetafoldClient
+from metafold.cache import CacheEntry, ResponseCache
+from urllib.parse import urlparse
+import json
+import pytest
+
+requests_seen: Counter = Counter()
+
+finished_job = {
+    "id": "1",
+    "name": "foo",
+    "type": "evaluate_graph",
+    "state": "success",
+    "created": "Mon, 01 Jan 2024 00:00:00 GMT",
+    "started": "Mon, 01 Jan 2024 00:00:00 GMT",
+    "finished": "Mon, 01 Jan 2024 00:00:00 GMT",
+    "error": None,
+    "inputs": {"params": None},
+    "outputs": {"params": None},
+    "needs": [],
+    "project_id": "1",
+    "workflow_id": None,
+    "parameters": {},
+    "meta": None,
+}
+
+running_job = deepcopy(finished_job)
+running_job.update({"id": "2", "state": "started", "finished": None})
+
+running_job_untagged = deepcopy(running_job)
+running_job_untagged["id"] = "3"
+
+running_job_etag = '"v1"'
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, payload, headers=None):
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        for k, v in (headers or {}).items():
+            self.send_header(k, v)
+        self.end_headers()
+        self.wfile.write(json.dumps(payload).encode())
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        requests_seen[u.path] += 1
+        if u.path == "/projects/1/jobs/1":
+            self._send_json(finished_job)
+        elif u.path == "/projects/1/jobs/2":
+            if self.headers.get("If-None-Match") == running_job_etag:
+                # Count before responding, the client may assert on it as soon
+                # as the response arrives
+                requests_seen["not_modified"] += 1
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_header("ETag", running_job_etag)
+                self.end_headers()
+            else:
+                self._send_json(running_job, {"ETag": running_job_etag})
+        elif u.path == "/projects/1/jobs/3":
+            self._send_json(running_job_untagged)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_DELETE(self):
+        u = urlparse(self.path)
+        if u.path == "/projects/1/jobs/1":
+            self.send_response(HTTPStatus.OK)
+            self.end_headers()
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+
+@pytest.fixture(scope="module")
+def request_handler():
+    return MockRequestHandler
+
+
+@pytest.fixture
+def cached_client():
+    requests_seen.clear()
+    return MetafoldClient(
+        "testtoken", "1", base_url="http://localhost:8000", cache=ResponseCache(),
+    )
+
+
+def test_final_resource_served_from_cache(cached_client):
+    a = cached_client.jobs.get("1")
+    b = cached_client.jobs.get("1")
+    assert a == b
+    assert requests_seen["/projects/1/jobs/1"] == 1
+
+
+def test_mutable_resource_revalidated(cached_client):
+    a = cached_client.jobs.get("2")
+    b = cached_client.jobs.get("2")
+    assert a == b
+    assert requests_seen["/projects/1/jobs/2"] == 2
+    assert requests_seen["not_modified"] == 1
+
+
+def test_mutable_resource_without_validators_not_cached(cached_client):
+    cached_client.jobs.get("3")
+    cached_client.jobs.get("3")
+    assert requests_seen["/projects/1/jobs/3"] == 2
+    assert len(cached_client._cache) == 0
+
+
+def test_delete_invalidates(cached_client):
+    cached_client.jobs.get("1")
+    cached_client.jobs.delete("1")
+    cached_client.jobs.get("1")
+    assert requests_seen["/projects/1/jobs/1"] == 2
+
+
+def test_uncached_client(client):
+    requests_seen.clear()
+    client.jobs.get("1")
+    client.jobs.get("1")
+    assert requests_seen["/projects/1/jobs/1"] == 2
+
+
+def test_lru_eviction():
+    cache = ResponseCache(maxsize=2)
+    cache.put("a", CacheEntry({"id": "a"}))
+    cache.put("b", CacheEntry({"id": "b"}))
+    cache.get("a")
+    cache.put("c", CacheEntry({"id": "c"}))
+    assert cache.get("a") is not None
+    assert cache.get("b") is None
+    assert cache.get("c") is not None
+
+
+def test_disk_tier(tmp_path):
+    cache = ResponseCache(directory=tmp_path)
+    cache.put("a", CacheEntry({"id": "a"}, etag='"x"', immutable=True))
+
+    reopened = ResponseCache(directory=tmp_path)
+    assert reopened.get("a") == CacheEntry({"id": "a"}, etag='"x"', immutable=True)
+
+    reopened.invalidate("a")
+    assert ResponseCache(directory=tmp_path).get("a") is None
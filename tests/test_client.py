@@ -0,0 +1,89 @@
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from metafold import MetafoldClient
+import gzip
+import json
+import pytest
+
+requests_seen: list[dict] = []
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        if "gzip" in self.headers.get("Accept-Encoding", ""):
+            body = gzip.compress(body)
+            encoding = "gzip"
+        else:
+            encoding = "identity"
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Encoding", encoding)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        raw = self.rfile.read(int(self.headers["Content-Length"]))
+        encoding = self.headers.get("Content-Encoding")
+        body = gzip.decompress(raw) if encoding == "gzip" else raw
+        requests_seen.append({
+            "encoding": encoding,
+            "content_type": self.headers.get("Content-Type"),
+            "size": len(raw),
+        })
+        self._send_json({"echo": json.loads(body)})
+
+    do_PATCH = do_POST
+
+
+@pytest.fixture(scope="module")
+def request_handler():
+    return MockRequestHandler
+
+
+@pytest.fixture
+def gzip_client():
+    requests_seen.clear()
+    return MetafoldClient(
+        "testtoken", "1", base_url="http://localhost:8000", gzip_threshold=1024,
+    )
+
+
+def test_large_json_body_compressed(gzip_client):
+    payload = {"data": {"manifest": ["x" * 64] * 100}}
+    r = gzip_client.patch("/projects/1", json=payload)
+    assert r.json() == {"echo": payload}
+    [seen] = requests_seen
+    assert seen["encoding"] == "gzip"
+    assert seen["content_type"] == "application/json"
+    assert seen["size"] < len(json.dumps(payload))
+
+
+def test_small_json_body_not_compressed(gzip_client):
+    r = gzip_client.post("/projects/1/workflows", json={"definition": "jobs: {}"})
+    assert r.json() == {"echo": {"definition": "jobs: {}"}}
+    [seen] = requests_seen
+    assert seen["encoding"] is None
+    assert seen["content_type"] == "application/json"
+
+
+def test_raw_body_compressed(gzip_client):
+    body = json.dumps(list(range(1000))).encode()
+    r = gzip_client.post("/projects/1/workflows", data=body)
+    assert r.json() == {"echo": list(range(1000))}
+    assert requests_seen[0]["encoding"] == "gzip"
+
+
+def test_compression_off_by_default(client):
+    requests_seen.clear()
+    payload = {"data": "x" * 4096}
+    assert client.post("/projects/1/workflows", json=payload).json() == {"echo": payload}
+    assert requests_seen[0]["encoding"] is None
+
+
+def test_compressed_response_decoded(client):
+    assert client._session.headers["Accept-Encoding"] == "gzip, deflate"
+    r = client.post("/projects/1/workflows", json={"a": 1})
+    assert r.headers["Content-Encoding"] == "gzip"
+    assert r.json() == {"echo": {"a": 1}}
@@ -1,6 +1,7 @@
 # tests/test_compression_experiment.py
 import pytest
 import copy
+import numpy as np
 from pathlib import Path
 from unittest.mock import MagicMock
 
@@ -8,12 +9,32 @@ from metafold.simulation.compression_experiment import (
     CompressionExperiment,
     VaryMesh,
     VaryMaterial,
+    VaryProduct,
     VarySimulationParameter,
+    VarySimulationParameters,
     VaryVelocity,
+    VaryZip,
 )
+from metafold.simulation.experiment_results import ExperimentResults
 from metafold.materials import Material, ConstitutiveModel, RigidParams
 
 
+def fork_mock_sim(sim, simulation_name, part_unique_names):
+    """Stand-in for CompressionSimulation.fork on a mock sim."""
+    clone = copy.deepcopy(sim)
+    clone.simulation_name = simulation_name
+    clone.part_infos = []
+    for info in sim.part_infos:
+        if info.part.name in part_unique_names:
+            info = copy.deepcopy(info)
+            info.part_unique_name = part_unique_names[info.part.name]
+        clone.part_infos.append(info)
+    clone.get_part_info.side_effect = lambda n: next(
+        (p for p in clone.part_infos if p.part.name == n), None
+    )
+    return clone
+
+
 @pytest.fixture
 def ply_folder(tmp_path):
     """Create dummy ply files matching a few patterns."""
@@ -53,6 +74,9 @@ def mock_sim(mock_part_info, ply_folder, tmp_path):
     sim.get_part_info.side_effect = lambda n: next(
         (p for p in sim.part_infos if p.part.name == n), None
     )
+    sim.fork.side_effect = lambda name, part_unique_names: fork_mock_sim(
+        sim, name, part_unique_names
+    )
     return sim
 
 
@@ -170,12 +194,30 @@ class TestExperimentRun:
             s.run_workflow.assert_called_once()
 
 
+    def test_identical_variants_dispatched_once(self, mock_sim):
+        exp = CompressionExperiment(mock_sim, [VaryMesh("midsole", "mid-*.ply")], force_rerun=True)
+        exp.prepare()
+        for s, fingerprint in zip(exp.sims, ["a", "b", "a"]):
+            s.fingerprint.return_value = fingerprint
+        exp.run()
+        exp.sims[0].run_workflow.assert_called_once_with("_sim0")
+        exp.sims[1].run_workflow.assert_called_once_with("_sim1")
+        exp.sims[2].run_workflow.assert_not_called()
+        exp.sims[2].reuse_workflow.assert_called_once_with(
+            exp.sims[0].workflow,
+            "_sim2",
+            {i.part.name: i.part_unique_name for i in exp.sims[0].part_infos},
+        )
+
+
 class TestDownloadResults:
     def test_download_results_writes_one_zip(self, mock_sim):
         exp = CompressionExperiment(mock_sim, [VaryMesh("midsole", "mid-*.ply")], auto_run=False)
         exp.prepare()
-        exp.download_results()
+        results = exp.download_results()
         assert (mock_sim.out_dir / "out.zip").is_file()
+        assert isinstance(results, ExperimentResults)
+        assert results.path == mock_sim.out_dir / "out.zip"
 
     def test_download_results_calls_each_sim(self, mock_sim):
         exp = CompressionExperiment(mock_sim, [VaryMesh("midsole", "mid-*.ply")], auto_run=False)
@@ -404,3 +446,119 @@ class TestVarySimulationParameter:
         v = VarySimulationParameter("grid.resolution", [128, 512])
         v.apply_to(0, mock_sim)
         assert mock_sim.simulation_parameters.grid.resolution == 128
+
+
+class TestVarySimulationParameters:
+    ranges = {"max_time": (0.02, 0.06), "max_resolution": (256, 512)}
+
+    def test_latin_hypercube_stratified(self, tmp_path):
+        v = VarySimulationParameters.latin_hypercube(self.ranges, 8, seed=0)
+        v.resolve(tmp_path)
+        assert v.sim_count == 8
+        # One sample in each of the 8 strata of every range
+        strata = np.floor((v.samples[:, 0] - 0.02) / 0.04 * 8)
+        assert sorted(strata) == list(range(8))
+
+    def test_sobol_prefix(self, tmp_path):
+        v = VarySimulationParameters.sobol(self.ranges, 5, seed=0)
+        v.resolve(tmp_path)
+        assert v.sim_count == 5
+        assert np.all((v.samples >= [0.02, 256]) & (v.samples <= [0.06, 512]))
+
+    def test_apply_to_sets_fields(self, mock_sim):
+        v = VarySimulationParameters.latin_hypercube(self.ranges, 4, seed=0)
+        v.apply_to(2, mock_sim)
+        assert mock_sim.simulation_parameters.max_time == v.samples[2, 0]
+        # Integer ranges give integer values
+        assert isinstance(mock_sim.simulation_parameters.max_resolution, int)
+
+    def test_invalid_range_rejected(self):
+        with pytest.raises(ValueError, match="low, high"):
+            VarySimulationParameters.sobol({"max_time": (0.06, 0.02)}, 4)
+
+
+class TestVaryProduct:
+    def test_product_counts_and_order(self, mock_sim, basic_material):
+        times = VarySimulationParameter("max_time", [0.02, 0.04])
+        materials = VaryMaterial("midsole", [basic_material] * 3)
+        v = VaryProduct(materials, times)
+        v.resolve(mock_sim.stl_folder)
+        assert v.sim_count == 6
+        assert [v.indices(i) for i in range(v.sim_count)] == [
+            [0, 0], [0, 1], [1, 0], [1, 1], [2, 0], [2, 1],
+        ]
+        v.apply_to(3, mock_sim)
+        assert mock_sim.simulation_parameters.max_time == 0.04
+
+    def test_zip_mismatched_counts_rejected(self, mock_sim):
+        v = VaryZip(
+            VarySimulationParameter("max_time", [0.02, 0.04]),
+            VaryMesh("midsole", "mid-*.ply"),
+        )
+        with pytest.raises(ValueError, match="same number"):
+            v.resolve(mock_sim.stl_folder)
+
+    def test_experiment_runs_every_combination(self, mock_sim, basic_material):
+        exp = CompressionExperiment(mock_sim, [VaryProduct(
+            VaryMesh("midsole", "mid-*.ply"),
+            VaryZip(
+                VaryMaterial("midsole", [basic_material] * 2),
+                VarySimulationParameter("max_time", [0.02, 0.04]),
+            ),
+        )], auto_run=False)
+        assert exp.varying_part_names == ["midsole"]
+        exp.prepare()
+        assert len(exp.sims) == 6
+
+
+class TestUniqueMeshPrep:
+    def test_repeated_meshes_prepped_once(self, mock_sim, mock_part_info):
+        exp = CompressionExperiment(mock_sim, [], auto_run=False)
+        forks = []
+        for i in range(6):
+            info = mock_part_info("midsole", f"mid-{i % 2}.ply")
+            info.file_path = Path(info.part.filename)
+            info.patch = {}
+            info.jobs = {}
+            forks.append(info)
+        exp.experiment_part_infos = forks
+
+        prepped = exp._unique_prep_part_infos()
+        assert prepped == forks[:2]
+        for info in prepped:
+            info.volume_filename = f"{info.part.filename}.bin"
+            info.jobs = {"sample-mesh": f"sample-mesh-{info.part.filename}"}
+        exp._share_prep_outputs(prepped)
+        for info in forks:
+            assert info.volume_filename == f"{info.part.filename}.bin"
+            assert info.jobs == {"sample-mesh": f"sample-mesh-{info.part.filename}"}
+        # Forks get their own jobs dict, main-workflow jobs are added per fork
+        assert forks[2].jobs is not forks[0].jobs
+
+    def test_prepare_preps_unique_meshes(self, mock_sim, basic_material):
+        exp = CompressionExperiment(mock_sim, [VaryProduct(
+            VaryMesh("midsole", "mid-*.ply"),
+            VaryMaterial("midsole", [basic_material] * 4),
+        )], auto_run=False)
+        exp._prep_key = lambda info: info.part.name
+        exp.prepare()
+        assert len(exp.sims) == 12
+        [prepped] = mock_sim.populate_assets.call_args.args
+        assert [p.part.name for p in prepped] == ["piston", "outsole", "midsole"]
+
+
+class TestDispatchPriority:
+    def test_higher_priority_dispatched_first(self, mock_sim):
+        order = []
+        exp = CompressionExperiment(
+            mock_sim,
+            [VaryMesh("midsole", "mid-*.ply")],
+            auto_run=False,
+            force_rerun=True,
+            priority=lambda i, sim: i == 2,
+        )
+        exp.prepare()
+        for s in exp.sims:
+            s.run_workflow.side_effect = order.append
+        exp.run()
+        assert order == ["_sim2", "_sim0", "_sim1"]
@@ -1,9 +1,11 @@
-from io import BytesIO
+from io import BytesIO, FileIO
 from types import SimpleNamespace
 from zipfile import ZipFile
 
+import numpy as np
 import pytest
 from unittest.mock import MagicMock
+import hashlib
 import json
 import yaml
 from pathlib import Path
@@ -19,7 +21,13 @@ from metafold.simulation.compression_simulation import (
     SimulationParameters,
     WorkflowStep,
     WorkflowStepType,
+    _UpsTemplates,
 )
+from metafold.simulation.local_metrics import LocalMetricsOptions
+from metafold.simulation.local_postprocess import LocalPostprocessOptions
+from metafold.simulation.reduce_results import ReduceResultsOptions
+from metafold.simulation.result_store import ResultStore
+from metafold.tracing import JSONTracer
 from metafold.materials import (
     DEFAULT_MIDSOLE_NOMINAL,
     DEFAULT_OUTSOLE,
@@ -514,8 +522,9 @@ class TestDensityMatchedSampling:
             "p-out": self._make_job("preprocess-mesh-outsole", 600.0, "mesh", "pre_out.ply"),
             "b-out": self._make_job("compute-bvh-outsole", None, "bvh", "bvh_out.bin"),
         }
-        pass1_wf = SimpleNamespace(state="success", jobs=list(jobs), id="wf1")
-        pass2_wf = SimpleNamespace(state="success", jobs=[], id="wf2")
+        timestamps = {"created": None, "started": None, "finished": None}
+        pass1_wf = SimpleNamespace(state="success", jobs=list(jobs), id="wf1", **timestamps)
+        pass2_wf = SimpleNamespace(state="success", jobs=[], id="wf2", **timestamps)
         sim.client.workflows.run_async.side_effect = [pass1_wf, pass2_wf]
         sim.client.jobs.get.side_effect = lambda job_id: jobs[job_id]
 
@@ -1069,7 +1078,7 @@ class TestWriteResultsToZipV2:
         )
         # Mocked download_file needs to actually create the file so
         # zf.write can read it back.
-        def fake_download(asset_id, path):
+        def fake_download(asset_id, path, project_id=None):
             Path(path).touch()
         sim.client.assets.download_file.side_effect = fake_download
 
@@ -1101,22 +1110,47 @@ class TestWriteResultsToZipV2:
                 # Mesh files are always written for debugging even on failure;
                 # no HDF data files should be present.
                 names = zf.namelist()
-                assert all("original_" in n for n in names)
+                assert names and all(n.startswith("shared/") for n in names)
                 assert not any(n.endswith(".h5") for n in names)
 
-    def test_mesh_previews_named_with_original_prefix(self, prepared_sim):
+    def test_mesh_previews_named_by_checksum(self, prepared_sim):
         prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+        midsole = prepared_sim.get_part_info("midsole")
+        midsole.file_path.write_bytes(b"ply\nmidsole\n")
 
         with BytesIO() as buf:
             with ZipFile(buf, "w") as zf:
                 prepared_sim._write_results_to_zip_v2(zf)
             buf.seek(0)
+            with ZipFile(buf) as zf:
+                names = [n for n in zf.namelist() if n.startswith("shared/")]
+                # upper_foam and outsole have the same content
+                assert sorted(names) == sorted(
+                    f"shared/{hashlib.sha256(content).hexdigest()}.ply"
+                    for content in (b"ply\n", b"ply\nmidsole\n")
+                )
+                data = prepared_sim.results[0]["data"]
+                assert zf.read(data["midsole_mesh"]["name"]) == b"ply\nmidsole\n"
+                assert data["upper_foam_mesh"] == data["outsole_mesh"]
+
+    def test_mesh_previews_shared_across_sims(self, prepared_sim):
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+        variant = prepared_sim.fork("ts_1")
+        variant.results = [{"id": "wf-2", "name": "ts_1"}]
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+                variant._write_results_to_zip_v2(zf)
+            buf.seek(0)
             with ZipFile(buf) as zf:
                 names = zf.namelist()
-                assert "ts/original_upper_foam.ply" in names
-                assert "ts/original_midsole.ply" in names
-                assert "ts/original_outsole.ply" in names
-                assert not any("piston" in n for n in names)
+        assert len([n for n in names if n.endswith(".ply")]) == 1
+        assert "ts_1/von_mises.h5" in names
+        assert (
+            variant.results[0]["data"]["midsole_mesh"]
+            == prepared_sim.results[0]["data"]["midsole_mesh"]
+        )
 
     def test_mesh_data_keys_use_underscore_format(self, prepared_sim):
         prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
@@ -1129,7 +1163,8 @@ class TestWriteResultsToZipV2:
         assert "upper_foam_mesh" in result["data"]
         assert "midsole_mesh" in result["data"]
         assert "outsole_mesh" in result["data"]
-        assert result["data"]["midsole_mesh"]["name"] == "ts/original_midsole.ply"
+        digest = hashlib.sha256(b"ply\n").hexdigest()
+        assert result["data"]["midsole_mesh"]["name"] == f"shared/{digest}.ply"
 
     def test_per_material_hdf_data_keys(self, prepared_sim):
         prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
@@ -1171,6 +1206,212 @@ class TestWriteResultsToZipV2:
         # 3 analysis-target parts × 1000 = 3000
         assert prepared_sim.results[0]["volume"] == 3000.0
 
+    def test_positions_read_remotely(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("h5py")
+        src = tmp_path / "compress.h5"
+        with pd.HDFStore(src, "w") as store:
+            for i in range(4):
+                store[f"/material{i}/position"] = pd.DataFrame(np.ones((10, 3)) * i)
+                store[f"/material{i}/stress"] = pd.DataFrame(np.zeros((1000, 6)))
+
+        class LocalFile(FileIO):
+            bytes_fetched = requests = 0
+            size = src.stat().st_size
+
+        prepared_sim.client.tracer = JSONTracer()
+        prepared_sim.workflow_steps.append(WorkflowStep(WorkflowStepType.COMPRESS))
+        prepared_sim.client.assets.open.side_effect = lambda id, project_id=None: LocalFile(src)
+        wf = self._mock_success_workflow()
+        prepared_sim.client.workflows.get.return_value = wf
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+            buf.seek(0)
+            with ZipFile(buf) as zf:
+                (tmp_path / "position.h5").write_bytes(zf.read("ts/position.h5"))
+        with pd.HDFStore(tmp_path / "position.h5", "r") as store:
+            assert sorted(store.keys()) == [f"/material{i}/position" for i in range(4)]
+            assert (store["/material2/position"].to_numpy() == 2).all()
+        downloaded = [c.args[1].name for c in prepared_sim.client.assets.download_file.call_args_list]
+        assert "compress.h5" not in downloaded
+        spans = {s["name"]: s for s in prepared_sim.client.tracer.spans}
+        assert spans["asset.copy_datasets"]["attributes"]["size"] == src.stat().st_size
+        assert spans["asset.copy_datasets"]["parent_id"] == spans["simulation.write_results_to_zip"]["id"]
+
+    def test_reduced_locally(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        index = pd.MultiIndex.from_product([[0.0, 0.01, 0.02], range(500)], names=["time", "id"])
+
+        def fake_download(asset_id, path, project_id=None):
+            with pd.HDFStore(path, "w") as store:
+                store["/material1/von_mises_stress"] = pd.DataFrame({"v": np.arange(1500.0)}, index=index)
+                store["/material1/von_mises_stress_histogram"] = pd.DataFrame({"count": [1, 2]})
+
+        prepared_sim.client.assets.download_file.side_effect = fake_download
+        prepared_sim.reduce_results_locally = ReduceResultsOptions(time_stride=2, max_particles=50)
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+            buf.seek(0)
+            with ZipFile(buf) as zf:
+                (tmp_path / "vm.h5").write_bytes(zf.read("ts/von_mises.h5"))
+        with pd.HDFStore(tmp_path / "vm.h5", "r") as store:
+            vm = store["/material1/von_mises_stress"]
+            assert vm["v"].dtype == np.int16
+            assert len(vm) == 2 * 50
+            assert len(store["/material1/von_mises_stress_histogram"]) == 2
+
+    def test_lod_levels(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        ids = np.arange(64)
+        positions = pd.DataFrame({
+            "time": 0.0, "id": ids, "x": ids % 4, "y": ids // 4 % 4, "z": ids // 16,
+        })
+
+        def fake_download(asset_id, path, project_id=None):
+            with pd.HDFStore(path, "w") as store:
+                if Path(path).name == "compress.h5":
+                    store["/material1/position"] = positions
+                else:
+                    store["/material1/von_mises_stress"] = positions[["time", "id"]].assign(v=1.0)
+                    store["/material1/von_mises_stress_histogram"] = pd.DataFrame({"count": [1]})
+
+        prepared_sim.client.assets.download_file.side_effect = fake_download
+        prepared_sim.client.assets.open.side_effect = OSError("no ranges")
+        prepared_sim.workflow_steps.append(WorkflowStep(WorkflowStepType.COMPRESS))
+        prepared_sim.lod_levels = 2
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+            buf.seek(0)
+            with ZipFile(buf) as zf:
+                (tmp_path / "vm.h5").write_bytes(zf.read("ts/von_mises.h5"))
+        data = prepared_sim.results[0]["data"]
+        assert [level["path"] for level in data["position1"]["levels"]] == [
+            "/material1/position_lod1", "/material1/position_lod2",
+        ]
+        assert data["vonMisesStress1"]["levels"][1] == {
+            "name": "ts/von_mises.h5", "path": "/material1/von_mises_stress_lod2", "fraction": 1 / 16,
+        }
+        # Materials without positions get no levels
+        assert "levels" not in data["vonMisesStress2"]
+        with pd.HDFStore(tmp_path / "vm.h5", "r") as store:
+            assert len(store["/material1/von_mises_stress_lod2"]) == 4
+            assert "/material1/von_mises_stress_histogram_lod1" not in store
+
+    def test_lod_levels_of_reduced(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        ids = np.arange(64)
+        positions = pd.DataFrame({
+            "time": 0.0, "id": ids, "x": ids % 4, "y": ids // 4 % 4, "z": ids // 16,
+        })
+
+        def fake_download(asset_id, path, project_id=None):
+            with pd.HDFStore(path, "w") as store:
+                store["/material1/position"] = positions
+
+        prepared_sim.client.assets.download_file.side_effect = fake_download
+        prepared_sim.client.assets.open.side_effect = OSError("no ranges")
+        prepared_sim.workflow_steps.append(WorkflowStep(WorkflowStepType.COMPRESS))
+        prepared_sim.reduce_results_locally = ReduceResultsOptions(max_particles=32)
+        prepared_sim.lod_levels = 2
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+            buf.seek(0)
+            with ZipFile(buf) as zf:
+                (tmp_path / "position.h5").write_bytes(zf.read("ts/position.h5"))
+        with pd.HDFStore(tmp_path / "position.h5", "r") as store:
+            levels = [
+                set(store[key]["id"])
+                for key in ("/material1/position", "/material1/position_lod1", "/material1/position_lod2")
+            ]
+        # Each level is a subset of the finer ones, decimated once
+        assert [len(level) for level in levels] == [32, 8, 2]
+        assert levels[2] <= levels[1] <= levels[0]
+
+    def test_postprocessed_locally(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        index = pd.MultiIndex.from_product([[0.0, 0.002], range(5)], names=["time", "id"])
+        sigma = np.zeros((10, 3, 3))
+        sigma[:, 2, 2] = np.arange(10.0)
+
+        def fake_download(asset_id, path, project_id=None):
+            with pd.HDFStore(path, "w") as store:
+                if Path(path).name == "postprocess_input.h5":
+                    store["/material2/cauchy_stress"] = pd.DataFrame(sigma.reshape(10, 9), index=index)
+                    store["/material2/deformation_gradient"] = pd.DataFrame(
+                        np.tile(np.eye(3).ravel(), (10, 1)), index=index
+                    )
+                    store["/material2/position"] = pd.DataFrame(np.ones((10, 3)), index=index, columns=list("xyz"))
+
+        prepared_sim.client.assets.download_file.side_effect = fake_download
+        prepared_sim.client.assets.open.side_effect = OSError("no ranges")
+        prepared_sim.local_postprocess = LocalPostprocessOptions(histogram_bins=4)
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+
+        with BytesIO() as buf:
+            with ZipFile(buf, "w") as zf:
+                prepared_sim._write_results_to_zip_v2(zf)
+            buf.seek(0)
+            with ZipFile(buf) as zf:
+                (tmp_path / "vm.h5").write_bytes(zf.read("ts/von_mises.h5"))
+                assert "ts/part_disp.h5" in zf.namelist()
+        # The compress output is downloaded instead of the postprocess outputs
+        downloaded = {c.args[1].name for c in prepared_sim.client.assets.download_file.call_args_list}
+        assert "postprocess_input.h5" in downloaded
+        assert not downloaded & {"von_mises.h5", "eff_strain.h5", "part_disp.h5"}
+        with pd.HDFStore(tmp_path / "vm.h5", "r") as store:
+            assert np.allclose(store["/material2/von_mises_stress"]["v"], np.arange(10.0))
+            assert len(store["/material2/von_mises_stress_histogram"]) == 2 * 4
+        data = prepared_sim.results[0]["data"]
+        assert data["vonMisesStress2"] == {"name": "ts/von_mises.h5", "path": "/material2/von_mises_stress"}
+
+    def test_export_parquet(self, prepared_sim, tmp_path):
+        pd = pytest.importorskip("pandas")
+        pytest.importorskip("pyarrow")
+        from metafold.simulation.parquet_export import dataset
+
+        index = pd.MultiIndex.from_product([[0.0, 0.002, 0.004], range(10)], names=["time", "id"])
+
+        def fake_download(asset_id, path, project_id=None):
+            with pd.HDFStore(path, "w") as store:
+                if Path(path).name == "von_mises_stress.h5":
+                    store["/material2/von_mises_stress"] = pd.DataFrame({"v": np.arange(30.0)}, index=index)
+                    store["/material2/von_mises_stress_histogram"] = pd.DataFrame({"count": [1]})
+                elif Path(path).name.startswith("stress_strain"):
+                    store["/stress_strain"] = pd.DataFrame({"strain": [0.0, 0.1], "stress": [0.0, 5.0]})
+                else:
+                    store["/unused"] = pd.DataFrame({"a": [1]})
+
+        prepared_sim.client.assets.download_file.side_effect = fake_download
+        prepared_sim.client.workflows.get.return_value = self._mock_success_workflow()
+        prepared_sim.workflow_steps.append(WorkflowStep(WorkflowStepType.ENERGY_METRICS))
+        prepared_sim._total_interior_volume = lambda w: 2.5
+
+        out = prepared_sim.export_parquet(tmp_path / "pq", chunk_rows=7)
+
+        vm = dataset(out, "von_mises_stress").to_table().to_pandas()
+        assert len(vm) == 30
+        assert set(vm["material"].astype(str)) == {"midsole"}
+        assert sorted(vm["timestep"].unique()) == [0, 1, 2]
+        assert vm["v"].dtype == np.float32
+        ss = dataset(out, "stress_strain").to_table().to_pandas()
+        assert set(ss["material"].astype(str)) == {"upper_foam", "midsole", "outsole"}
+        em = dataset(out, "energy_metrics").to_table().to_pandas()
+        assert em[["volume", "energy_absorbed"]].to_dict("records") == [
+            {"volume": 2.5, "energy_absorbed": 1000.0}
+        ]
+        assert set(em["simulation"].astype(str)) == {"ts"}
+
     def test_no_step_means_no_hdf_download(self, ply_folder, basic_parts, tmp_path):
         sim = CompressionSimulation(
             parts=basic_parts,
@@ -1397,8 +1638,8 @@ class TestFindOrCreateProjectCancel:
         existing.id = "pid-1"
         existing.name = "existing"
         client.projects.list.return_value = [existing]
-        # list(q="state:pending") -> [w1]; list(q="state:started") -> [w2]
-        client.workflows.list.side_effect = [
+        # iter_list(q="state:pending") -> [w1]; iter_list(q="state:started") -> [w2]
+        client.workflows.iter_list.side_effect = [
             [self._wf("w1", "pending")],
             [self._wf("w2", "started")],
         ]
@@ -1412,6 +1653,22 @@ class TestFindOrCreateProjectCancel:
         cancelled = {c.args[0] for c in client.workflows.cancel.call_args_list}
         assert cancelled == {"w1", "w2"}
 
+    def test_lists_before_cancelling(self):
+        # Cancelling shrinks the listed states, so listing must finish first
+        client = MagicMock()
+        events = []
+
+        def iter_list(q, project_id):
+            for wid in ("a", "b") if q == "state:pending" else ("c",):
+                events.append(("list", wid))
+                yield self._wf(wid, q)
+
+        client.workflows.iter_list.side_effect = iter_list
+        client.workflows.cancel.side_effect = lambda wid, project_id: events.append(("cancel", wid))
+        cancelled = CompressionSimulation.cancel_active_workflows(client, "pid-1")
+        assert cancelled == ["a", "b", "c"]
+        assert [e[0] for e in events] == ["list"] * 3 + ["cancel"] * 3
+
     def test_no_cancel_when_flag_off(self, patched_client_class):
         client = patched_client_class.return_value
         existing = MagicMock()
@@ -1439,3 +1696,425 @@ class TestFindOrCreateProjectCancel:
 
         assert pid == "new-pid"
         client.workflows.cancel.assert_not_called()
+
+
+class TestFork:
+    def test_shares_base_state(self, sim):
+        clone = sim.fork("test_sim_sim1", {"midsole": "midsole_1"})
+        assert clone.simulation_name == "test_sim_sim1"
+        assert clone.client is sim.client
+        assert clone.results == [] and clone.results is not sim.results
+        assert clone.simulation_parameters is not sim.simulation_parameters
+        forked = [c for c, b in zip(clone.part_infos, sim.part_infos) if c is not b]
+        assert [i.part.name for i in forked] == ["midsole"]
+
+    def test_forked_part_independent(self, sim, basic_parts):
+        base = sim.get_part_info("midsole")
+        base.jobs["sample-mesh"] = "sample-mesh-midsole"
+        clone = sim.fork("test_sim_sim1", {"midsole": "midsole_1"})
+        forked = clone.get_part_info("midsole")
+        forked.part.filename = "other.ply"
+        forked.jobs["compress"] = "compress"
+        assert forked.part_unique_name == "midsole_1"
+        assert base.part_unique_name == "midsole"
+        assert base.part.filename != "other.ply"
+        assert base.jobs == {"sample-mesh": "sample-mesh-midsole"}
+
+    def test_parameters_independent(self, sim):
+        clone = sim.fork("test_sim_sim1")
+        clone.simulation_parameters.max_time = 1.0
+        assert sim.simulation_parameters.max_time != 1.0
+
+    def test_reuse_workflow_forks_shared_part_infos(self, sim):
+        clone = sim.fork("test_sim_sim1")
+        workflow = MagicMock()
+        workflow.id = "wf-1"
+        workflow.project_id = clone.project_id
+        clone.reuse_workflow(workflow, "_sim1", {"midsole": "midsole_0"})
+        assert clone.get_part_info("midsole").part_unique_name == "midsole_0"
+        assert sim.get_part_info("midsole").part_unique_name == "midsole"
+
+
+class TestUpsTemplates:
+    @staticmethod
+    def build(calls):
+        def f(names):
+            calls.append(dict(names))
+            return f"<ups><title>{names['simulation']}</title><c f=\"velocity_{names['part0']}.txt\"/></ups>"
+        return f
+
+    def test_variants_rendered_from_template(self):
+        calls = []
+        templates = _UpsTemplates()
+        build = self.build(calls)
+        a = templates.render("k", {"simulation": "s0", "part0": "p_0"}, build)
+        assert a == build({"simulation": "s0", "part0": "p_0"})
+        # compile, verify and the direct build above
+        assert len(calls) == 3
+        b = templates.render("k", {"simulation": "s1", "part0": "p_1"}, build)
+        assert b == '<ups><title>s1</title><c f="velocity_p_1.txt"/></ups>'
+        assert len(calls) == 3
+
+    def test_mismatch_disables_templates(self):
+        calls = []
+        templates = _UpsTemplates()
+
+        def build(names):
+            calls.append(names)
+            return f"<ups>{names['simulation'].upper()}</ups>"
+
+        assert templates.render("k", {"simulation": "s0"}, build) == "<ups>S0</ups>"
+        assert templates.render("k", {"simulation": "s1"}, build) == "<ups>S1</ups>"
+        assert len(calls) == 3
+
+    def test_verified_per_key(self):
+        calls = []
+        templates = _UpsTemplates()
+
+        def build(names):
+            calls.append(names)
+            title = names["simulation"].upper() if names.get("mode") == "upper" else names["simulation"]
+            return f"<ups>{title}</ups>"
+
+        assert templates.render("a", {"simulation": "s0"}, build) == "<ups>s0</ups>"
+        # A later key whose template doesn't match is built directly
+        assert templates.render("b", {"simulation": "s0", "mode": "upper"}, build) == "<ups>S0</ups>"
+        assert templates.render("b", {"simulation": "s1", "mode": "upper"}, build) == "<ups>S1</ups>"
+        assert templates.render("a", {"simulation": "s1"}, build) == "<ups>s1</ups>"
+        assert len(calls) == 5
+
+    def test_names_needing_escapes_built_directly(self):
+        calls = []
+        templates = _UpsTemplates()
+        templates.render("k", {"simulation": "a&b", "part0": "p"}, self.build(calls))
+        assert calls == [{"simulation": "a&b", "part0": "p"}]
+
+    def test_shared_with_forks(self, sim):
+        assert sim.fork("test_sim_sim1")._ups_templates is sim._ups_templates
+
+    def test_key_ignores_velocity(self, sim):
+        fake_patch = {"size": [0.1] * 3, "offset": [0.0] * 3, "resolution": [16] * 3}
+        for info in sim.part_infos:
+            info.patch = fake_patch
+        sim.sample_spacing = 0.5
+        key = sim._ups_template_key()
+        sim.part_infos[0].part.velocity = [[0.0, 0.0, 0.0, 0.0], [1.0, 0.0, 0.0, -1.0]]
+        assert sim._ups_template_key() == key
+        sim.simulation_parameters.max_time = 1.0
+        assert sim._ups_template_key() != key
+
+
+class TestFingerprint:
+    def _built(self, sim, name, suffix, unique_suffix="", volume_checksum="sha256:a", params=None):
+        sim.simulation_name = name
+        names = {"simulation": name, "suffix": suffix}
+        for i, info in enumerate(sim.part_infos):
+            info.part_unique_name = f"{info.part.name}{unique_suffix}"
+            info.volume_filename = f"vol-{info.part_unique_name}.bin"
+            info.volume_checksum = f"{volume_checksum}{i}"
+            names[f"part{i}"] = info.part_unique_name
+
+        def build(names):
+            elements = "".join(
+                f"<{p.part.name}{names['suffix']} f=\"velocity_{names[f'part{i}']}.txt\"/>"
+                for i, p in enumerate(sim.part_infos)
+            )
+            return f"<ups><title>{names['simulation']}</title>{elements}</ups>"
+
+        sim._ups_render = ("k", names)
+        jobs = {"compress": {"type": "sim/custom"}}
+        for p in sim.part_infos:
+            jobs[f"metrics-{p.part_unique_name}"] = {"type": "implicit/metrics", "needs": ["compress"]}
+        sim.workflow_yaml = yaml.dump({"jobs": jobs})
+        sim.workflow_params = {
+            "compress.ups": sim._ups_templates.render("k", names, build),
+            "compress.text_inputs": json.dumps(
+                {f"velocity_{p.part_unique_name}.txt": [] for p in sim.part_infos}
+            ),
+            **{f"metrics-{p.part_unique_name}.volume_size": "[1, 1, 1]" for p in sim.part_infos},
+            **(params or {}),
+        }
+        sim.workflow_assets = {
+            "compress.volume": [p.volume_filename for p in sim.part_infos],
+        }
+        return sim.fingerprint()
+
+    def test_variant_names_normalized(self, sim):
+        a = self._built(sim, "test_sim_sim0", "_sim0")
+        b = self._built(sim, "test_sim_sim1", "_sim1", unique_suffix="_1")
+        assert a == b
+
+    def test_volume_content_distinguishes(self, sim):
+        a = self._built(sim, "test_sim_sim0", "_sim0")
+        b = self._built(sim, "test_sim_sim1", "_sim1", volume_checksum="sha256:b")
+        assert a != b
+
+    def test_params_distinguish(self, sim):
+        a = self._built(sim, "test_sim_sim0", "_sim0")
+        sim.workflow_params["compress.ups"] += "<changed/>"
+        assert sim.fingerprint() != a
+
+    def test_short_names_leave_params_alone(self, sim):
+        # Names occurring in unrelated parameter text aren't substituted
+        a = self._built(sim, "1", "", params={"force-displacement.keys": '["/material1/x"]'})
+        b = self._built(sim, "2", "", params={"force-displacement.keys": '["/material2/x"]'})
+        assert a != b
+
+    def test_ups_without_template_compared_as_is(self, sim):
+        a = self._built(sim, "test_sim_sim0", "_sim0")
+        sim._ups_render = None
+        assert sim.fingerprint() != a
+
+    def test_reuse_workflow_records_result(self, sim):
+        workflow = MagicMock()
+        workflow.id = "wf-1"
+        workflow.project_id = sim.project_id
+        sim.reuse_workflow(workflow, "_sim1")
+        assert sim.workflow is workflow
+        assert sim.results[-1]["id"] == "wf-1"
+        assert sim.results[-1]["name"] == "test_sim"
+
+
+class TestResultStore:
+    @pytest.fixture
+    def store_sim(self, sim, tmp_path):
+        sim.result_store = ResultStore(tmp_path / "results.json")
+        sim.project_id = "1"
+        sim.client.project_id.side_effect = lambda id=None: id or "1"
+        TestFingerprint()._built(sim, "test_sim", "")
+        return sim
+
+    def _workflow(self, id, state="success", project_id="1"):
+        return SimpleNamespace(id=id, state=state, project_id=project_id)
+
+    def test_miss_dispatches_and_records(self, store_sim):
+        store_sim.client.workflows.run_async.return_value = self._workflow("wf-1")
+        store_sim.run_workflow()
+        entry = store_sim.result_store.get(store_sim.fingerprint())
+        assert entry["workflow_id"] == "wf-1"
+        assert entry["part_unique_names"] == {
+            i.part.name: i.part_unique_name for i in store_sim.part_infos
+        }
+
+    def test_hit_reuses_workflow_from_other_project(self, store_sim):
+        store_sim.result_store.put(
+            store_sim.fingerprint(),
+            self._workflow("wf-1", project_id="2"),
+            {i.part.name: f"{i.part.name}_7" for i in store_sim.part_infos},
+        )
+        store_sim.client.workflows.get.return_value = self._workflow("wf-1", project_id="2")
+        store_sim.run_workflow()
+        store_sim.client.workflows.run_async.assert_not_called()
+        store_sim.client.workflows.get.assert_called_once_with("wf-1", project_id="2")
+        assert store_sim.results[-1]["id"] == "wf-1"
+        assert store_sim.results[-1]["projectId"] == "2"
+        # Job names of the reused workflow derive from its unique names
+        assert all(i.part_unique_name.endswith("_7") for i in store_sim.part_infos)
+
+    def test_hit_from_injected_client_project(self, store_sim):
+        # An injected client carries the project, project_id stays unset
+        store_sim.project_id = ""
+        store_sim.result_store.put(store_sim.fingerprint(), self._workflow("wf-1"), {})
+        store_sim.client.workflows.get.return_value = self._workflow("wf-1")
+        store_sim.run_workflow()
+        assert store_sim.results[-1]["id"] == "wf-1"
+        assert "projectId" not in store_sim.results[-1]
+
+    def test_failed_workflow_dispatched_again(self, store_sim):
+        fingerprint = store_sim.fingerprint()
+        store_sim.result_store.put(fingerprint, self._workflow("wf-1"), {})
+        store_sim.client.workflows.get.return_value = self._workflow("wf-1", "failure")
+        store_sim.client.workflows.run_async.return_value = self._workflow("wf-2")
+        store_sim.run_workflow()
+        assert store_sim.results[-1]["id"] == "wf-2"
+        assert "projectId" not in store_sim.results[-1]
+        assert store_sim.result_store.get(fingerprint)["workflow_id"] == "wf-2"
+
+
+class TestServerManifestCache:
+    @pytest.fixture
+    def manifest_sim(self, sim):
+        sim.project_id = "1"
+        sim.results = [{"id": "wf-1", "name": "test_sim"}]
+        sim.client.workflows.get.side_effect = lambda id, project_id=None: SimpleNamespace(
+            id=id, state="success", jobs=[f"{id}-job"], project_id="1"
+        )
+        sim.client.jobs.get.side_effect = lambda id, project_id=None: SimpleNamespace(
+            name="compress"
+        )
+        # Project data by project ID
+        projects: dict = {}
+        sim.client.project_id.side_effect = lambda id=None: id or "1"
+        sim.client.projects.get.side_effect = lambda id: SimpleNamespace(
+            project=projects.get(id)
+        )
+        sim.client.projects.update.side_effect = lambda id, data: projects.update({id: data})
+        sim.projects = projects
+        return sim
+
+    def test_finished_entries_reused(self, manifest_sim):
+        first = manifest_sim.write_server_manifest()
+        manifest_sim.results.append({"id": "wf-2", "name": "test_sim"})
+        second = manifest_sim.write_server_manifest()
+        fetched = [c.args[0] for c in manifest_sim.client.workflows.get.call_args_list]
+        assert fetched == ["wf-1", "wf-2"]
+        assert second["results"][0] == first["results"][0]
+        assert second["results"][1]["data"]["position0"]["jobId"] == "wf-2-job"
+
+    def test_changed_result_rebuilt(self, manifest_sim):
+        manifest_sim.write_server_manifest()
+        manifest_sim.results[0]["name"] = "renamed"
+        manifest_sim.write_server_manifest()
+        assert manifest_sim.client.workflows.get.call_count == 2
+
+    def test_unfinished_entries_not_cached(self, manifest_sim):
+        manifest_sim.client.workflows.get.side_effect = lambda id, project_id=None: (
+            SimpleNamespace(id=id, state="started", jobs=[], project_id="1")
+        )
+        manifest_sim.write_server_manifest()
+        manifest_sim.write_server_manifest()
+        assert manifest_sim.client.workflows.get.call_count == 2
+
+    def test_unchanged_manifest_not_uploaded(self, manifest_sim):
+        manifest_sim.upload_server_manifest()
+        manifest_sim.upload_server_manifest()
+        manifest_sim.client.projects.update.assert_called_once()
+        # Trusted without downloading the project data
+        manifest_sim.client.projects.get.assert_not_called()
+        manifest_sim.results.append({"id": "wf-2", "name": "test_sim"})
+        manifest_sim.upload_server_manifest()
+        assert manifest_sim.client.projects.update.call_count == 2
+
+    def test_changed_project_data_uploaded_again(self, manifest_sim):
+        manifest_sim.upload_server_manifest()
+        manifest_sim.projects["1"] = {"edited": True}
+        manifest_sim.upload_server_manifest()
+        manifest_sim.client.projects.update.assert_called_once()
+        manifest_sim.upload_server_manifest(revalidate=True)
+        assert manifest_sim.client.projects.update.call_count == 2
+        manifest_sim.upload_server_manifest(revalidate=True)
+        assert manifest_sim.client.projects.update.call_count == 2
+
+    def test_cached_per_client_project(self, manifest_sim):
+        # Injected clients carry the project, project_id stays unset
+        manifest_sim.project_id = ""
+        manifest_sim.upload_server_manifest()
+        manifest_sim.client.project_id.side_effect = lambda id=None: id or "2"
+        manifest_sim.upload_server_manifest()
+        assert [c.args[0] for c in manifest_sim.client.projects.update.call_args_list] == ["1", "2"]
+
+
+class TestLodLevels:
+    def test_reduce_job_has_no_levels(self, sim):
+        sim.lod_levels = 3
+        sim.workflow_jobs = {"compress": {}}
+        sim.workflow_params = {}
+        sim._add_to_workflow_reduce_results()
+        assert sim.workflow_params == {}
+
+    def test_server_data_has_no_levels(self, sim):
+        # Levels only exist in the results zip
+        sim.lod_levels = 2
+        lookup = {"reduce-results": "7", "compress": "5", "von-mises-stress": "6"}
+        data = sim._build_server_data_for_workflow(MagicMock(), lookup)
+        assert data["position1"] == {
+            "jobId": "7", "assetName": "output", "path": "/material1/position",
+        }
+
+
+class TestLocalPostprocess:
+    def test_build_workflow_skips_jobs(self, sim):
+        sim.local_postprocess = LocalPostprocessOptions()
+        sim.ups_xml = "<Uintah_specification/>"
+        sim.build_workflow()
+        assert "compress" in sim.workflow_jobs
+        for job in ("von-mises-stress", "effective-strain", "particle-displacement"):
+            assert job not in sim.workflow_jobs
+        assert sim.workflow_jobs["reduce-results"]["needs"] == ["compress"]
+
+    def test_server_data_skips_local_fields(self, sim):
+        sim.local_postprocess = LocalPostprocessOptions()
+        data = sim._build_server_data_for_workflow(MagicMock(), {"compress": "5"})
+        assert "position1" in data
+        assert not any(k.startswith(("vonMisesStress", "effectiveStrain", "particleDisplacement")) for k in data)
+
+
+class TestSampledVolume:
+    def _collect(self, sim):
+        job = MagicMock()
+        job.name = "sample-mesh-midsole"
+        job.outputs.params = {
+            "patch_size": "[0.3, 0.2, 0.1]",
+            "patch_offset": "[-0.15, -0.1, 0.0]",
+            "patch_resolution": "[4, 3, 2]",
+        }
+        job.assets = [SimpleNamespace(id="42", filename="mid.bin", checksum="sha256:c")]
+        sim.client.jobs.get.return_value = job
+        sim.prep_workflows = [SimpleNamespace(jobs=["9"])]
+        sim.get_part_info("midsole").jobs["sample-mesh"] = "sample-mesh-midsole"
+        sim.collect_sampled_volumes()
+
+    def _fake_download(self, asset_id, dtype, shape, project_id=None, out=None):
+        if out is None:
+            out = np.empty(shape, dtype)
+        out[...] = np.arange(out.size).reshape(out.shape)
+        return out
+
+    def test_load(self, sim):
+        self._collect(sim)
+        assert sim.get_part_info("midsole").volume_asset_id == "42"
+        sim.client.assets.download_array.side_effect = self._fake_download
+        volume = sim.load_sampled_volume("midsole")
+        assert sim.client.assets.download_array.call_args.args[:3] == ("42", "float32", (2, 3, 4))
+        assert volume.data.shape == (2, 3, 4)
+        assert volume.resolution == (4, 3, 2)
+        assert np.allclose(volume.spacing, [0.1, 0.1, 0.1])
+        assert np.allclose(volume.coordinates(0), [-0.15, -0.05, 0.05, 0.15])
+
+    def test_load_memmapped(self, sim, tmp_path):
+        self._collect(sim)
+        sim.client.assets.download_array.side_effect = self._fake_download
+        volume = sim.load_sampled_volume("midsole", path=tmp_path / "mid.bin")
+        assert isinstance(volume.data, np.memmap)
+        volume.data.flush()
+        assert np.array_equal(np.fromfile(tmp_path / "mid.bin", np.float32), np.arange(24))
+
+    def test_not_sampled(self, sim):
+        with pytest.raises(RuntimeError, match="sample_assets"):
+            sim.load_sampled_volume("midsole")
+        with pytest.raises(RuntimeError, match="Unknown part"):
+            sim.load_sampled_volume("heel")
+
+    def test_local_metrics(self, sim):
+        sim.local_metrics = LocalMetricsOptions()
+        sim.client.assets.download_array.side_effect = (
+            lambda *args, **kwargs: self._fake_download(*args, **kwargs) - 10
+        )
+        self._collect(sim)
+        # 10 samples below zero, 0.1 apart
+        assert sim.get_part_info("midsole").interior_volume == pytest.approx(0.01)
+        metrics = sim.volume_metrics("midsole")
+        assert metrics.interior_samples == 10
+        # Cached by volume checksum
+        assert sim.client.assets.download_array.call_count == 1
+
+
+class TestLocalMetrics:
+    def test_prep_workflow_skips_metrics_jobs(self, sim):
+        sim.local_metrics = LocalMetricsOptions()
+        mesh_parts = [p for p in sim.part_infos if hasattr(p.part, "filename")]
+        yaml_str, _, _ = sim._build_sample_workflow_for_batch(mesh_parts)
+        jobs = yaml.safe_load(yaml_str)["jobs"]
+        assert any(name.startswith("sample-mesh-") for name in jobs)
+        assert not any(name.startswith("metrics-") for name in jobs)
+
+    def test_build_workflow_skips_metrics_jobs(self, sim):
+        sim.local_metrics = LocalMetricsOptions()
+        for info in sim.part_infos:
+            info.patch = {"size": [0.1] * 3, "offset": [0.0] * 3, "resolution": [8] * 3}
+            if hasattr(info.part, "filename"):
+                info.volume_filename = f"{info.part_unique_name}_volume.bin"
+        sim.ups_xml = "<Uintah_specification/>"
+        sim.build_workflow()
+        assert "compress" in sim.workflow_jobs
+        assert not any(name.startswith("metrics-") for name in sim.workflow_jobs)
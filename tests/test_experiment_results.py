@@ -0,0 +1,155 @@
+import json
+from zipfile import ZIP_DEFLATED, ZipFile
+
+import numpy as np
+import pytest
+
+from metafold.simulation.compression_simulation import ReferenceData
+from metafold.simulation.experiment_results import (
+    CurveScores,
+    ExperimentResults,
+    batch_interp,
+)
+
+pd = pytest.importorskip("pandas")
+
+
+def loop(peak, stiffness, n=21):
+    """A loading/unloading force-displacement loop."""
+    up = np.linspace(0, peak, n)
+    down = up[::-1][1:]
+    return pd.DataFrame({
+        "displacement": np.concatenate([up, down]),
+        "force": np.concatenate([stiffness * up, 0.5 * stiffness * down]),
+    })
+
+
+@pytest.fixture
+def results_zip(tmp_path):
+    manifest = {"results": [{
+        "id": "1",
+        "name": "Reference (experimental)",
+        "isExperimental": True,
+        "data": {"forceDisplacement": {"name": "reference.h5", "path": "/reference"}},
+    }]}
+    path = tmp_path / "out.zip"
+    with ZipFile(path, "w") as zf:
+        for i, (peak, stiffness) in enumerate([(4.0, 1.0), (5.0, 2.0), (6.0, 3.0)]):
+            h5 = tmp_path / f"fd{i}.h5"
+            with pd.HDFStore(h5, "w") as store:
+                store["/force_displacement"] = loop(peak, stiffness)
+            zf.write(h5, arcname=f"sim{i}/force_disp.h5")
+            manifest["results"].append({
+                "id": f"wf-{i}",
+                "name": f"sim{i}",
+                "energyAbsorbed": 10.0 * i,
+                "volume": 100.0,
+                "data": {"forceDisplacement": {"name": f"sim{i}/force_disp.h5", "path": "/force_displacement"}},
+            })
+        manifest["results"].append({"id": "wf-3", "name": "failed", "data": {}})
+        ref = tmp_path / "reference.h5"
+        with pd.HDFStore(ref, "w") as store:
+            store["/reference"] = loop(3.0, 1.5)
+        # Compressed members are read too
+        zf.write(ref, arcname="reference.h5", compress_type=ZIP_DEFLATED)
+        zf.writestr("manifest.json", json.dumps(manifest))
+    return path
+
+
+def test_scalars(results_zip):
+    with ExperimentResults(results_zip) as results:
+        assert results.names == ["sim0", "sim1", "sim2", "failed"]
+        assert np.array_equal(results.scalars("energyAbsorbed")[:3], [0.0, 10.0, 20.0])
+        assert np.isnan(results.scalars("energyAbsorbed")[3])
+        table = results.scalar_table(("volume", "energyAbsorbed"))
+        assert table.shape == (4, 2)
+        assert np.array_equal(table[:3, 0], [100.0] * 3)
+
+
+def test_resample_loading(results_zip):
+    with ExperimentResults(results_zip) as results:
+        grid, force = results.resample()
+    # Common range of all curves
+    assert grid[0] == 0.0 and grid[-1] == 4.0
+    assert force.shape == (4, 200)
+    assert np.allclose(force[:3], np.outer([1.0, 2.0, 3.0], grid))
+    assert np.isnan(force[3]).all()
+
+
+def test_resample_unloading_on_grid(results_zip):
+    with ExperimentResults(results_zip) as results:
+        grid, force = results.resample(grid=np.array([1.0, 5.5]), branch="unloading")
+    assert np.allclose(force[:3, 0], [0.5, 1.0, 1.5])
+    # Beyond the range of the first two curves
+    assert np.isnan(force[:2, 1]).all()
+    assert force[2, 1] == pytest.approx(0.5 * 3 * 5.5)
+
+
+def test_reference(results_zip):
+    with ExperimentResults(results_zip) as results:
+        assert results.reference["name"] == "Reference (experimental)"
+        ref = results.reference_frame()
+    assert ref["force"].max() == pytest.approx(4.5)
+
+
+def test_directory(results_zip, tmp_path):
+    with ZipFile(results_zip) as zf:
+        zf.extractall(tmp_path / "extracted")
+    results = ExperimentResults(tmp_path / "extracted")
+    assert len(results) == 4
+    assert results.frame(1, "forceDisplacement")["force"].max() == pytest.approx(10.0)
+    assert results.frame(3, "forceDisplacement") is None
+
+
+def test_lazy(tmp_path):
+    # Nothing is read until used
+    results = ExperimentResults(tmp_path / "missing.zip")
+    with pytest.raises(FileNotFoundError):
+        results.names
+
+
+def test_batch_interp_matches_interp():
+    rng = np.random.default_rng(0)
+    curves = [(np.sort(rng.random(n)) * 10, rng.random(n)) for n in (2, 7, 50, 1)] + [None]
+    grid = np.linspace(-1, 11, 300)
+    values = batch_interp(grid, curves)
+    for row, curve in zip(values[:-1], curves[:-1]):
+        expected = np.interp(grid, *curve, left=np.nan, right=np.nan)
+        assert np.allclose(row, expected, equal_nan=True)
+    assert np.isnan(values[-1]).all()
+
+
+def test_score_against_shipped_reference(results_zip):
+    with ExperimentResults(results_zip) as results:
+        scores = results.score()
+    # Reference is 1.5 * displacement up to 3: off by 0.5, 0.5 and 1.5 per mm
+    grid = np.linspace(0, 3, 21)
+    expected = np.sqrt(np.mean((np.outer([-0.5, 0.5, 1.5], grid)) ** 2, axis=1))
+    assert np.allclose(scores.rmse[:3], expected)
+    assert np.allclose(scores.coverage[:3], 1.0)
+    assert np.allclose(scores.peak_force_error[:3], [4 / 4.5 - 1, 10 / 4.5 - 1, 18 / 4.5 - 1])
+    assert np.isnan(scores.rmse[3])
+    assert list(scores.ranking()) == [0, 1, 2, 3]
+    assert list(scores.ranking("peak_force_error")) == [0, 1, 2, 3]
+
+
+def test_score_against_reference_data(results_zip, tmp_path):
+    csv = tmp_path / "ref.csv"
+    loop(5.0, 2.0, n=11).rename(columns=str.capitalize).to_csv(csv, index=False)
+    reference = ReferenceData(csv_path=csv)
+    reference.energy_absorbed = 10.0
+    with ExperimentResults(results_zip) as results:
+        scores = results.score(reference)
+    assert scores.names[:3] == ["sim0", "sim1", "sim2"]
+    # sim0 only reaches 4 of the reference's 5 mm
+    assert scores.coverage[0] == pytest.approx(9 / 11)
+    assert scores.rmse[1] == pytest.approx(0.0)
+    assert np.allclose(scores.energy_error[:3], [-1.0, 0.0, 1.0])
+    assert scores.ranking()[0] == 1
+    assert list(scores.ranking("energy_error")[:1]) == [1]
+
+
+def test_ranking_rejects_unknown_score():
+    scores = CurveScores([], *(np.array([]) for _ in range(4)))
+    with pytest.raises(ValueError):
+        scores.ranking("volume")
@@ -0,0 +1,40 @@
+import pytest
+import subprocess
+import sys
+
+HEAVY_MODULES = [
+    "auth0",
+    "pandas",
+    "plyfile",
+    "scipy",
+    "simulation_configurator",
+    "yaml",
+]
+
+
+def imported_packages(stmt: str) -> set[str]:
+    """Top-level packages loaded by stmt in a fresh interpreter."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", stmt],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    modules = set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            continue  # header
+        modules.add(name.strip().split(".")[0])
+    return modules
+
+
+@pytest.mark.parametrize("stmt", [
+    "import metafold",
+    "from metafold.simulation import run_experiment",
+])
+def test_import_skips_heavy_modules(stmt):
+    # Heavy dependencies are imported where they're used, not at import time
+    assert not imported_packages(stmt) & set(HEAVY_MODULES)
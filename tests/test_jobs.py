@@ -2,6 +2,7 @@ from copy import deepcopy
 from datetime import datetime, timezone
 from http import HTTPStatus
 from http.server import BaseHTTPRequestHandler
+from metafold.api import _parse_rfc1123
 from metafold.assets import Asset
 from metafold.jobs import Job, IO
 from urllib.parse import parse_qs, urlparse
@@ -108,14 +109,20 @@ class MockRequestHandler(BaseHTTPRequestHandler):
         u = urlparse(self.path)
         params = parse_qs(u.query)
         if u.path == "/projects/1/jobs":
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
             payload = job_list
             if params.get("sort") == ["id:1"]:
                 payload = sorted(job_list, key=lambda p: p["id"])
             elif params.get("q") == ["name:foo"]:
                 payload = [p for p in job_list if p["name"] == "foo"]
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/json")
+            if "limit" in params:
+                limit = int(params["limit"][0])
+                start = int(params.get("cursor", ["0"])[0])
+                if start + limit < len(payload):
+                    self.send_header("X-Next-Cursor", str(start + limit))
+                payload = payload[start:start + limit]
+            self.end_headers()
             self.wfile.write(json.dumps(payload).encode())
         elif u.path == "/projects/1/jobs/1":
             self.send_response(HTTPStatus.OK)
@@ -148,6 +155,17 @@ def test_list_jobs_filtered(client):
     assert all([j.name == "foo" for j in jobs])
 
 
+def test_iter_jobs_paginated(client):
+    jobs = client.jobs.iter_list(page_size=2)
+    assert next(jobs).id == "3"
+    assert [j.id for j in jobs] == ["2", "1"]
+
+
+def test_iter_jobs_filtered(client):
+    jobs = client.jobs.iter_list(q="name:foo", page_size=1)
+    assert [j.id for j in jobs] == ["2", "1"]
+
+
 def test_get_job(client):
     j = client.jobs.get("1")
     assert j == Job(
@@ -168,3 +186,24 @@ def test_get_job(client):
         parameters=default_params,
         meta=None,
     )
+
+
+def test_construct_10k_jobs_parses_timestamps_once():
+    # Large list() responses repeat the same timestamps over and over, model
+    # construction used to be dominated by parsing them (~1.5 s for this
+    # input). Each distinct timestamp is parsed once.
+    payload = []
+    for i in range(10000):
+        j = deepcopy(job_list[0])
+        j["id"] = str(i)
+        j["outputs"] = {"params": None, "assets": {"output": asset_json}}
+        j["assets"] = [asset_json]
+        payload.append(j)
+
+    _parse_rfc1123.cache_clear()
+    jobs = [Job(**j) for j in payload]
+
+    assert jobs[-1].outputs.assets == {"output": asset_obj}
+    info = _parse_rfc1123.cache_info()
+    assert info.misses == 1
+    assert info.hits > 10000
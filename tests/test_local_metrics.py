@@ -0,0 +1,68 @@
+import numpy as np
+import pytest
+
+from metafold.simulation.compression_simulation import SampledVolume
+from metafold.simulation.local_metrics import LocalMetricsOptions, volume_metrics
+
+
+def sampled(f, n, size=2.0):
+    """Volume of n^3 samples of f(x, y, z) over a cube centred on the origin."""
+    x = np.linspace(-size / 2, size / 2, n)
+    data = f(x[None, None, :], x[None, :, None], x[:, None, None]).astype(np.float32)
+    return SampledVolume(data=data, size=np.full(3, size), offset=np.full(3, -size / 2))
+
+
+def sphere(radius):
+    return lambda x, y, z: np.sqrt(x**2 + y**2 + z**2) - radius
+
+
+def test_sphere():
+    m = volume_metrics(sampled(sphere(0.7), 96))
+    assert m.interior_volume == pytest.approx(4 / 3 * np.pi * 0.7**3, rel=1e-2)
+    assert m.surface_area == pytest.approx(4 * np.pi * 0.7**2, rel=1e-2)
+    assert np.allclose(m.bounds_min, -0.7, atol=2 / 95)
+    assert np.allclose(m.extents, 1.4, atol=2 * 2 / 95)
+
+
+def test_box():
+    # Axis-aligned faces, only the edges are blurred
+    box = lambda x, y, z: np.maximum(np.maximum(np.abs(x) - 0.5, np.abs(y) - 0.3), np.abs(z) - 0.2)
+    m = volume_metrics(sampled(box, 101))
+    assert m.interior_volume == pytest.approx(1.0 * 0.6 * 0.4, rel=5e-2)
+    assert m.surface_area == pytest.approx(2 * (0.6 + 0.4 + 0.24), rel=5e-2)
+
+
+def test_iso_level():
+    volume = sampled(sphere(0.0), 64)
+    m = volume_metrics(volume, LocalMetricsOptions(iso_level=0.5))
+    assert m.interior_volume == pytest.approx(4 / 3 * np.pi * 0.5**3, rel=2e-2)
+
+
+@pytest.mark.parametrize("chunk_slices, threads", [(1, 1), (7, 3), (1000, 2)])
+def test_chunking(chunk_slices, threads):
+    volume = sampled(lambda x, y, z: np.sin(4 * x) * np.cos(4 * y) + np.sin(4 * z), 40)
+    expected = volume_metrics(volume)
+    m = volume_metrics(volume, LocalMetricsOptions(chunk_slices=chunk_slices, threads=threads))
+    assert m.interior_samples == expected.interior_samples
+    assert m.surface_area == pytest.approx(expected.surface_area)
+    assert np.array_equal(m.bounds_max, expected.bounds_max)
+
+
+def test_memmapped(tmp_path):
+    volume = sampled(sphere(0.5), 32)
+    data = np.memmap(tmp_path / "v.bin", dtype=np.float32, mode="w+", shape=volume.data.shape)
+    data[...] = volume.data
+    m = volume_metrics(SampledVolume(data, volume.size, volume.offset))
+    assert m.surface_area == pytest.approx(volume_metrics(volume).surface_area)
+
+
+def test_empty():
+    m = volume_metrics(sampled(lambda x, y, z: x * 0 + y * 0 + z * 0 + 1, 8))
+    assert m.interior_samples == 0 and m.surface_area == 0.0
+    assert m.bounds_min is None
+    assert np.array_equal(m.extents, np.zeros(3))
+
+
+def test_options_validated():
+    with pytest.raises(ValueError):
+        LocalMetricsOptions(chunk_slices=0)
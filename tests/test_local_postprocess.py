@@ -0,0 +1,144 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metafold.simulation.local_postprocess import (
+    LocalPostprocessOptions,
+    displacement_norm,
+    effective_strain,
+    histogram,
+    _map_chunks,
+    postprocess_hdf,
+    tensors,
+    von_mises_stress,
+)
+
+
+def random_rotations(n, seed=0):
+    q, _ = np.linalg.qr(np.random.default_rng(seed).normal(size=(n, 3, 3)))
+    return q
+
+
+def test_von_mises_stress():
+    uniaxial = np.diag([5.0, 0.0, 0.0])
+    hydrostatic = np.eye(3) * 7.0
+    shear = np.array([[0.0, 2.0, 0.0], [2.0, 0.0, 0.0], [0.0, 0.0, 0.0]])
+    vm = von_mises_stress(np.stack([uniaxial, hydrostatic, shear]))
+    assert np.allclose(vm, [5.0, 0.0, 2.0 * np.sqrt(3)])
+
+
+def test_von_mises_stress_rotation_invariant():
+    r = random_rotations(4)
+    sigma = np.diag([3.0, -1.0, 2.0])
+    rotated = np.einsum("nij,jk,nlk->nil", r, sigma, r)
+    assert np.allclose(von_mises_stress(rotated), von_mises_stress(sigma[None])[0])
+
+
+def test_effective_strain():
+    # Isochoric uniaxial stretch: principal log strains (e, -e/2, -e/2)
+    stretch = 1.2
+    f = np.diag([stretch, stretch**-0.5, stretch**-0.5])[None]
+    assert effective_strain(f)[0] == pytest.approx(np.log(stretch))
+    # Rigid rotations and pure volume changes don't strain
+    r = random_rotations(3)
+    assert np.allclose(effective_strain(r), 0.0, atol=1e-7)
+    assert effective_strain(np.eye(3)[None] * 0.8)[0] == pytest.approx(0.0, abs=1e-7)
+
+
+def test_tensors_voigt():
+    full = np.array([[1.0, 6.0, 5.0], [6.0, 2.0, 4.0], [5.0, 4.0, 3.0]])
+    voigt = np.array([[1.0, 2.0, 3.0, 4.0, 5.0, 6.0]])
+    assert np.array_equal(tensors(voigt)[0], full)
+    assert np.array_equal(tensors(full.reshape(1, 9))[0], full)
+    with pytest.raises(ValueError):
+        tensors(np.zeros((1, 4)))
+
+
+def test_displacement_norm():
+    ref_ids = np.array([1, 3, 5])
+    ref = np.array([[0.0, 0, 0], [1, 1, 1], [2, 2, 2]])
+    d = displacement_norm(np.array([5, 1, 4]), np.array([[2.0, 2, 5], [0, 4, 0], [0, 0, 0]]), ref_ids, ref)
+    assert np.allclose(d[:2], [3.0, 4.0])
+    assert np.isnan(d[2])
+
+
+def test_histogram():
+    times = np.array([0.0, 0.0, 0.0, 1.0, 1.0])
+    values = np.array([0.0, 1.0, 4.0, 4.0, np.nan])
+    h = histogram(times, values, bins=4)
+    assert list(h.index.names) == ["time", "bin"]
+    assert list(h.loc[0.0, "frequency"]) == [1, 1, 0, 1]
+    assert list(h.loc[1.0, "frequency"]) == [0, 0, 0, 1]
+    assert h["bin_left"].iloc[0] == 0.0 and h["bin_right"].iloc[3] == 4.0
+
+
+@pytest.fixture
+def compress_output(tmp_path):
+    rng = np.random.default_rng(1)
+    times, ids = np.meshgrid([0.0, 0.002, 0.004], np.arange(40), indexing="ij")
+    index = pd.MultiIndex.from_arrays([times.ravel(), ids.ravel()], names=["time", "id"])
+    n = len(index)
+    path = tmp_path / "compress.h5"
+    with pd.HDFStore(path, "w") as store:
+        for i in (1, 2):
+            store[f"/material{i}/cauchy_stress"] = pd.DataFrame(rng.normal(size=(n, 9)), index=index)
+            store[f"/material{i}/deformation_gradient"] = pd.DataFrame(
+                (np.eye(3) + 0.1 * rng.normal(size=(n, 3, 3))).reshape(n, 9), index=index
+            )
+            positions = rng.random((40, 3))
+            drift = np.repeat([0.0, 1.0, 2.0], 40)[:, None] * [0.0, 0.0, -0.01]
+            store[f"/material{i}/position"] = pd.DataFrame(
+                np.tile(positions, (3, 1)) + drift, index=index, columns=list("xyz")
+            )
+    return path
+
+
+@pytest.mark.parametrize("chunk_rows, threads", [(1000, 1), (7, 3)])
+def test_postprocess_hdf(compress_output, tmp_path, chunk_rows, threads):
+    outputs = {
+        "von_mises_stress": tmp_path / "vm.h5",
+        "effective_strain": tmp_path / "es.h5",
+        "particle_displacement": tmp_path / "pd.h5",
+    }
+    options = LocalPostprocessOptions(chunk_rows=chunk_rows, threads=threads, histogram_bins=8)
+    postprocess_hdf(compress_output, outputs, [0, 2], options)
+
+    with pd.HDFStore(compress_output, "r") as src:
+        sigma = src["/material2/cauchy_stress"].to_numpy().reshape(-1, 3, 3)
+    with pd.HDFStore(outputs["von_mises_stress"], "r") as store:
+        assert "/material1/von_mises_stress" not in store
+        vm = store["/material2/von_mises_stress"]
+        assert np.allclose(vm["v"], von_mises_stress(sigma))
+        assert store["/material2/von_mises_stress_histogram"]["frequency"].sum() == 120
+    with pd.HDFStore(outputs["effective_strain"], "r") as store:
+        assert len(store["/material2/effective_strain"]) == 120
+        # Appended a chunk at a time
+        assert store.get_storer("/material2/effective_strain").is_table
+    with pd.HDFStore(outputs["particle_displacement"], "r") as store:
+        disp = store["/material2/particle_displacement"]
+        assert "/material2/particle_displacement_histogram" not in store
+    assert np.allclose(disp.groupby("time")["norm"].mean(), [0.0, 0.01, 0.02])
+
+
+def test_map_chunks_streams():
+    read = []
+
+    def chunks():
+        for i in range(10):
+            read.append(i)
+            yield pd.DataFrame({"time": [float(i)], "id": [i]})
+
+    with ThreadPoolExecutor(2) as pool:
+        results = _map_chunks(pool, lambda df: df["id"].to_numpy() * 2.0, chunks(), 3)
+        times, ids, values = next(results)
+        # Only in_flight chunks were read ahead of the first result
+        assert read == [0, 1, 2]
+        assert values.tolist() == [0.0]
+        assert [v[0] for _, _, v in results] == [2.0 * i for i in range(1, 10)]
+
+
+def test_options_validated():
+    with pytest.raises(ValueError):
+        LocalPostprocessOptions(chunk_rows=0)
@@ -0,0 +1,116 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from metafold.simulation.parquet_export import (
+    ParquetResultsWriter,
+    dataset,
+    iter_hdf_chunks,
+)
+
+pytest.importorskip("pyarrow")
+
+
+def particles(n_times=5, n_ids=7):
+    index = pd.MultiIndex.from_product(
+        [np.linspace(0, 0.008, n_times), np.arange(n_ids) + 100], names=["time", "id"]
+    )
+    values = np.arange(len(index) * 3, dtype=np.float64).reshape(-1, 3)
+    return pd.DataFrame(values, index=index, columns=list("xyz"))
+
+
+@pytest.mark.parametrize("format", ["fixed", "table"])
+def test_iter_hdf_chunks_multiindex(tmp_path, format):
+    df = particles()
+    path = tmp_path / "p.h5"
+    df.to_hdf(path, key="/material1/position", format=format)
+    with pd.HDFStore(path, "r") as store:
+        chunks = list(iter_hdf_chunks(store, "/material1/position", chunk_rows=8))
+    assert [len(c) for c in chunks] == [8, 8, 8, 8, 3]
+    joined = pd.concat(chunks, ignore_index=True)
+    pd.testing.assert_frame_equal(joined, df.reset_index())
+
+
+def test_iter_hdf_chunks_plain_index(tmp_path):
+    df = pd.DataFrame({"disp": np.arange(10.0), "force": np.arange(10.0) * 2})
+    path = tmp_path / "fd.h5"
+    df.to_hdf(path, key="/force_displacement")
+    with pd.HDFStore(path, "r") as store:
+        chunks = list(iter_hdf_chunks(store, "/force_displacement", chunk_rows=4))
+    assert [len(c) for c in chunks] == [4, 4, 2]
+    pd.testing.assert_frame_equal(pd.concat(chunks), df)
+
+
+def test_write_hdf_partitions_by_timestep(tmp_path):
+    path = tmp_path / "p.h5"
+    particles().to_hdf(path, key="/material1/position")
+    with (
+        pd.HDFStore(path, "r") as store,
+        ParquetResultsWriter(tmp_path / "out") as writer,
+    ):
+        writer.write_hdf(
+            "position", store, "/material1/position",
+            {"simulation": "s0", "material": "mid sole"},
+            timestep=lambda t: np.rint(t / 0.002).astype(np.int64),
+            chunk_rows=10,
+        )
+
+    steps = sorted(p.name for p in (tmp_path / "out/position/simulation=s0/material=mid%20sole").iterdir())
+    assert steps == [f"timestep={k}" for k in range(5)]
+
+    table = dataset(tmp_path / "out", "position").to_table()
+    assert table.schema.field("x").type == "float"
+    assert table.schema.field("id").type == "int64"
+    assert str(table.schema.field("material").type).startswith("dictionary")
+    df = table.to_pandas()
+    assert len(df) == 35
+    assert set(df["material"].astype(str)) == {"mid sole"}
+    last = df[df["timestep"] == 4].sort_values("id")
+    assert np.allclose(last["x"], particles().loc[0.008, "x"].to_numpy())
+
+
+def test_write_frame_appends_row_groups(tmp_path):
+    import pyarrow.parquet as pq
+
+    with ParquetResultsWriter(tmp_path) as writer:
+        for i in range(3):
+            writer.write_frame("force_displacement", pd.DataFrame({"f": [float(i)]}), {"simulation": "a"})
+        writer.write_frame("force_displacement", pd.DataFrame({"f": []}), {"simulation": "b"})
+    f = pq.ParquetFile(tmp_path / "force_displacement/simulation=a/part-0.parquet")
+    assert f.metadata.num_row_groups == 3
+    assert not (tmp_path / "force_displacement/simulation=b").exists()
+
+
+def test_more_partitions_than_file_descriptors(tmp_path):
+    resource = pytest.importorskip("resource")
+    path = tmp_path / "p.h5"
+    particles(n_times=200, n_ids=3).to_hdf(path, key="/material1/position")
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    open_fds = len(os.listdir("/proc/self/fd")) if os.path.isdir("/proc/self/fd") else 16
+    resource.setrlimit(resource.RLIMIT_NOFILE, (open_fds + 64, hard))
+    try:
+        with (
+            pd.HDFStore(path, "r") as store,
+            ParquetResultsWriter(tmp_path / "out") as writer,
+        ):
+            writer.write_hdf(
+                "position", store, "/material1/position", {"simulation": "s0"},
+                timestep=lambda t: np.rint(t / 0.002 * 199 / 4).astype(np.int64),
+                chunk_rows=100,
+            )
+    finally:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (soft, hard))
+    df = dataset(tmp_path / "out", "position").to_table().to_pandas()
+    assert len(df) == 600
+    assert df["timestep"].nunique() == 200
+
+
+def test_partition_written_again_gets_new_file(tmp_path):
+    with ParquetResultsWriter(tmp_path, max_open_files=1) as writer:
+        for simulation in ("a", "b", "a"):
+            writer.write_frame("force_displacement", pd.DataFrame({"f": [1.0]}), {"simulation": simulation})
+    files = sorted(p.name for p in (tmp_path / "force_displacement/simulation=a").iterdir())
+    assert files == ["part-0.parquet", "part-1.parquet"]
+    assert len(dataset(tmp_path, "force_displacement").to_table()) == 3
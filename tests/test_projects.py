@@ -56,14 +56,20 @@ class MockRequestHandler(BaseHTTPRequestHandler):
         u = urlparse(self.path)
         params = parse_qs(u.query)
         if u.path == "/projects":
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
             payload = project_list
             if params.get("sort") == ["id:1"]:
                 payload = sorted(project_list, key=lambda p: p["id"])
             elif params.get("q") == ['name:"My Project"']:
                 payload = [p for p in project_list if p["name"] == "My Project"]
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/json")
+            if "limit" in params:
+                limit = int(params["limit"][0])
+                start = int(params.get("cursor", ["0"])[0])
+                if start + limit < len(payload):
+                    self.send_header("X-Next-Cursor", str(start + limit))
+                payload = payload[start:start + limit]
+            self.end_headers()
             self.wfile.write(json.dumps(payload).encode())
         elif u.path == "/projects/1":
             self.send_response(HTTPStatus.OK)
@@ -129,6 +135,11 @@ def test_list_projects_filtered(client):
     assert all([p.name == "My Project" for p in projects])
 
 
+def test_iter_projects_paginated(client):
+    projects = client.projects.iter_list(page_size=1)
+    assert [p.id for p in projects] == ["3", "2", "1"]
+
+
 def test_get_project(client):
     p = client.projects.get("1")
     assert p == Project(
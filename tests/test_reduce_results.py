@@ -0,0 +1,161 @@
+import json
+import numpy as np
+import pandas as pd
+import pytest
+
+from metafold.simulation.reduce_results import (
+    NAN_CODE,
+    ReduceResultsOptions,
+    add_lod_levels,
+    dequantize,
+    lod_ids,
+    quantize,
+    read_reduced,
+    reduce_frame,
+    reduce_hdf,
+    select_particles,
+    select_times,
+)
+
+
+def particles(n_times=11, n_ids=1000, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.MultiIndex.from_product(
+        [np.linspace(0, 0.04, n_times), np.arange(n_ids)], names=["time", "id"]
+    )
+    return pd.DataFrame(rng.random((len(index), 3)) * 0.1, index=index, columns=list("xyz"))
+
+
+def test_quantize_roundtrip():
+    values = np.array([-2.0, 0.5, np.nan, 3.0])
+    q, offset, scale = quantize(values)
+    assert q.dtype == np.int16
+    assert q[2] == NAN_CODE
+    restored = dequantize(q, offset, scale)
+    assert np.isnan(restored[2])
+    assert np.allclose(restored[[0, 1, 3]], values[[0, 1, 3]], atol=scale / 2)
+
+
+def test_quantize_constant():
+    q, offset, scale = quantize(np.full(4, 7.0))
+    assert np.array_equal(dequantize(q, offset, scale), np.full(4, 7.0))
+
+
+def test_select_times_keeps_last():
+    times = np.repeat(np.arange(10.0), 3)
+    assert select_times(times, 4).tolist() == [0.0, 4.0, 8.0, 9.0]
+    assert select_times(times, 1).tolist() == list(np.arange(10.0))
+
+
+def test_select_particles_deterministic():
+    ids = np.random.default_rng(0).permutation(1000)
+    keep = select_particles(ids, 100)
+    assert len(keep) == 100
+    assert keep[0] == 0 and keep[-1] == 999
+    assert np.array_equal(keep, select_particles(ids[::-1], 100))
+    assert len(select_particles(ids, None)) == 1000
+
+
+def test_reduce_frame():
+    df = particles()
+    reduced, metadata = reduce_frame(df, ReduceResultsOptions(time_stride=5, max_particles=100))
+    assert sorted(reduced["time"].unique()) == pytest.approx([0.0, 0.02, 0.04])
+    assert reduced["id"].nunique() == 100
+    assert reduced["x"].dtype == np.int16
+    restored = df.loc[list(zip(reduced["time"], reduced["id"]))]
+    scale = metadata["columns"]["y"]["scale"]
+    y = dequantize(reduced["y"].to_numpy(), metadata["columns"]["y"]["offset"], scale)
+    assert np.allclose(y, restored["y"].to_numpy(), atol=scale / 2)
+
+
+def test_reduce_frame_unquantized():
+    reduced, metadata = reduce_frame(particles(), ReduceResultsOptions(quantize=False))
+    assert metadata == {}
+    assert reduced["x"].dtype == np.float64
+
+
+def test_reduce_hdf(tmp_path):
+    src, dst = tmp_path / "src.h5", tmp_path / "dst.h5"
+    histogram = pd.DataFrame({"bin": np.arange(10), "count": np.arange(10) * 2})
+    with pd.HDFStore(src, "w") as store:
+        store["/material0/von_mises_stress"] = particles(n_ids=5000).rename(columns={"x": "v"})
+        store["/material0/von_mises_stress_histogram"] = histogram
+    reduce_hdf(
+        src, dst, ReduceResultsOptions(time_stride=2, max_particles=1000),
+        include=lambda key: not key.endswith("_histogram"),
+    )
+    assert dst.stat().st_size * 4 < src.stat().st_size
+    with pd.HDFStore(dst, "r") as store:
+        pd.testing.assert_frame_equal(store["/material0/von_mises_stress_histogram"], histogram)
+        metadata = json.loads(store.get_storer("/material0/von_mises_stress").attrs.quantization)
+        assert set(metadata["columns"]) == {"v", "y", "z"}
+        df = read_reduced(store, "/material0/von_mises_stress")
+    assert df["v"].dtype == np.float64
+    assert df["v"].between(0, 0.1).all()
+
+
+def test_options_validated():
+    with pytest.raises(ValueError):
+        ReduceResultsOptions(time_stride=0)
+    with pytest.raises(ValueError):
+        ReduceResultsOptions(max_particles=0)
+
+
+def grid_positions(n=32):
+    x, y, z = np.meshgrid(*[np.arange(n, dtype=float)] * 3, indexing="ij")
+    ids = np.random.default_rng(1).permutation(n**3)
+    frames = [
+        pd.DataFrame({"time": t, "id": ids, "x": x.ravel(), "y": y.ravel(), "z": z.ravel() + t})
+        for t in (0.0, 1.0)
+    ]
+    return pd.concat(frames, ignore_index=True)
+
+
+def test_lod_ids_nested_and_stratified():
+    positions = grid_positions()
+    level1, level2 = lod_ids(positions, 2)
+    assert len(level1) == 32**3 // 4
+    assert len(level2) == 32**3 // 16
+    assert np.isin(level2, level1).all()
+    # Every 8x8x8 block of the grid keeps its share of particles
+    first = positions[positions["time"] == 0].set_index("id").loc[level2]
+    blocks = (first[["x", "y", "z"]].to_numpy() // 8).astype(int)
+    _, counts = np.unique(blocks, axis=0, return_counts=True)
+    assert len(counts) == 64
+    assert counts.min() == counts.max() == 8**3 // 16
+
+
+def test_add_lod_levels(tmp_path):
+    path = tmp_path / "results.h5"
+    positions = grid_positions(8)
+    with pd.HDFStore(path, "w") as store:
+        store["/material0/position"] = positions
+        store["/material0/position_histogram"] = pd.DataFrame({"count": [1]})
+    ids = {"/material0": lod_ids(positions, 2)}
+    add_lod_levels(path, ids, include=lambda key: not key.endswith("_histogram"))
+    with pd.HDFStore(path, "r") as store:
+        assert sorted(store.keys()) == [
+            "/material0/position",
+            "/material0/position_histogram",
+            "/material0/position_lod1",
+            "/material0/position_lod2",
+        ]
+        lod2 = store["/material0/position_lod2"]
+    assert sorted(lod2["id"].unique()) == list(ids["/material0"][1])
+    assert len(lod2) == 2 * len(ids["/material0"][1])
+
+
+def test_add_lod_levels_of_reduced(tmp_path):
+    src, dst = tmp_path / "results.h5", tmp_path / "reduced.h5"
+    with pd.HDFStore(src, "w") as store:
+        store["/material0/position"] = grid_positions(8)
+    reduce_hdf(src, dst, ReduceResultsOptions(max_particles=100))
+    with pd.HDFStore(dst, "r") as store:
+        positions = read_reduced(store, "/material0/position")
+    ids = {"/material0": lod_ids(positions, 2)}
+    add_lod_levels(dst, ids)
+    with pd.HDFStore(dst, "r") as store:
+        lod1 = read_reduced(store, "/material0/position_lod1")
+    assert set(lod1["id"]) <= set(positions["id"])
+    assert lod1["x"].dtype == np.float64
+    assert lod1["x"].max() == pytest.approx(7.0, abs=1e-3)
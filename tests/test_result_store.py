@@ -0,0 +1,50 @@
+from copy import deepcopy
+from types import SimpleNamespace
+from metafold.simulation.result_store import ResultStore
+import json
+import pytest
+
+
+@pytest.fixture
+def store(tmp_path):
+    return ResultStore(tmp_path / "store" / "results.json")
+
+
+def test_put_get(store):
+    assert store.get("sha256:a") is None
+    workflow = SimpleNamespace(id="1", project_id="2")
+    store.put("sha256:a", workflow, {"midsole": "midsole_0"})
+    assert store.get("sha256:a") == {
+        "workflow_id": "1",
+        "project_id": "2",
+        "part_unique_names": {"midsole": "midsole_0"},
+    }
+
+
+def test_persisted(store, tmp_path):
+    store.put("sha256:a", SimpleNamespace(id="1", project_id="2"), {})
+    # Entries written by other stores sharing the file are kept
+    other = ResultStore(tmp_path / "store" / "results.json")
+    other.put("sha256:b", SimpleNamespace(id="3", project_id="2"), {})
+    assert store.get("sha256:a")["workflow_id"] == "1"
+    assert store.get("sha256:b")["workflow_id"] == "3"
+
+
+def test_invalidate(store):
+    store.put("sha256:a", SimpleNamespace(id="1", project_id="2"), {})
+    store.invalidate("sha256:a")
+    store.invalidate("sha256:b")
+    assert store.get("sha256:a") is None
+
+
+def test_corrupt_file_ignored(store, tmp_path):
+    path = tmp_path / "store" / "results.json"
+    path.parent.mkdir()
+    path.write_text("{")
+    assert store.get("sha256:a") is None
+    store.put("sha256:a", SimpleNamespace(id="1", project_id="2"), {})
+    assert "sha256:a" in json.loads(path.read_text())
+
+
+def test_deepcopy_shares_store(store):
+    assert deepcopy(store) is store
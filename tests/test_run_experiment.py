@@ -35,8 +35,11 @@ from metafold.simulation.run_experiment import (
 from metafold.simulation.compression_experiment import (
     VaryMaterial,
     VaryMesh,
+    VaryProduct,
     VarySimulationParameter,
+    VarySimulationParameters,
     VaryVelocity,
+    VaryZip,
 )
 
 
@@ -247,6 +250,29 @@ class TestBuildVarying:
         with pytest.raises(ValueError, match="velocity"):
             _build_varying([{"part": "piston", "velocity": "nope"}])
 
+    def test_vary_product_nested_zip(self):
+        [varying] = _build_varying([{"product": [
+            {"part": "midsole", "files": ["a.ply", "b.ply", "c.ply"]},
+            {"zip": [
+                {"part": "midsole", "material": ["default_midsole_nominal", "default_outsole"]},
+                {"field": "max_time", "values": [0.02, 0.04]},
+            ]},
+        ]}])
+        assert isinstance(varying, VaryProduct)
+        assert isinstance(varying.varying[1], VaryZip)
+
+    def test_vary_sampled(self):
+        [varying] = _build_varying([{
+            "sample": "latin_hypercube", "count": 8, "seed": 0,
+            "ranges": {"max_time": [0.02, 0.06]},
+        }])
+        assert isinstance(varying, VarySimulationParameters)
+        assert varying.samples.shape == (8, 1)
+
+    def test_unknown_sample_design_raises(self):
+        with pytest.raises(ValueError, match="sample design"):
+            _build_varying([{"sample": "grid", "count": 8, "ranges": {}}])
+
     def test_unrecognised_entry_raises(self):
         with pytest.raises(ValueError, match="Unrecognised varying"):
             _build_varying([{"unknown_key": "foo"}])
@@ -0,0 +1,158 @@
+from datetime import datetime, timedelta, timezone
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler
+from io import BytesIO
+from metafold import MetafoldClient
+from metafold.tracing import JSONTracer, Tracer, traced
+from urllib.parse import parse_qs, urlparse
+import json
+import pytest
+
+asset_json = {
+    "id": "1",
+    "filename": "f763df409e79eb1c.bin",
+    "size": 4,
+    "checksum": "sha256:...",
+    "created": "Mon, 01 Jan 2024 00:00:00 GMT",
+    "modified": "Mon, 01 Jan 2024 00:00:00 GMT",
+    "project_id": "1",
+}
+
+default_dt = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
+
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    def _send_json(self, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        u = urlparse(self.path)
+        params = parse_qs(u.query)
+        if u.path == "/projects/1/assets/1":
+            payload = dict(asset_json)
+            if params.get("download") == ["true"]:
+                payload["link"] = "http://localhost:8000/download"
+            self._send_json(payload)
+        elif u.path == "/download":
+            self.send_response(HTTPStatus.OK)
+            self.end_headers()
+            self.wfile.write(b"data")
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+    def do_POST(self):
+        u = urlparse(self.path)
+        if u.path == "/projects/1/assets":
+            self.rfile.read(int(self.headers["Content-Length"]))
+            self._send_json(asset_json)
+        else:
+            self.send_error(HTTPStatus.NOT_FOUND)
+
+
+@pytest.fixture(scope="module")
+def request_handler():
+    return MockRequestHandler
+
+
+@pytest.fixture
+def tracer():
+    return JSONTracer()
+
+
+@pytest.fixture
+def traced_client(tracer):
+    return MetafoldClient(
+        "testtoken", "1", base_url="http://localhost:8000", tracer=tracer,
+    )
+
+
+def test_http_span(traced_client, tracer):
+    traced_client.assets.get("1")
+    [span] = tracer.spans
+    assert span["name"] == "http.get"
+    assert span["attributes"]["method"] == "GET"
+    assert span["attributes"]["url"] == "http://localhost:8000/projects/1/assets/1"
+    assert span["attributes"]["status_code"] == 200
+    assert span["attributes"]["bytes"] > 0
+    assert span["duration"] >= 0
+
+
+def test_http_error_span(traced_client, tracer):
+    with pytest.raises(Exception):
+        traced_client.assets.get("2")
+    assert tracer.spans[0]["attributes"]["status_code"] == 404
+
+
+def test_download_span(traced_client, tracer):
+    traced_client.assets.download("1", BytesIO())
+    span = tracer.spans[-1]
+    assert span["name"] == "asset.download"
+    assert span["attributes"] == {"asset_id": "1", "bytes": 4}
+
+
+def test_upload_span(traced_client, tracer):
+    traced_client.assets.create(BytesIO(b"data"))
+    upload = tracer.spans[-1]
+    assert upload["name"] == "asset.upload"
+    assert upload["attributes"] == {"bytes": 4, "asset_id": "1"}
+    # The HTTP request is nested within the upload span
+    assert tracer.spans[0]["parent_id"] == upload["id"]
+
+
+def test_nested_spans(tracer):
+    with pytest.raises(ValueError):
+        with tracer.span("outer", stage="prepare"):
+            with tracer.span("inner"):
+                pass
+            raise ValueError("boom")
+    inner, outer = tracer.spans
+    assert inner["parent_id"] == outer["id"]
+    assert outer["parent_id"] is None
+    assert outer["attributes"] == {"stage": "prepare", "error": "ValueError: boom"}
+
+
+def test_record_lifecycle(tracer):
+    started = default_dt + timedelta(seconds=5)
+    finished = started + timedelta(seconds=60)
+    tracer.record_lifecycle("workflow", default_dt, started, finished, workflow_id="1")
+    queue, run = tracer.spans
+    assert (queue["name"], queue["duration"]) == ("workflow.queue", 5)
+    assert (run["name"], run["duration"]) == ("workflow.run", 60)
+    assert run["attributes"] == {"workflow_id": "1"}
+
+    tracer.record_lifecycle("workflow", default_dt, None, None)
+    assert len(tracer.spans) == 2
+
+
+def test_traced_decorator(tracer):
+    class Stage:
+        name = "foo"
+
+        def __init__(self, tracer: Tracer) -> None:
+            self.tracer = tracer
+
+        @traced("stage.run", stage="name")
+        def run(self, x):
+            return x + 1
+
+    assert Stage(tracer).run(1) == 2
+    assert tracer.spans[0]["name"] == "stage.run"
+    assert tracer.spans[0]["attributes"] == {"stage": "foo"}
+
+
+def test_write(tracer, tmp_path):
+    with tracer.span("foo"):
+        pass
+    path = tmp_path / "spans.json"
+    tracer.write(path)
+    assert json.loads(path.read_text())["spans"] == tracer.spans
+
+
+def test_default_tracer_is_noop(client):
+    with client.tracer.span("foo") as span:
+        span.set_attribute("bar", 1)
@@ -1,5 +1,7 @@
-from metafold.utils import xform
+from metafold.utils import ChecksumCache, sha256_file, sha256_files, xform
 from numpy.testing import assert_allclose
+import hashlib
+import os
 
 
 def test_xform():
@@ -30,3 +32,60 @@ def test_xform():
         [1.0,  2.0, 3.0, 1.0],
     ], atol=1.0e-7)
 
+
+
+def test_sha256_file(tmp_path):
+    data = os.urandom(3 << 20)
+    path = tmp_path / "a.bin"
+    path.write_bytes(data)
+    assert sha256_file(path) == "sha256:" + hashlib.sha256(data).hexdigest()
+
+    empty = tmp_path / "empty.bin"
+    empty.write_bytes(b"")
+    assert sha256_file(empty) == "sha256:" + hashlib.sha256(b"").hexdigest()
+
+
+def test_sha256_files(tmp_path):
+    paths = []
+    for i in range(8):
+        path = tmp_path / f"{i}.bin"
+        path.write_bytes(bytes([i]) * 1024 * (i + 1))
+        paths.append(path)
+    assert sha256_files(paths, max_workers=4) == [sha256_file(p) for p in paths]
+
+
+def test_checksum_cache(tmp_path, monkeypatch):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"foo")
+    cache_path = tmp_path / "checksums.json"
+    [checksum] = sha256_files([path], cache=ChecksumCache(cache_path))
+
+    # Unchanged files are served from the persisted cache without hashing
+    hashed = []
+    monkeypatch.setattr("metafold.utils.sha256_file", lambda p: hashed.append(p))
+    cache = ChecksumCache(cache_path)
+    assert len(cache) == 1
+    assert sha256_files([path], cache=cache) == [checksum]
+    assert hashed == []
+
+    # Changed files are rehashed
+    path.write_bytes(b"foobar")
+    os.utime(path, ns=(0, 0))
+    assert cache.get(path) is None
+
+
+def test_checksum_cache_file_changed_while_hashing(tmp_path, monkeypatch):
+    path = tmp_path / "a.bin"
+    path.write_bytes(b"foo")
+    old = sha256_file(path)
+
+    def hash_then_change(p):
+        path.write_bytes(b"foobar")
+        os.utime(path, ns=(0, 0))
+        return old
+
+    monkeypatch.setattr("metafold.utils.sha256_file", hash_then_change)
+    cache = ChecksumCache()
+    assert sha256_files([path], cache=cache) == [old]
+    # The stale checksum isn't served for the changed file
+    assert cache.get(path) is None
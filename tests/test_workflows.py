@@ -6,6 +6,7 @@ from metafold.workflows import Workflow
 from urllib.parse import parse_qs, urlparse
 import json
 import pytest
+import sys
 
 default_dt = datetime(2024, 1, 1, 0, 0, 0, tzinfo=timezone.utc)
 
@@ -83,6 +84,11 @@ mock_job = {
 }
 
 poll_count: int = 0
+# Set to False to serve pages without a next cursor
+send_cursor: bool = True
+# Set to False to serve whole lists regardless of the limit
+honour_limit: bool = True
+list_requests: int = 0
 
 
 class MockRequestHandler(BaseHTTPRequestHandler):
@@ -90,14 +96,22 @@ class MockRequestHandler(BaseHTTPRequestHandler):
         u = urlparse(self.path)
         params = parse_qs(u.query)
         if u.path == "/projects/1/workflows":
-            self.send_response(HTTPStatus.OK)
-            self.send_header("Content-Type", "application/json")
-            self.end_headers()
+            global list_requests
+            list_requests += 1
             payload = workflow_list
             if params.get("sort") == ["id:1"]:
                 payload = sorted(workflow_list, key=lambda p: p["id"])
             elif params.get("q") == ["state:started"]:
                 payload = [p for p in workflow_list if p["state"] == "started"]
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "application/json")
+            if "limit" in params and honour_limit:
+                limit = int(params["limit"][0])
+                start = int(params.get("cursor", ["0"])[0])
+                if send_cursor and start + limit < len(payload):
+                    self.send_header("X-Next-Cursor", str(start + limit))
+                payload = payload[start:start + limit]
+            self.end_headers()
             self.wfile.write(json.dumps(payload).encode())
         elif u.path == "/projects/1/workflows/1":
             self.send_response(HTTPStatus.OK)
@@ -171,6 +185,27 @@ def test_list_workflows_filtered(client):
     assert all([w.state == "started" for w in workflows])
 
 
+def test_iter_workflows_paginated(client):
+    workflows = client.workflows.iter_list(page_size=2)
+    assert [w.id for w in workflows] == ["3", "2", "1"]
+
+
+def test_iter_workflows_without_cursor(client, monkeypatch):
+    # Honours the limit but never sends a cursor: falls back to a full list
+    monkeypatch.setattr(sys.modules[__name__], "send_cursor", False)
+    workflows = client.workflows.iter_list(page_size=2)
+    assert [w.id for w in workflows] == ["3", "2", "1"]
+
+
+def test_iter_workflows_limit_ignored(client, monkeypatch):
+    # Sends the whole list at once: no second request for it
+    monkeypatch.setattr(sys.modules[__name__], "honour_limit", False)
+    monkeypatch.setattr(sys.modules[__name__], "list_requests", 0)
+    workflows = client.workflows.iter_list(page_size=2)
+    assert [w.id for w in workflows] == ["3", "2", "1"]
+    assert list_requests == 1
+
+
 def test_get_workflow(client):
     w = client.workflows.get("1")
     assert w == Workflow(